@@ -1,15 +1,94 @@
-from flask import Flask, render_template, jsonify
+from flask import Flask, render_template, jsonify, g, has_request_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 import gspread
+from google.auth.transport.requests import Request as GoogleAuthRequest
 from google.oauth2.service_account import Credentials
 import os
+import re
 from datetime import datetime
 import json
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib.parse import urlencode
+import base64
+import bisect
+import codecs
+import contextvars
+import collections
+import contextlib
 import csv
-from io import StringIO
+import gzip
+import hashlib
+import functools
+import itertools
+import logging
+import mmap
+import multiprocessing
+import queue
+import sqlite3
+import sys
+import threading
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; pure-Python paths are used without it
+    np = None
+try:
+    import fcntl
+except ImportError:  # Not on Windows; every process then refreshes on its own
+    fcntl = None
+try:
+    import brotli
+except ImportError:  # Brotli is optional; responses fall back to gzip without it
+    brotli = None
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib encoder is used without it
+    orjson = None
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes with orjson when it is installed.
+
+    Output matches the default provider's sorted keys and default() hook.
+    Anything orjson rejects (e.g. integers beyond 64 bits) falls back to
+    the stdlib encoder.
+    """
+
+    def dumps_bytes(self, obj, indent=False):
+        """Serialize ``obj`` to UTF-8 JSON bytes"""
+        with timed('serialize'):
+            return self._dumps_bytes(obj, indent)
+
+    def _dumps_bytes(self, obj, indent):
+        if orjson is not None:
+            option = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+                      | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS)
+            if self.sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            if indent:
+                option |= orjson.OPT_INDENT_2
+            try:
+                return orjson.dumps(obj, default=self.default, option=option)
+            except TypeError:
+                pass
+        if indent:
+            return super().dumps(obj, indent=2).encode()
+        return super().dumps(obj, separators=(',', ':')).encode()
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self.dumps_bytes(obj, indent) + b'\n', mimetype=self.mimetype)
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 CORS(app)  # Enable CORS to prevent 403 errors
 
 # Google Sheets configuration
@@ -29,69 +108,575 @@ ENABLE_QUOTES = os.getenv('ENABLE_QUOTES', 'true').lower() == 'true'
 USE_POSITIONS_SHEET = os.getenv('USE_POSITIONS_SHEET', 'false').lower() == 'true'
 POSITIONS_SPREADSHEET_ID = os.getenv('POSITIONS_SPREADSHEET_ID', '')
 POSITIONS_WORKSHEET_GID = os.getenv('POSITIONS_WORKSHEET_GID', '')
+# Sheet cache: entries younger than SHEET_CACHE_TTL seconds are served as-is,
+# older ones are served stale (up to SHEET_CACHE_MAX_STALE) while refreshing
+SHEET_CACHE_TTL = float(os.getenv('SHEET_CACHE_TTL', '60'))
+SHEET_CACHE_MAX_STALE = float(os.getenv('SHEET_CACHE_MAX_STALE', '3600'))
+# CSV export endpoint used for public access ("&gid=..." is appended when known)
+SHEETS_EXPORT_URL = os.getenv('SHEETS_EXPORT_URL', 'https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv')
+# Concurrent sheet fetches and the default per-sheet timeout in seconds
+SHEET_FETCH_WORKERS = int(os.getenv('SHEET_FETCH_WORKERS', '4'))
+SHEET_FETCH_TIMEOUT = float(os.getenv('SHEET_FETCH_TIMEOUT', '30'))
+# Pooled HTTP session: connections kept alive per host, retries with backoff
+HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '10'))
+HTTP_RETRIES = int(os.getenv('HTTP_RETRIES', '3'))
+HTTP_BACKOFF = float(os.getenv('HTTP_BACKOFF', '0.3'))
+# Bytes read at a time when streaming a public CSV export
+CSV_CHUNK_SIZE = int(os.getenv('CSV_CHUNK_SIZE', '65536'))
+CSV_INTERN_LIMIT = int(os.getenv('CSV_INTERN_LIMIT', '100000'))
+# Rows per page of the paginated order tables (default and maximum)
+ORDER_PAGE_SIZE = int(os.getenv('ORDER_PAGE_SIZE', '50'))
+ORDER_PAGE_MAX = int(os.getenv('ORDER_PAGE_MAX', '5000'))
+# JSON responses at least this many bytes are gzip/brotli compressed when accepted
+COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', '1024'))
+COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', '6'))
+# Bytes written at a time when streaming a body out of the shared snapshot file
+RESPONSE_CHUNK_SIZE = int(os.getenv('RESPONSE_CHUNK_SIZE', '65536'))
+# Total bytes of serialized response bodies kept for reuse per ETag
+RESPONSE_CACHE_BYTES = int(os.getenv('RESPONSE_CACHE_BYTES', str(64 * 1024 * 1024)))
+# Quotes: prices younger than QUOTE_TTL seconds are served from cache; when the
+# upstream fails, the last known price is served (flagged stale) for up to QUOTE_MAX_STALE
+QUOTES_URL = os.getenv('QUOTES_URL', 'https://query1.finance.yahoo.com/v7/finance/quote')
+QUOTE_TTL = float(os.getenv('QUOTE_TTL', '15'))
+QUOTE_MAX_STALE = float(os.getenv('QUOTE_MAX_STALE', '86400'))
+QUOTE_BATCH_SIZE = int(os.getenv('QUOTE_BATCH_SIZE', '50'))
+QUOTE_NEGATIVE_TTL = float(os.getenv('QUOTE_NEGATIVE_TTL', '300'))
+QUOTE_CACHE_SIZE = int(os.getenv('QUOTE_CACHE_SIZE', '5000'))
+# Incremental sync: in authenticated mode only rows appended since the last
+# fetch are read, with a full resync at least every FULL_SYNC_INTERVAL seconds
+INCREMENTAL_SYNC = os.getenv('INCREMENTAL_SYNC', 'true').lower() == 'true'
+FULL_SYNC_INTERVAL = float(os.getenv('FULL_SYNC_INTERVAL', '600'))
+# Versions of row changes remembered per sheet for ?since= deltas; clients
+# holding an older version token get the full payload
+SHEET_CHANGE_HISTORY = int(os.getenv('SHEET_CHANGE_HISTORY', '100'))
+# ?since= requests that would return more changed orders than this get the full payload
+DELTA_MAX_ORDERS = int(os.getenv('DELTA_MAX_ORDERS', '5000'))
+# Background refresh: every REFRESH_INTERVAL seconds a scheduler thread
+# refetches the sheets and publishes prebuilt views (0 builds them per request)
+REFRESH_INTERVAL = float(os.getenv('REFRESH_INTERVAL', '0'))
+# SQLite file the last fetched rows of every sheet are persisted to and
+# restored from at startup (empty disables persistence)
+SNAPSHOT_DB = os.getenv('SNAPSHOT_DB', '')
+# Multi-process servers: the process that locks SHARED_SNAPSHOT_PATH runs the
+# background refresh and publishes each snapshot to that file, which the
+# other processes map read-only (empty disables sharing)
+SHARED_SNAPSHOT_PATH = os.getenv('SHARED_SNAPSHOT_PATH', '')
+# Server-sent events: /api/events subscribers hear about each new snapshot
+# (checked every EVENTS_POLL_INTERVAL seconds), idle streams get a keepalive
+# every EVENTS_KEEPALIVE seconds, and snapshots adding more than
+# EVENTS_MAX_DELTA_ORDERS orders are announced without a delta. Without
+# REFRESH_INTERVAL, the first subscriber starts refreshes every EVENTS_REFRESH_INTERVAL
+EVENTS_POLL_INTERVAL = float(os.getenv('EVENTS_POLL_INTERVAL', '1'))
+EVENTS_KEEPALIVE = float(os.getenv('EVENTS_KEEPALIVE', '15'))
+EVENTS_MAX_DELTA_ORDERS = int(os.getenv('EVENTS_MAX_DELTA_ORDERS', '2000'))
+EVENTS_REFRESH_INTERVAL = float(os.getenv('EVENTS_REFRESH_INTERVAL', '60'))
+# Logging: repeats of the same message are logged at most once per
+# LOG_RATE_INTERVAL seconds (0 logs every one)
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = '%(asctime)s %(levelname)s %(name)s: %(message)s'
+LOG_RATE_INTERVAL = float(os.getenv('LOG_RATE_INTERVAL', '60'))
+# Stage timing histograms cover the last METRICS_WINDOW seconds (at most
+# METRICS_MAX_SAMPLES per stage); PROFILE_INTERVAL_MS > 0 turns on the
+# sampling profiler for request threads
+METRICS_WINDOW = float(os.getenv('METRICS_WINDOW', '300'))
+METRICS_MAX_SAMPLES = int(os.getenv('METRICS_MAX_SAMPLES', '2048'))
+PROFILE_INTERVAL_MS = float(os.getenv('PROFILE_INTERVAL_MS', '0'))
+PROFILE_MAX_STACKS = int(os.getenv('PROFILE_MAX_STACKS', '5000'))
+# Orders sheets of at least NORMALIZE_POOL_MIN_ROWS rows are normalized by
+# NORMALIZE_WORKERS processes in parallel (0 always normalizes inline); rows
+# not back from the workers within NORMALIZE_POOL_TIMEOUT seconds are
+# normalized inline instead
+NORMALIZE_WORKERS = int(os.getenv('NORMALIZE_WORKERS', '0'))
+NORMALIZE_POOL_MIN_ROWS = int(os.getenv('NORMALIZE_POOL_MIN_ROWS', '200000'))
+NORMALIZE_POOL_TIMEOUT = float(os.getenv('NORMALIZE_POOL_TIMEOUT', '120'))
+
+# True in normalize pool workers, which import this module but serve nothing
+IN_POOL_WORKER = multiprocessing.parent_process() is not None
+
+_http_session = None
+_http_lock = threading.Lock()
+_http_counters = {'requests': 0}
+_gspread_lock = threading.Lock()
+_gspread_client = None
+_gspread_creds_mtime = None
+_gspread_missing_reported = False
+_gspread_counters = {'client_builds': 0, 'token_refreshes': 0, 'reuses': 0}
+
+class RateLimitFilter(logging.Filter):
+    """Lets through one record per level and message template every ``interval`` seconds.
+
+    The next record let through notes how many were dropped in between, so
+    errors repeated on every request or refresh cannot flood the log.
+    """
+
+    def __init__(self, interval=LOG_RATE_INTERVAL, clock=time.monotonic):
+        super().__init__()
+        self.interval = interval
+        self.clock = clock
+        self._last = {}
+        self._suppressed = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if self.interval <= 0:
+            return True
+        key = (record.levelno, str(record.msg))
+        now = self.clock()
+        with self._lock:
+            last = self._last.get(key)
+            if last is not None and now - last < self.interval:
+                self._suppressed[key] = self._suppressed.get(key, 0) + 1
+                return False
+            self._last[key] = now
+            suppressed = self._suppressed.pop(key, 0)
+        if suppressed:
+            record.msg = f'{record.msg} ({suppressed} similar messages suppressed)'
+        return True
+
+def configure_logging(log=None):
+    """Send the app logger's records to stderr unless logging is already set up.
+
+    Servers such as gunicorn import the app without running ``__main__``,
+    and with no handler anywhere INFO records would be dropped. A handler on
+    the app logger or the root logger (e.g. from basicConfig or a server's
+    logging config) is left alone. Returns whether a handler was added.
+    """
+    log = log or logger
+    if log.handlers or logging.getLogger().handlers:
+        return False
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    log.addHandler(handler)
+    return True
+
+logger = logging.getLogger(__name__)
+logger.setLevel(LOG_LEVEL)
+logger.addFilter(RateLimitFilter())
+configure_logging()
+
+class StageMetrics:
+    """Rolling timing histograms per named stage.
+
+    Keeps the samples of the last ``window`` seconds (at most
+    ``max_samples`` per stage) for percentiles and bucket counts, plus
+    all-time totals.
+    """
+
+    BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    def __init__(self, window=METRICS_WINDOW, max_samples=METRICS_MAX_SAMPLES, clock=time.monotonic):
+        self.window = window
+        self.max_samples = max_samples
+        self.clock = clock
+        self._samples = {}
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = collections.deque(maxlen=self.max_samples)
+                self._totals[stage] = [0, 0.0]
+            samples.append((self.clock(), seconds))
+            totals = self._totals[stage]
+            totals[0] += 1
+            totals[1] += seconds
+
+    def snapshot(self):
+        """Return per-stage totals and the window's count, percentiles and histogram in milliseconds"""
+        cutoff = self.clock() - self.window
+        with self._lock:
+            stages = {stage: ([s for t, s in samples if t >= cutoff], tuple(self._totals[stage]))
+                      for stage, samples in self._samples.items()}
+        result = {}
+        for stage, (window, (count, total)) in sorted(stages.items()):
+            ms = sorted(s * 1e3 for s in window)
+            stats = {'count': count, 'total_ms': round(total * 1e3, 3), 'window_count': len(ms)}
+            if ms:
+                pick = lambda q: round(ms[min(len(ms) - 1, int(q * len(ms)))], 3)
+                buckets = {}
+                for bound in self.BUCKETS_MS:
+                    buckets[f'le_{bound}'] = bisect.bisect_right(ms, bound) - sum(buckets.values())
+                buckets['inf'] = len(ms) - sum(buckets.values())
+                stats.update(mean_ms=round(sum(ms) / len(ms), 3), p50_ms=pick(0.5), p90_ms=pick(0.9),
+                             p99_ms=pick(0.99), max_ms=round(ms[-1], 3), buckets=buckets)
+            result[stage] = stats
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+            self._totals.clear()
+
+stage_metrics = StageMetrics()
+
+class RequestTimings:
+    """Stage durations of one request, written from the request thread and its fetch workers"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds):
+        with self._lock:
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def header(self):
+        """Return the Server-Timing header value, ending with the total so far"""
+        with self._lock:
+            parts = [f'{stage};dur={seconds * 1e3:.1f}' for stage, seconds in self.stages.items()]
+        parts.append(f'total;dur={(time.perf_counter() - self.started) * 1e3:.1f}')
+        return ', '.join(parts)
+
+# Cleared in normalize pool workers, whose timings nobody reads
+_record_stages = True
+
+def record_stage(stage, seconds):
+    """Add a stage duration to the rolling metrics and to the current request's Server-Timing"""
+    if not _record_stages:
+        return
+    stage_metrics.observe(stage, seconds)
+    if has_request_context():
+        timings = g.get('timings')
+        if timings is not None:
+            timings.add(stage, seconds)
+
+@contextlib.contextmanager
+def timed(stage):
+    """Time the enclosed block as ``stage`` (stages may nest; each reports its own wall time)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - start)
+
+class SamplingProfiler:
+    """Statistical profiler sampling the stacks of threads that are serving requests.
+
+    Every ``interval`` seconds a background thread walks the current frame
+    of each tracked thread and counts the collapsed stack (outermost call
+    first, one entry per function) under the request's endpoint. The counts
+    can be fed straight to flamegraph tools.
+    """
+
+    def __init__(self, interval, max_stacks=PROFILE_MAX_STACKS):
+        self.interval = interval
+        self.max_stacks = max_stacks
+        self._threads = {}
+        self._stacks = collections.Counter()
+        self._samples = 0
+        self._dropped = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+                self._thread.start()
+
+    def track(self, ident, label):
+        with self._lock:
+            self._threads[ident] = label
+
+    def untrack(self, ident):
+        with self._lock:
+            self._threads.pop(ident, None)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            self.sample()
+
+    def sample(self):
+        """Record one stack sample of every tracked thread"""
+        with self._lock:
+            threads = dict(self._threads)
+        if not threads:
+            return
+        frames = sys._current_frames()
+        for ident, label in threads.items():
+            frame = frames.get(ident)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                frame = frame.f_back
+            if not stack:
+                continue
+            key = (label, ';'.join(reversed(stack)))
+            with self._lock:
+                self._samples += 1
+                if key in self._stacks or len(self._stacks) < self.max_stacks:
+                    self._stacks[key] += 1
+                else:
+                    self._dropped += 1
+
+    def report(self, limit=50):
+        """Return the most sampled stacks per endpoint"""
+        with self._lock:
+            top = self._stacks.most_common(limit)
+            samples, dropped = self._samples, self._dropped
+        return {
+            'interval_ms': self.interval * 1e3,
+            'samples': samples,
+            'dropped': dropped,
+            'stacks': [{'endpoint': label, 'stack': stack, 'samples': n} for (label, stack), n in top]
+        }
+
+    def collapsed(self):
+        """Return all stacks in collapsed format ('endpoint;frame;frame count' per line)"""
+        with self._lock:
+            items = sorted(self._stacks.items())
+        return ''.join(f'{label};{stack} {n}\n' for (label, stack), n in items)
+
+    def clear(self):
+        with self._lock:
+            self._stacks.clear()
+            self._samples = 0
+            self._dropped = 0
+
+profiler = SamplingProfiler(PROFILE_INTERVAL_MS / 1e3) if PROFILE_INTERVAL_MS > 0 else None
+
+@app.before_request
+def start_request_timing():
+    g.timings = RequestTimings()
+    if profiler is not None:
+        profiler.start()
+        profiler.track(threading.get_ident(), request.endpoint or request.path)
+
+@app.after_request
+def add_server_timing(response):
+    """Report the request's stage timings (registered first, so it runs after the other hooks)"""
+    timings = g.get('timings')
+    if timings is not None:
+        response.headers['Server-Timing'] = timings.header()
+        stage_metrics.observe(f'route:{request.endpoint}', time.perf_counter() - timings.started)
+    return response
+
+@app.teardown_request
+def stop_request_profiling(exc=None):
+    if profiler is not None:
+        profiler.untrack(threading.get_ident())
+
+class _CountingHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that counts requests sent through the shared session"""
+
+    def send(self, request, **kwargs):
+        with _http_lock:
+            _http_counters['requests'] += 1
+        return super().send(request, **kwargs)
+
+def get_http_session():
+    """Return the process-wide requests session with keep-alive pooling and retries"""
+    global _http_session
+    if _http_session is None:
+        with _http_lock:
+            if _http_session is None:
+                retry = Retry(total=HTTP_RETRIES, backoff_factor=HTTP_BACKOFF,
+                              status_forcelist=(429, 500, 502, 503, 504),
+                              allowed_methods=frozenset(['GET']), raise_on_status=False)
+                adapter = _CountingHTTPAdapter(pool_connections=HTTP_POOL_SIZE,
+                                               pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+                session = requests.Session()
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _http_session = session
+    return _http_session
+
+def http_connection_stats():
+    """Return how many requests went out and how many TCP/TLS connections they needed"""
+    with _http_lock:
+        stats = {'requests': _http_counters['requests'], 'connections_opened': 0, 'pool_requests': 0}
+        session = _http_session
+    if session is not None:
+        pools = session.get_adapter('https://').poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                stats['connections_opened'] += pool.num_connections
+                stats['pool_requests'] += pool.num_requests
+    stats['connections_reused'] = max(0, stats['pool_requests'] - stats['connections_opened'])
+    return stats
 
 def get_google_sheets_client():
-    """Initialize and return Google Sheets client"""
+    """Return the authorized Google Sheets client, creating it once and reusing it"""
+    global _gspread_client, _gspread_creds_mtime, _gspread_missing_reported
     try:
         # Try to use service account credentials from environment or file
         creds_file = os.getenv('GOOGLE_CREDENTIALS_FILE', 'credentials.json')
         
-        if os.path.exists(creds_file):
-            creds = Credentials.from_service_account_file(creds_file, scopes=SCOPE)
-            client = gspread.authorize(creds)
-            return client
-        else:
-            print(f"Credentials file not found: {creds_file}")
+        if not os.path.exists(creds_file):
+            if not _gspread_missing_reported:
+                logger.warning("Credentials file not found: %s", creds_file)
+                _gspread_missing_reported = True
+            _gspread_client = None
             return None
+        
+        _gspread_missing_reported = False
+        mtime = os.path.getmtime(creds_file)
+        with _gspread_lock:
+            if _gspread_client is None or _gspread_creds_mtime != mtime:
+                # First use, or the credentials file was replaced
+                creds = Credentials.from_service_account_file(creds_file, scopes=SCOPE)
+                _gspread_client = gspread.authorize(creds)
+                _gspread_creds_mtime = mtime
+                _gspread_counters['client_builds'] += 1
+            elif not _gspread_client.auth.valid:
+                # Token expired: refresh it in place instead of re-reading the file
+                _gspread_client.auth.refresh(GoogleAuthRequest(session=get_http_session()))
+                _gspread_counters['token_refreshes'] += 1
+            else:
+                _gspread_counters['reuses'] += 1
+            return _gspread_client
     except Exception as e:
-        print(f"Error initializing Google Sheets client: {e}")
+        logger.error("Error initializing Google Sheets client: %s", e)
         return None
 
+def _is_html_page(text):
+    """Return True if an export response starts like Google's HTML login page"""
+    return text.lstrip().startswith('<!DOCTYPE') or '<html' in text.lower()
+
+def iter_response_text(response):
+    """Decode a streamed response body chunk by chunk"""
+    decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+    for chunk in response.iter_content(CSV_CHUNK_SIZE):
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield tail
+
+def iter_text_lines(chunks):
+    """Split text chunks into lines, keeping the line endings csv needs for quoted newlines"""
+    pending = ''
+    for chunk in chunks:
+        lines = (pending + chunk).split('\n')
+        pending = lines.pop()
+        for line in lines:
+            yield line + '\n'
+    if pending:
+        yield pending
+
+def iter_csv_records(lines):
+    """Parse CSV lines into row dicts like csv.DictReader, sharing repeated cell strings.
+
+    Sheet columns such as Type, Status or Symbol repeat the same few values
+    on every row; reusing one string object per distinct value keeps large
+    exports much smaller once parsed. At most CSV_INTERN_LIMIT distinct
+    values are remembered.
+    """
+    reader = csv.reader(lines)
+    fieldnames = next(reader, None)
+    if fieldnames is None:
+        return
+    width = len(fieldnames)
+    seen = {}
+    share = seen.setdefault
+    for row in reader:
+        if not row:
+            continue
+        if share is not seen.get and len(seen) >= CSV_INTERN_LIMIT:
+            share = seen.get
+        row = [share(value, value) for value in row]
+        record = dict(zip(fieldnames, row))
+        if len(row) != width:
+            # Same restkey/restval handling as csv.DictReader
+            if len(row) > width:
+                record[None] = row[width:]
+            else:
+                for key in fieldnames[len(row):]:
+                    record[key] = None
+        yield record
+
+def open_sheet_export(session, csv_url):
+    """Start streaming a CSV export, returning (response, text chunks).
+
+    Only the first chunk is inspected for an HTML login page; in that case
+    the response is closed and None is returned. The response is also
+    closed, returning its connection to the pool, if the request failed.
+    """
+    response = session.get(csv_url, timeout=10, stream=True)
+    try:
+        texts = iter_response_text(response)
+        first = ''
+        for text in texts:
+            first += text
+            if first.strip():
+                break
+        if _is_html_page(first):
+            response.close()
+            return None
+        response.raise_for_status()
+    except BaseException:
+        response.close()
+        raise
+    return response, itertools.chain((first,), texts)
+
+def iter_export_records(response, texts):
+    """Parse an opened CSV export into row dicts, closing the response when done or abandoned"""
+    with response:
+        yield from iter_csv_records(iter_text_lines(texts))
+
+def stream_sheet_data_public(spreadsheet_id=None, worksheet_gid=None):
+    """Open a public Google Sheet's CSV export as an iterator of row dicts.
+
+    The export is decoded and parsed as it arrives, so the body is never
+    held in memory as a whole. Returns None if the sheet is not public.
+    """
+    sheet_id = spreadsheet_id or SPREADSHEET_ID
+    gid = worksheet_gid if worksheet_gid is not None else WORKSHEET_GID
+    session = get_http_session()
+    
+    # Try with gid first
+    opened = open_sheet_export(session, SHEETS_EXPORT_URL.format(sheet_id=sheet_id) + f"&gid={gid}")
+    if opened is None:
+        logger.info("Sheet is not publicly accessible. Trying without gid...")
+        # Try without gid (first sheet)
+        opened = open_sheet_export(session, SHEETS_EXPORT_URL.format(sheet_id=sheet_id))
+        
+        # Still HTML? Sheet is private
+        if opened is None:
+            logger.error("Google Sheet is not publicly accessible. Please either make the sheet public "
+                         "(Share → Change to anyone with the link) or set up Google Sheets API "
+                         "credentials (see README.md)")
+            return None
+    
+    return iter_export_records(*opened)
+
 def get_sheet_data_public(spreadsheet_id=None, worksheet_gid=None):
     """Fetch data from public Google Sheet using CSV export"""
     try:
-        sheet_id = spreadsheet_id or SPREADSHEET_ID
-        gid = worksheet_gid if worksheet_gid is not None else WORKSHEET_GID
-        
-        # Try with gid first
-        csv_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv&gid={gid}"
-        response = requests.get(csv_url, timeout=10)
-        
-        # Check if we got HTML (login page) instead of CSV
-        if response.text.strip().startswith('<!DOCTYPE') or '<html' in response.text.lower():
-            print("Sheet is not publicly accessible. Trying without gid...")
-            # Try without gid (first sheet)
-            csv_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv"
-            response = requests.get(csv_url, timeout=10)
-            
-            # Still HTML? Sheet is private
-            if response.text.strip().startswith('<!DOCTYPE') or '<html' in response.text.lower():
-                print("Error: Google Sheet is not publicly accessible.")
-                print("Please either:")
-                print("1. Make the sheet public: Share → Change to anyone with the link")
-                print("2. Set up Google Sheets API credentials (see README.md)")
+        with timed('fetch_public'):
+            rows = stream_sheet_data_public(spreadsheet_id, worksheet_gid)
+            if rows is None:
                 return None
-        
-        response.raise_for_status()
-        
-        # Parse CSV
-        csv_data = StringIO(response.text)
-        reader = csv.DictReader(csv_data)
-        data = list(reader)
+            data = list(rows)
         
         if not data:
-            print("Warning: Sheet appears to be empty or has no data rows")
+            logger.warning("Sheet appears to be empty or has no data rows")
             return None
             
-        print(f"Successfully fetched {len(data)} rows from Google Sheet")
+        logger.info("Fetched %d rows from public Google Sheet", len(data))
         return data
     except requests.exceptions.RequestException as e:
-        print(f"Network error fetching public sheet data: {e}")
+        logger.error("Network error fetching public sheet data: %s", e)
         return None
     except Exception as e:
-        print(f"Error fetching public sheet data: {e}")
+        logger.error("Error fetching public sheet data: %s", e)
         return None
 
+def open_worksheet(client, sheet_id, gid):
+    """Open a worksheet by gid, falling back to the first sheet"""
+    sheet = client.open_by_key(sheet_id)
+    try:
+        return sheet.get_worksheet_by_id(int(gid))
+    except:
+        return sheet.sheet1
+
 def get_sheet_data(spreadsheet_id=None, worksheet_gid=None):
     """Fetch data from Google Sheet"""
     sheet_id = spreadsheet_id or SPREADSHEET_ID
@@ -110,83 +695,743 @@ def get_sheet_data(spreadsheet_id=None, worksheet_gid=None):
             # Fallback to public access
             return get_sheet_data_public(sheet_id, gid)
         
-        sheet = client.open_by_key(sheet_id)
-        # Try to get worksheet by gid or by index
-        try:
-            worksheet = sheet.get_worksheet_by_id(int(gid))
-        except:
-            worksheet = sheet.sheet1  # Fallback to first sheet
+        worksheet = open_worksheet(client, sheet_id, gid)
         
         # Get all values
-        data = worksheet.get_all_records()
+        with timed('fetch_api'):
+            data = worksheet.get_all_records()
         return data
     except Exception as e:
-        print(f"Error fetching sheet data: {e}")
+        logger.error("Error fetching sheet data: %s", e)
         # Fallback to public access
         return get_sheet_data_public(sheet_id, gid)
 
+class SheetRows(list):
+    """Rows of one fetched sheet version.
+
+    ``base`` weakly references the previous version's rows when these rows
+    only append to them and share their row objects, so derived state can
+    recognise an append without comparing every earlier row again.
+    ``origin`` is shared by every version in such a chain of appends.
+    """
+
+    base = None
+    origin = None
+
+    @classmethod
+    def extending(cls, previous, appended):
+        """Return ``previous`` followed by ``appended``, recording ``previous`` as the base"""
+        rows = cls(previous)
+        rows.extend(appended)
+        if isinstance(previous, cls):
+            rows.base = weakref.ref(previous)
+            if previous.origin is None:
+                previous.origin = object()
+            rows.origin = previous.origin
+        return rows
+
+    def extends(self, previous):
+        """Return whether these rows were built by appending to ``previous``"""
+        return self.base is not None and self.base() is previous
+
+    def follows(self, earlier):
+        """Return whether these rows were built by one or more appends to ``earlier``"""
+        return (self.origin is not None and getattr(earlier, 'origin', None) is self.origin
+                and len(earlier) <= len(self))
+
+def next_sheet_rows(previous, rows):
+    """Return the rows to cache after refetching a sheet whose cached rows are ``previous``.
+
+    Unchanged rows come back as ``previous`` itself and appended rows reuse
+    its row objects, so callers can tell both cases apart by identity.
+    """
+    if rows is previous:
+        return previous
+    if isinstance(rows, SheetRows) and rows.extends(previous):
+        return rows
+    n = len(previous)
+    if len(rows) >= n and rows[:n] == previous:
+        return previous if len(rows) == n else SheetRows.extending(previous, rows[n:])
+    return rows if isinstance(rows, SheetRows) else SheetRows(rows)
+
+_last_full_sync = {}
+
+def fetch_appended_rows(sheet_id, gid, previous):
+    """Fetch only the rows appended after ``previous`` (authenticated mode).
+
+    The last previously synced row is re-read along with the new ones and
+    must still match, otherwise None is returned and the caller falls back
+    to a full fetch. Returns ``previous`` itself when nothing was appended.
+    """
+    client = get_google_sheets_client()
+    if not client or not previous:
+        return None
+    try:
+        worksheet = open_worksheet(client, sheet_id, gid)
+        # Data row n lives on sheet row n + 1 (row 1 is the header)
+        with timed('fetch_api'):
+            records = worksheet.get_records(first_index=len(previous) + 1)
+    except Exception as e:
+        logger.warning("Incremental fetch failed, falling back to a full fetch: %s", e)
+        return None
+    if not records or records[0] != previous[-1]:
+        return None
+    if len(records) == 1:
+        return previous
+    logger.info("Fetched %d appended rows from Google Sheet", len(records) - 1)
+    return SheetRows.extending(previous, records[1:])
+
+def sync_sheet_data(spreadsheet_id=None, worksheet_gid=None, previous=None):
+    """Fetch a sheet, reading only newly appended rows when possible"""
+    sheet_id = spreadsheet_id or SPREADSHEET_ID
+    gid = worksheet_gid if worksheet_gid is not None else WORKSHEET_GID
+    key = (sheet_id, str(gid))
+    due_full_sync = time.monotonic() - _last_full_sync.get(key, float('-inf')) >= FULL_SYNC_INTERVAL
+    if INCREMENTAL_SYNC and previous and not USE_PUBLIC_ACCESS and not due_full_sync:
+        rows = fetch_appended_rows(sheet_id, gid, previous)
+        if rows is not None:
+            return rows
+    rows = get_sheet_data(sheet_id, gid)
+    if rows:
+        _last_full_sync[key] = time.monotonic()
+    return rows
+
+# JSON stand-in for the None key that holds a ragged CSV row's extra cells
+_OVERFLOW_KEY = '\x00overflow'
+
+def _dumps_json(obj):
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode()
+
+def _loads_json(blob):
+    return orjson.loads(blob) if orjson is not None else json.loads(bytes(blob))
+
+def _row_to_json(row):
+    return {_OVERFLOW_KEY if k is None else k: v for k, v in row.items()} if None in row else row
+
+def _row_from_json(row):
+    if _OVERFLOW_KEY in row:
+        row[None] = row.pop(_OVERFLOW_KEY)
+    return row
+
+def _encode_rows(rows):
+    if any(None in row for row in rows):
+        rows = [_row_to_json(row) for row in rows]
+    return _dumps_json(rows)
+
+def _decode_rows(blob):
+    rows = _loads_json(blob)
+    for row in rows:
+        _row_from_json(row)
+    return rows
+
+# Sections laid out by layout_sections start at multiples of this many bytes, so typed columns map aligned
+SECTION_ALIGN = 8
+
+def layout_sections(sections):
+    """Place named buffers end to end at aligned offsets.
+
+    Returns ({name: (offset, length, item format)}, {name: memoryview}).
+    Typed arrays keep their native byte order and item size, so an image
+    is only read back on the machine that wrote it.
+    """
+    layout, views, offset = {}, {}, 0
+    for name, body in sections.items():
+        view = views[name] = memoryview(body)
+        offset += -offset % SECTION_ALIGN
+        layout[name] = (offset, view.nbytes, view.format)
+        offset += view.nbytes
+    return layout, views
+
+def iter_section_bytes(layout, views):
+    """Yield the padding and bodies of laid out sections in order"""
+    written = 0
+    for name, view in views.items():
+        offset = layout[name][0]
+        yield bytes(offset - written)
+        yield view
+        written = offset + view.nbytes
+
+def section_view(buffer, entry, base=0):
+    """Return one laid out section of ``buffer`` as a memoryview of its item type, without copying"""
+    offset, length, fmt = entry
+    view = buffer[base + offset:base + offset + length]
+    return view if fmt == 'B' else view.cast(fmt)
+
+def _array_copy(view):
+    """Copy a typed memoryview (or array) into an array of the same type"""
+    view = memoryview(view)
+    copied = array(view.format)
+    copied.frombytes(view.cast('B'))
+    return copied
+
+class SheetSnapshotStore:
+    """SQLite file holding the last fetched rows and version of each sheet.
+
+    Rows are stored as JSON chunks. A save whose rows extend the persisted
+    ones appends a chunk with just the new rows; anything else rewrites the
+    sheet. Each sheet's derived state (see ``save_state``) is stored next to
+    its rows as an image, stamped with the sheet version and row count it
+    was built from. Writes run on a single background thread in the order
+    they were made, so persisting never delays a request.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='snapshot-store')
+        self._counters = {'appends': 0, 'rewrites': 0, 'states': 0, 'errors': 0}
+        # Rows and version last persisted per sheet; derived state is only saved against those rows
+        self._written = {}
+        # Latest derived state per sheet waiting for the writer, and the rows it was last queued for
+        self._pending_states = {}
+        self._queued_rows = {}
+        self._pending_lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('''CREATE TABLE IF NOT EXISTS sheets (
+                spreadsheet_id TEXT, gid TEXT, version INTEGER, fetched_at REAL, row_count INTEGER,
+                PRIMARY KEY (spreadsheet_id, gid))''')
+            self._conn.execute('''CREATE TABLE IF NOT EXISTS sheet_chunks (
+                spreadsheet_id TEXT, gid TEXT, seq INTEGER, data BLOB,
+                PRIMARY KEY (spreadsheet_id, gid, seq))''')
+            self._conn.execute('''CREATE TABLE IF NOT EXISTS sheet_states (
+                spreadsheet_id TEXT, gid TEXT, name TEXT, version INTEGER, row_count INTEGER, meta TEXT, data BLOB,
+                PRIMARY KEY (spreadsheet_id, gid))''')
+
+    def load(self):
+        """Return {(spreadsheet_id, gid): {'data', 'version', 'fetched_at'}} for every persisted sheet"""
+        sheets = {}
+        with self._lock:
+            for sheet_id, gid, version, fetched_at, row_count in self._conn.execute(
+                    'SELECT spreadsheet_id, gid, version, fetched_at, row_count FROM sheets'):
+                rows = []
+                for (blob,) in self._conn.execute(
+                        'SELECT data FROM sheet_chunks WHERE spreadsheet_id = ? AND gid = ? ORDER BY seq',
+                        (sheet_id, gid)):
+                    rows.extend(_decode_rows(blob))
+                if len(rows) == row_count:
+                    sheets[(sheet_id, gid)] = {'data': rows, 'version': version, 'fetched_at': fetched_at}
+        return sheets
+
+    def save(self, key, rows, version, appended_from=0):
+        """Queue a write of a sheet's rows; ``appended_from`` is where rows new since the last save start"""
+        self._writer.submit(self._write, key, rows, version, time.time(), appended_from)
+
+    def _write(self, key, rows, version, fetched_at, appended_from):
+        try:
+            with self._lock, self._conn:
+                found = self._conn.execute(
+                    'SELECT row_count FROM sheets WHERE spreadsheet_id = ? AND gid = ?', key).fetchone()
+                if appended_from and found and found[0] == appended_from:
+                    seq = self._conn.execute(
+                        'SELECT COALESCE(MAX(seq), -1) + 1 FROM sheet_chunks WHERE spreadsheet_id = ? AND gid = ?',
+                        key).fetchone()[0]
+                    new_rows = rows[appended_from:]
+                    self._counters['appends'] += 1
+                else:
+                    self._conn.execute('DELETE FROM sheet_chunks WHERE spreadsheet_id = ? AND gid = ?', key)
+                    seq, new_rows = 0, rows
+                    self._counters['rewrites'] += 1
+                if new_rows:
+                    self._conn.execute('INSERT INTO sheet_chunks VALUES (?, ?, ?, ?)', (*key, seq, _encode_rows(new_rows)))
+                self._conn.execute('INSERT OR REPLACE INTO sheets VALUES (?, ?, ?, ?, ?)',
+                                   (*key, version, fetched_at, len(rows)))
+            self.track(key, rows, version)
+        except Exception as e:
+            self._counters['errors'] += 1
+            logger.error("Error persisting sheet %s: %s", key, e)
+            return
+        # A state queued before these rows were written can be saved now
+        self._write_state(key)
+
+    def track(self, key, rows, version):
+        """Record that ``rows`` are the persisted rows of a sheet at ``version``"""
+        self._written[key] = (weakref.ref(rows), version)
+
+    def load_states(self):
+        """Return {(spreadsheet_id, gid): {'name', 'version', 'row_count', 'meta', 'section'}} for every persisted state.
+
+        ``section(name)`` returns a section of the state's image as a memoryview.
+        """
+        states = {}
+        with self._lock:
+            for sheet_id, gid, name, version, row_count, meta, data in self._conn.execute(
+                    'SELECT spreadsheet_id, gid, name, version, row_count, meta, data FROM sheet_states'):
+                meta = json.loads(meta)
+                states[(sheet_id, gid)] = {
+                    'name': name, 'version': version, 'row_count': row_count, 'meta': meta['image'],
+                    'section': functools.partial(self._section, memoryview(data), meta['sections'])
+                }
+        return states
+
+    @staticmethod
+    def _section(data, layout, name):
+        return section_view(data, layout[name])
+
+    def save_state(self, key, name, rows, state):
+        """Queue a write of the derived state ``name`` of a sheet, built from its cached ``rows``.
+
+        States queued before the writer gets to them are coalesced, so only
+        the latest is written, and only once ``rows`` are the persisted rows
+        of the sheet.
+        """
+        with self._pending_lock:
+            queued = self._queued_rows.get(key)
+            if queued is not None and queued() is rows:
+                return
+            self._queued_rows[key] = weakref.ref(rows)
+            self._pending_states[key] = (name, rows, state)
+        self._writer.submit(self._write_state, key)
+
+    def _write_state(self, key):
+        with self._pending_lock:
+            pending, written = self._pending_states.get(key), self._written.get(key)
+            if pending is None or written is None or written[0]() is not pending[1]:
+                return
+            name, rows, state = self._pending_states.pop(key)
+        try:
+            meta, sections = state.image(rows)
+            layout, views = layout_sections(sections)
+            data = b''.join(iter_section_bytes(layout, views))
+            meta = json.dumps({'image': meta, 'sections': layout})
+            with self._lock, self._conn:
+                self._conn.execute('INSERT OR REPLACE INTO sheet_states VALUES (?, ?, ?, ?, ?, ?, ?)',
+                                   (*key, name, written[1], len(rows), meta, data))
+            self._counters['states'] += 1
+        except Exception as e:
+            self._counters['errors'] += 1
+            logger.error("Error persisting %s state of sheet %s: %s", name, key, e)
+
+    def flush(self):
+        """Wait for queued writes to finish"""
+        self._writer.submit(lambda: None).result()
+
+    def stats(self):
+        """Return write counters and the database size"""
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            size = 0
+        return dict(self._counters, path=self.path, bytes=size)
+
+class SheetCache:
+    """In-process cache of sheet rows keyed by (spreadsheet_id, gid).
+
+    Fresh entries are returned directly. Entries older than ``ttl`` are
+    returned stale while a background thread refetches them; entries older
+    than ``max_stale`` (or missing) are fetched on the calling thread.
+    Concurrent fetches for the same sheet are coalesced into one call.
+    """
+
+    def __init__(self, fetcher, ttl=SHEET_CACHE_TTL, max_stale=SHEET_CACHE_MAX_STALE, clock=time.monotonic, store=None):
+        self.fetcher = fetcher
+        # Optional SheetSnapshotStore every new sheet version is written to
+        self.store = store
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.clock = clock
+        self._entries = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'coalesced': 0, 'refreshes': 0, 'errors': 0}
+        # Bumped by clear() so versions issued before and after never collide
+        self._generation = 0
+
+    def get(self, spreadsheet_id, worksheet_gid):
+        """Return cached rows for a sheet, fetching or refreshing as needed"""
+        key = (spreadsheet_id, str(worksheet_gid))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = self.clock() - entry['fetched_at']
+                if age < self.ttl:
+                    self._counters['hits'] += 1
+                    return entry['data']
+                if age < self.max_stale:
+                    self._counters['stale_hits'] += 1
+                    if key not in self._inflight:
+                        self._inflight[key] = threading.Event()
+                        threading.Thread(target=self._refresh, args=(key,), daemon=True).start()
+                    return entry['data']
+            self._counters['misses'] += 1
+            event = self._inflight.get(key)
+            owner = event is None
+            if owner:
+                event = self._inflight[key] = threading.Event()
+            else:
+                self._counters['coalesced'] += 1
+
+        if owner:
+            self._refresh(key)
+        else:
+            event.wait()
+
+        with self._lock:
+            entry = self._entries.get(key)
+        # An expired entry is still better than nothing if the refetch failed
+        return entry['data'] if entry else None
+
+    def _refresh(self, key):
+        """Fetch a sheet and store the result, waking any waiting callers; returns whether it succeeded"""
+        data = None
+        try:
+            data = self.fetcher(*key)
+        except Exception as e:
+            logger.error("Error refreshing cached sheet %s: %s", key, e)
+        try:
+            with self._lock:
+                prev = self._entries.get(key)
+            if data:
+                if prev is None:
+                    data = SheetRows(data)
+                    version = 1
+                else:
+                    data = next_sheet_rows(prev['data'], data)
+                    version = prev['version'] if data is prev['data'] else prev['version'] + 1
+                with self._lock:
+                    self._entries[key] = {'data': data, 'fetched_at': self.clock(), 'version': version}
+                    self._counters['refreshes'] += 1
+                if self.store is not None and (prev is None or version != prev['version']):
+                    appended_from = len(prev['data']) if prev and data.extends(prev['data']) else 0
+                    self.store.save(key, data, version, appended_from)
+            else:
+                with self._lock:
+                    self._counters['errors'] += 1
+        finally:
+            with self._lock:
+                self._inflight.pop(key).set()
+        return bool(data)
+
+    def refresh(self, spreadsheet_id, worksheet_gid):
+        """Refetch a sheet now, whatever its age, and return its rows (None if the refetch failed)"""
+        key = (spreadsheet_id, str(worksheet_gid))
+        with self._lock:
+            event = self._inflight.get(key)
+            owner = event is None
+            if owner:
+                event = self._inflight[key] = threading.Event()
+        if owner:
+            if not self._refresh(key):
+                return None
+        else:
+            event.wait()
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry['data'] if entry else None
+
+    def peek(self, spreadsheet_id, worksheet_gid):
+        """Return the cached rows for a sheet without fetching or counting a lookup"""
+        entry = self._entries.get((spreadsheet_id, str(worksheet_gid)))
+        return entry['data'] if entry else None
+
+    def version(self, spreadsheet_id, worksheet_gid):
+        """Return the content version of a cached sheet (0 if not cached)"""
+        entry = self._entries.get((spreadsheet_id, str(worksheet_gid)))
+        return entry['version'] if entry else 0
+
+    def fingerprint(self, sheets):
+        """Return a token that changes whenever any of the given (spreadsheet_id, gid) sheets changes"""
+        versions = ','.join(str(self.version(sheet_id, gid)) for sheet_id, gid in sheets)
+        return f'{self._generation}:{versions}'
+
+    def stats(self):
+        """Return hit/miss counters and per-sheet entry ages"""
+        with self._lock:
+            counters = dict(self._counters)
+            now = self.clock()
+            entries = [{
+                'spreadsheet_id': key[0],
+                'gid': key[1],
+                'rows': len(entry['data']),
+                'version': entry['version'],
+                'age_seconds': round(now - entry['fetched_at'], 3)
+            } for key, entry in self._entries.items()]
+        lookups = counters['hits'] + counters['stale_hits'] + counters['misses']
+        counters['hit_ratio'] = (counters['hits'] + counters['stale_hits']) / lookups if lookups else 0
+        counters['ttl'] = self.ttl
+        counters['max_stale'] = self.max_stale
+        counters['entries'] = entries
+        return counters
+
+    def seed(self, sheets):
+        """Install persisted sheets as stale entries: served at once and refetched in the background"""
+        with self._lock:
+            for key, sheet in sheets.items():
+                if key not in self._entries:
+                    self._entries[key] = {'data': SheetRows(sheet['data']), 'fetched_at': self.clock() - self.ttl,
+                                          'version': sheet['version']}
+
+    def clear(self):
+        """Drop all cached sheets and reset counters"""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            for name in self._counters:
+                self._counters[name] = 0
+
+# Refreshes sync incrementally from the cached rows; sync_sheet_data resolves
+# get_sheet_data at call time so it can be swapped out (e.g. in tests)
+sheet_cache = SheetCache(lambda sheet_id, gid: sync_sheet_data(sheet_id, gid, sheet_cache.peek(sheet_id, gid)),
+                         store=SheetSnapshotStore(SNAPSHOT_DB) if SNAPSHOT_DB and not IN_POOL_WORKER else None)
+
+def restore_sheet_cache(cache=None):
+    """Seed the sheet cache from its snapshot store so the first requests need not wait on Google.
+
+    Restored rows count as a full sync made when they were fetched, so the
+    next refresh only reads rows appended since then. Derived states saved
+    for the same sheet versions are restored too, so they are not rebuilt.
+    """
+    cache = cache or sheet_cache
+    if cache.store is None:
+        return 0
+    start = time.perf_counter()
+    try:
+        sheets = cache.store.load()
+    except Exception as e:
+        logger.error("Error loading sheet snapshots from %s: %s", cache.store.path, e)
+        return 0
+    cache.seed(sheets)
+    for key, sheet in sheets.items():
+        _last_full_sync.setdefault(key, time.monotonic() - (time.time() - sheet['fetched_at']))
+        rows = cache.peek(*key)
+        if rows is not None and cache.version(*key) == sheet['version']:
+            cache.store.track(key, rows, sheet['version'])
+    states = restore_sheet_states(cache, sheets) if cache is sheet_cache else 0
+    logger.info("Restored %d sheets and %d derived states from %s in %.3fs",
+                len(sheets), states, cache.store.path, time.perf_counter() - start)
+    return len(sheets)
+
+def restore_sheet_states(cache, sheets):
+    """Install persisted derived states whose sheet version and row count match the restored rows"""
+    try:
+        states = cache.store.load_states()
+    except Exception as e:
+        logger.error("Error loading derived states from %s: %s", cache.store.path, e)
+        return 0
+    restored = 0
+    for name, (sheet_id, gid) in configured_sheets().items():
+        key = (sheet_id, str(gid))
+        saved, sheet, rows = states.get(key), sheets.get(key), cache.peek(*key)
+        if (saved is None or sheet is None or rows is None or saved['name'] != name
+                or (saved['version'], saved['row_count']) != (sheet['version'], len(rows))):
+            continue
+        try:
+            state = SHEET_STATE_BUILDERS[name].from_image(saved['meta'], saved['section'], rows)
+        except Exception as e:
+            logger.error("Error restoring %s state from %s: %s", name, cache.store.path, e)
+            continue
+        sheet_state_holder(name).restore(rows, state)
+        restored += 1
+    return restored
+
+def get_cached_sheet_data(spreadsheet_id=None, worksheet_gid=None):
+    """Fetch sheet data through the in-process sheet cache"""
+    sheet_id = spreadsheet_id or SPREADSHEET_ID
+    gid = worksheet_gid if worksheet_gid is not None else WORKSHEET_GID
+    return sheet_cache.get(sheet_id, gid)
+
+_sheet_fetch_pool = ThreadPoolExecutor(max_workers=SHEET_FETCH_WORKERS, thread_name_prefix='sheet-fetch')
+
+# Sheets /api/data is built from; the positions sheet only warms the cache
+DATA_SHEETS = ('transfers', 'orders')
+
+def configured_sheets():
+    """Return the (spreadsheet_id, gid) of every sheet the dashboard reads, by name"""
+    sheets = {
+        'transfers': (SPREADSHEET_ID, WORKSHEET_GID),
+        'orders': (ORDERS_SPREADSHEET_ID, ORDERS_WORKSHEET_GID)
+    }
+    if USE_POSITIONS_SHEET:
+        sheets['positions'] = (POSITIONS_SPREADSHEET_ID or SPREADSHEET_ID, POSITIONS_WORKSHEET_GID or WORKSHEET_GID)
+    return sheets
+
+def fetch_sheets(sheets, timeout=None, fetcher=None):
+    """Fetch several sheets concurrently on the shared fetch pool.
+
+    ``sheets`` maps a name to (spreadsheet_id, gid). ``timeout`` is either a
+    number of seconds applied to every sheet or a dict of per-sheet timeouts
+    (missing names use SHEET_FETCH_TIMEOUT). Returns ``(results, errors)``:
+    results maps every name to its rows, or None when that sheet failed or
+    timed out, and errors maps failed names to a message. A timed-out fetch
+    keeps running in the background, so its result still lands in the cache.
+    """
+    fetcher = fetcher or get_cached_sheet_data
+    start = time.monotonic()
+    # Workers run in a copy of the caller's context so their stages reach its Server-Timing
+    futures = {name: _sheet_fetch_pool.submit(contextvars.copy_context().run, fetcher, sheet_id, gid)
+               for name, (sheet_id, gid) in sheets.items()}
+    results = {}
+    errors = {}
+    for name, future in futures.items():
+        limit = timeout.get(name, SHEET_FETCH_TIMEOUT) if isinstance(timeout, dict) else timeout
+        if limit is None:
+            limit = SHEET_FETCH_TIMEOUT
+        try:
+            results[name] = future.result(timeout=max(0, start + limit - time.monotonic()))
+        except FutureTimeoutError:
+            results[name] = None
+            errors[name] = f'timed out after {limit:g}s'
+        except Exception as e:
+            results[name] = None
+            errors[name] = str(e)
+        else:
+            if not results[name]:
+                errors[name] = 'no data returned'
+    if errors:
+        logger.warning("Partial sheet fetch, failed sheets: %s", errors)
+    return results, errors
+
+# Tried in order; the first format that parses wins
+DATE_FORMATS = [
+    '%m/%d/%Y',      # 11/29/2021
+    '%m/%d/%Y %I:%M %p',  # 11/29/2021 11:28 AM
+    '%Y-%m-%d',
+    '%d/%m/%Y',
+    '%Y/%m/%d',
+    '%m-%d-%Y',
+    '%d-%m-%Y',
+    '%B %d, %Y',
+    '%b %d, %Y',
+    '%d %B %Y',
+    '%d %b %Y',
+    '%m/%d/%Y %H:%M:%S',  # 11/04/2025 13:51:17 (timezone suffix stripped)
+    '%m/%d/%Y %H:%M',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%dT%H:%M:%S'
+]
+DATE_CACHE_SIZE = 65536
+# Number of values sampled from a column to infer its date format
+DATE_SAMPLE_SIZE = 64
+
+# Trailing timezone abbreviation after a time, e.g. "... 13:51:17 EST"
+_TZ_SUFFIX_RE = re.compile(r'(?<=\d)\s+(?!AM$|PM$)[A-Z]{2,5}$')
+# Same field patterns strptime uses (see the stdlib _strptime module)
+_DATE_DIRECTIVE_RES = {
+    'm': r'(?P<m>1[0-2]|0[1-9]|[1-9])', 'd': r'(?P<d>3[01]|[12]\d|0[1-9]|[1-9]| [1-9])',
+    'I': r'(?P<I>1[0-2]|0[1-9]|[1-9])', 'H': r'(?P<H>2[0-3]|[0-1]\d|\d)',
+    'M': r'(?P<M>[0-5]\d|\d)', 'S': r'(?P<S>6[0-1]|[0-5]\d|\d)',
+    'Y': r'(?P<Y>\d\d\d\d)', 'p': r'(?P<p>am|pm)',
+    'B': r'[^\W\d_]+', 'b': r'[^\W\d_]+'
+}
+
+def _date_format_re(fmt):
+    """Build a regex matching every string strptime could accept for fmt"""
+    parts = []
+    for i, piece in enumerate(fmt.split('%')):
+        if i:
+            parts.append(_DATE_DIRECTIVE_RES[piece[0]])
+            piece = piece[1:]
+        parts.append(r'\s+'.join(re.escape(p) for p in re.split(r'\s+', piece)))
+    return re.compile(''.join(parts), re.IGNORECASE)
+
+# Numeric formats are parsed straight from the regex groups; month-name
+# formats use the regex as a cheap pre-check before strptime
+_DATE_FORMAT_RES = {fmt: _date_format_re(fmt) for fmt in DATE_FORMATS}
+
+def _clean_date_text(date_str):
+    text = str(date_str).strip()
+    # Only a trailing capital letter can start a timezone suffix
+    return _TZ_SUFFIX_RE.sub('', text) if text[-1:].isupper() else text
+
+def _strptime_or_none(text, fmt):
+    match = _DATE_FORMAT_RES[fmt].fullmatch(text)
+    if not match:
+        return None
+    if '%B' in fmt or '%b' in fmt:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            return None
+    g = match.groupdict()
+    hour = int(g.get('H') or g.get('I') or 0)
+    if g.get('p'):
+        hour = hour % 12 + (12 if g['p'].upper() == 'PM' else 0)
+    try:
+        return datetime(int(g['Y']), int(g['m']), int(g['d']), hour,
+                        int(g.get('M') or 0), int(g.get('S') or 0))
+    except ValueError:
+        return None
+
+@functools.lru_cache(maxsize=DATE_CACHE_SIZE)
+def _parse_date_text(text, hint=None):
+    """Return (datetime, format) for cleaned date text, trying ``hint`` first"""
+    if hint:
+        date_obj = _strptime_or_none(text, hint)
+        if date_obj:
+            return date_obj, hint
+    for fmt in DATE_FORMATS:
+        if fmt != hint:
+            date_obj = _strptime_or_none(text, fmt)
+            if date_obj:
+                return date_obj, fmt
+    return None, None
+
 def parse_date(date_str):
     """Parse date string in various formats"""
     if not date_str:
         return None
-    
-    date_formats = [
-        '%m/%d/%Y',      # 11/29/2021
-        '%m/%d/%Y %I:%M %p',  # 11/29/2021 11:28 AM
-        '%Y-%m-%d',
-        '%d/%m/%Y',
-        '%Y/%m/%d',
-        '%m-%d-%Y',
-        '%d-%m-%Y',
-        '%B %d, %Y',
-        '%b %d, %Y',
-        '%d %B %Y',
-        '%d %b %Y'
-    ]
-    
-    for fmt in date_formats:
-        try:
-            return datetime.strptime(str(date_str).strip(), fmt)
-        except:
-            continue
-    
-    return None
+    return _parse_date_text(_clean_date_text(date_str))[0]
+
+def infer_date_format(values, sample_size=DATE_SAMPLE_SIZE):
+    """Return the most common date format among a sample of column values"""
+    present = [v for v in values if v]
+    if not present:
+        return None
+    step = max(1, len(present) // sample_size)
+    counts = {}
+    for value in present[::step][:sample_size]:
+        fmt = _parse_date_text(_clean_date_text(value))[1]
+        if fmt:
+            counts[fmt] = counts.get(fmt, 0) + 1
+    return max(counts, key=counts.get) if counts else None
+
+def parse_date_column(values):
+    """Parse a column of date strings, fast-pathing the column's dominant format.
+
+    Values that are ambiguous between formats (e.g. 03/04/2025) resolve to the
+    dominant format of their column rather than the first format in
+    DATE_FORMATS.
+    """
+    with timed('parse'):
+        values = list(values)
+        hint = infer_date_format(values)
+        return [_parse_date_text(_clean_date_text(v), hint)[0] if v else None for v in values]
+
+def transfer_date_text(row):
+    """Return the raw date text of a transfer row"""
+    return (row.get('transfer date') or row.get('Transfer Initiated') or 
+            row.get('Date') or row.get('date') or '')
+
+def transfer_amount_text(row):
+    """Return the raw amount of a transfer row, preferring "Amount Numeric" """
+    return row.get('Amount Numeric') or row.get('Amount') or '0'
 
 def process_monthly_cash_flow(data):
     """Process data for monthly cash flow chart"""
     monthly_data = {}
+    # Get date and amount from various possible column names, parsed as columns
+    dates = parse_date_column(transfer_date_text(row) for row in data)
+    amounts = parse_amount_column([transfer_amount_text(row) for row in data])
     
-    for row in data:
-        # Get date from various possible column names
-        date_str = (row.get('transfer date') or row.get('Transfer Initiated') or 
-                   row.get('Date') or row.get('date') or '')
-        
-        # Get amount - prefer "Amount Numeric" if available, otherwise parse "Amount"
-        amount_str = row.get('Amount Numeric') or row.get('Amount') or '0'
-        amount = 0
-        
-        try:
-            # Remove $, commas, and spaces, then convert
-            amount = float(str(amount_str).replace('$', '').replace(',', '').replace(' ', '').replace('+', '') or 0)
-        except:
-            amount = 0
+    for row, date_obj, amount in zip(data, dates, amounts):
         
         # Determine if incoming or outgoing based on Type or amount sign
         transfer_type = row.get('Type', '').lower()
         is_incoming = amount > 0 or 'incoming' in transfer_type
         
-        if date_str:
-            date_obj = parse_date(date_str)
-            if date_obj:
-                month_key = date_obj.strftime('%Y-%m')
-                
-                if month_key not in monthly_data:
-                    monthly_data[month_key] = {'incoming': 0, 'outgoing': 0}
-                
-                if is_incoming:
-                    monthly_data[month_key]['incoming'] += abs(amount)
-                else:
-                    monthly_data[month_key]['outgoing'] += abs(amount)
+        if date_obj:
+            month_key = date_obj.strftime('%Y-%m')
+            
+            if month_key not in monthly_data:
+                monthly_data[month_key] = {'incoming': 0, 'outgoing': 0}
+            
+            if is_incoming:
+                monthly_data[month_key]['incoming'] += abs(amount)
+            else:
+                monthly_data[month_key]['outgoing'] += abs(amount)
     
     # Sort by date
     sorted_months = sorted(monthly_data.keys())
@@ -201,37 +1446,26 @@ def process_monthly_cash_flow(data):
 def process_yearly_transfer_volume(data):
     """Process data for yearly transfer volume chart"""
     yearly_data = {}
+    # Get date and amount from various possible column names, parsed as columns
+    dates = parse_date_column(transfer_date_text(row) for row in data)
+    amounts = parse_amount_column([transfer_amount_text(row) for row in data])
     
-    for row in data:
-        # Get date from various possible column names
-        date_str = (row.get('transfer date') or row.get('Transfer Initiated') or 
-                   row.get('Date') or row.get('date') or '')
-        
-        # Get amount - prefer "Amount Numeric" if available
-        amount_str = row.get('Amount Numeric') or row.get('Amount') or '0'
-        amount = 0
-        
-        try:
-            amount = float(str(amount_str).replace('$', '').replace(',', '').replace(' ', '').replace('+', '') or 0)
-        except:
-            amount = 0
+    for row, date_obj, amount in zip(data, dates, amounts):
         
         # Determine if incoming or outgoing
         transfer_type = row.get('Type', '').lower()
         is_incoming = amount > 0 or 'incoming' in transfer_type
         
-        if date_str:
-            date_obj = parse_date(date_str)
-            if date_obj:
-                year = date_obj.strftime('%Y')
-                
-                if year not in yearly_data:
-                    yearly_data[year] = {'incoming': 0, 'outgoing': 0}
-                
-                if is_incoming:
-                    yearly_data[year]['incoming'] += abs(amount)
-                else:
-                    yearly_data[year]['outgoing'] += abs(amount)
+        if date_obj:
+            year = date_obj.strftime('%Y')
+            
+            if year not in yearly_data:
+                yearly_data[year] = {'incoming': 0, 'outgoing': 0}
+            
+            if is_incoming:
+                yearly_data[year]['incoming'] += abs(amount)
+            else:
+                yearly_data[year]['outgoing'] += abs(amount)
     
     sorted_years = sorted(yearly_data.keys())
     
@@ -271,19 +1505,12 @@ def process_transaction_status(data):
 def process_transfer_by_type(data):
     """Process data for transfer volume by type"""
     type_data = {}
+    amounts = parse_amount_column([transfer_amount_text(row) for row in data])
     
-    for row in data:
+    for row, amount in zip(data, amounts):
         transfer_type = row.get('Type', row.get('type', row.get('Transfer Type', '')))
-        
-        # Get amount - prefer "Amount Numeric" if available
-        amount_str = row.get('Amount Numeric') or row.get('Amount') or '0'
-        amount = 0
-        
-        try:
-            # Remove $, commas, spaces, and + sign, use absolute value
-            amount = abs(float(str(amount_str).replace('$', '').replace(',', '').replace(' ', '').replace('+', '') or 0))
-        except:
-            amount = 0
+        # Volumes use the absolute amount
+        amount = abs(amount)
         
         if transfer_type:
             if transfer_type not in type_data:
@@ -299,20 +1526,10 @@ def calculate_summary_metrics(data):
     """Calculate summary metrics from the data"""
     total_incoming_completed = 0
     total_outgoing_completed = 0
+    completed = [row for row in data if row.get('Status', '').strip().lower() == 'completed']
+    amounts = parse_amount_column([transfer_amount_text(row) for row in completed])
     
-    for row in data:
-        status = row.get('Status', '').strip()
-        if status.lower() != 'completed':
-            continue
-        
-        # Get amount
-        amount_str = row.get('Amount Numeric') or row.get('Amount') or '0'
-        amount = 0
-        
-        try:
-            amount = float(str(amount_str).replace('$', '').replace(',', '').replace(' ', '').replace('+', '') or 0)
-        except:
-            amount = 0
+    for row, amount in zip(completed, amounts):
         
         # Determine if incoming or outgoing
         transfer_type = row.get('Type', '').lower()
@@ -331,49 +1548,659 @@ def calculate_summary_metrics(data):
         'net_account_value': net_account_value
     }
 
-def parse_float(value, default=0):
-    """Parse float value from various formats"""
-    if not value:
-        return default
-    try:
-        # Remove $, commas, spaces, and other characters
-        cleaned = str(value).replace('$', '').replace(',', '').replace(' ', '').replace('+', '').replace('(', '-').replace(')', '')
-        return float(cleaned) if cleaned else default
-    except:
-        return default
+class TransferAggregator:
+    """Running accumulators behind the /api/data transfer views.
 
-def process_order_analysis(orders_data):
-    """Process data for order analysis view from orders sheet"""
-    if not orders_data:
+    ``add_rows`` parses each row's amount and date once and updates the
+    monthly, yearly, status, type and summary accumulators together, so new
+    rows can be folded in without revisiting earlier ones. ``result`` returns
+    the same payloads as process_monthly_cash_flow,
+    process_yearly_transfer_volume, process_transaction_status,
+    process_transfer_by_type and calculate_summary_metrics.
+    """
+
+    def __init__(self):
+        self.monthly_data = {}
+        self.yearly_data = {}
+        self.status_counts = {}
+        self.type_data = {}
+        self.total_incoming_completed = 0
+        self.total_outgoing_completed = 0
+        self._result = None
+
+    def copy(self):
+        """Return an aggregator with the same totals that can be extended independently"""
+        other = TransferAggregator()
+        other.monthly_data = {k: dict(v) for k, v in self.monthly_data.items()}
+        other.yearly_data = {k: dict(v) for k, v in self.yearly_data.items()}
+        other.status_counts = dict(self.status_counts)
+        other.type_data = dict(self.type_data)
+        other.total_incoming_completed = self.total_incoming_completed
+        other.total_outgoing_completed = self.total_outgoing_completed
+        other._result = self._result
+        return other
+
+    def image(self, rows=None):
+        """Return (meta, sections) holding the accumulators, for ``from_image``"""
         return {
-            'total_profit': 0,
-            'stock_symbols': [],
-            'buy_orders': [],
-            'sell_orders': []
+            'monthly': [[y, m, v['incoming'], v['outgoing']] for (y, m), v in self.monthly_data.items()],
+            'yearly': [[y, v['incoming'], v['outgoing']] for y, v in self.yearly_data.items()],
+            'status_counts': list(self.status_counts.items()),
+            'type_data': list(self.type_data.items()),
+            'completed': [self.total_incoming_completed, self.total_outgoing_completed]
+        }, {}
+
+    @classmethod
+    def from_image(cls, meta, section, rows=None):
+        """Return an aggregator restored from ``image()``"""
+        aggregator = cls()
+        aggregator.monthly_data = {(y, m): {'incoming': i, 'outgoing': o} for y, m, i, o in meta['monthly']}
+        aggregator.yearly_data = {y: {'incoming': i, 'outgoing': o} for y, i, o in meta['yearly']}
+        aggregator.status_counts = dict(meta['status_counts'])
+        aggregator.type_data = dict(meta['type_data'])
+        aggregator.total_incoming_completed, aggregator.total_outgoing_completed = meta['completed']
+        return aggregator
+
+    def add_rows(self, rows, offset=0):
+        monthly_data = self.monthly_data
+        yearly_data = self.yearly_data
+        status_counts = self.status_counts
+        type_data = self.type_data
+        dates = parse_date_column(transfer_date_text(row) for row in rows)
+        amounts = parse_amount_column([transfer_amount_text(row) for row in rows])
+        
+        for row, date_obj, amount in zip(rows, dates, amounts):
+            magnitude = abs(amount)
+            is_incoming = amount > 0 or 'incoming' in row.get('Type', '').lower()
+            
+            if date_obj:
+                month = monthly_data.get((date_obj.year, date_obj.month))
+                if month is None:
+                    month = monthly_data[(date_obj.year, date_obj.month)] = {'incoming': 0, 'outgoing': 0}
+                year = yearly_data.get(date_obj.year)
+                if year is None:
+                    year = yearly_data[date_obj.year] = {'incoming': 0, 'outgoing': 0}
+                direction = 'incoming' if is_incoming else 'outgoing'
+                month[direction] += magnitude
+                year[direction] += magnitude
+            
+            status = row.get('Status', row.get('status', ''))
+            if status:
+                status_normalized = status.strip().capitalize()
+                status_counts[status_normalized] = status_counts.get(status_normalized, 0) + 1
+            
+            transfer_type = row.get('Type', row.get('type', row.get('Transfer Type', '')))
+            if transfer_type:
+                type_data[transfer_type] = type_data.get(transfer_type, 0) + magnitude
+            
+            if row.get('Status', '').strip().lower() == 'completed':
+                if is_incoming:
+                    self.total_incoming_completed += magnitude
+                else:
+                    self.total_outgoing_completed += magnitude
+        self._result = None
+
+    def result(self):
+        if self._result is not None:
+            return self._result
+        monthly_data = self.monthly_data
+        yearly_data = self.yearly_data
+        months = sorted((datetime(y, m, 1).strftime('%Y-%m'), (y, m)) for y, m in monthly_data)
+        years = sorted((datetime(y, 1, 1).strftime('%Y'), y) for y in yearly_data)
+        total = sum(self.status_counts.values())
+        
+        self._result = {
+            'monthly_cash_flow': {
+                'months': [label for label, _ in months],
+                'incoming': [monthly_data[k]['incoming'] for _, k in months],
+                'outgoing': [monthly_data[k]['outgoing'] for _, k in months],
+                'net_flow': [monthly_data[k]['incoming'] - monthly_data[k]['outgoing'] for _, k in months]
+            },
+            'yearly_transfer_volume': {
+                'years': [label for label, _ in years],
+                'incoming': [yearly_data[k]['incoming'] for _, k in years],
+                'outgoing': [yearly_data[k]['outgoing'] for _, k in years]
+            },
+            'transaction_status': {
+                'labels': list(self.status_counts.keys()),
+                'values': list(self.status_counts.values()),
+                'percentages': [(v / total * 100) for v in self.status_counts.values()]
+            },
+            'transfer_by_type': {
+                'types': list(self.type_data.keys()),
+                'amounts': list(self.type_data.values())
+            },
+            'summary_metrics': {
+                'total_incoming_completed': self.total_incoming_completed,
+                'total_outgoing_completed': self.total_outgoing_completed,
+                'net_account_value': self.total_incoming_completed - self.total_outgoing_completed
+            }
         }
-    
-    # Debug: Print first row to see column names
+        return self._result
+
+def aggregate_transfers(data):
+    """Compute every transfer view for /api/data in a single pass"""
+    aggregator = TransferAggregator()
+    aggregator.add_rows(data)
+    return aggregator.result()
+
+def parse_float(value, default=0):
+    """Parse float value from various formats"""
+    if not value:
+        return default
+    try:
+        # Remove $, commas, spaces, and other characters
+        cleaned = str(value).replace('$', '').replace(',', '').replace(' ', '').replace('+', '').replace('(', '-').replace(')', '')
+        return float(cleaned) if cleaned else default
+    except:
+        return default
+
+def _float_or(text, default):
+    try:
+        return float(text) if text else default
+    except ValueError:
+        return default
+
+def parse_amount_column(values, default=0):
+    """Parse a column of currency or quantity cells into an array('d'), like parse_float per cell.
+
+    The cells are joined into one string so the $ , space + ( ) cleanup runs
+    once over the whole column, then the numbers are converted in bulk: by
+    NumPy's text parser when it is installed and the column has no blanks,
+    otherwise in one pass of float(). Columns with unparsable cells fall
+    back to a per-cell pass that substitutes ``default``.
+    """
+    with timed('parse'):
+        values = values if isinstance(values, list) else list(values)
+        if not values:
+            return array('d')
+        try:
+            text = '\n'.join(values)
+        except TypeError:
+            # Numbers from the Sheets API, or None for missing cells
+            text = '\n'.join([v if v.__class__ is str else (str(v) if v else '') for v in values])
+        text = text.replace('$', '').replace(',', '').replace(' ', '').replace('+', '').replace('(', '-').replace(')', '')
+        count = len(values)
+        # NumPy skips blank lines, so only columns without blanks can take that path; it also
+        # reads a column of nothing but whitespace (a lone '\t' cell) as [-1.0]
+        if (np is not None and '\n\n' not in text and text[:1] != '\n' and text[-1:] != '\n'
+                and not text.isspace()):
+            try:
+                parsed = np.fromstring(text, sep='\n')
+            except ValueError:
+                parsed = None
+            if parsed is not None and len(parsed) == count:
+                return array('d', parsed.tobytes())
+        parts = text.split('\n')
+        if len(parts) != count:
+            # A cell contained a newline
+            return array('d', [parse_float(v, default) for v in values])
+        try:
+            return array('d', [float(p) if p else default for p in parts])
+        except ValueError:
+            return array('d', [_float_or(p, default) for p in parts])
+
+class AmountColumns:
+    """Numeric columns of a batch of rows, each bulk-parsed on first access.
+
+    ``columns[key][i]`` is ``parse_float(rows[i].get(key, ''))``.
+    """
+
+    def __init__(self, rows):
+        self.rows = rows
+        self._columns = {}
+
+    def __getitem__(self, key):
+        column = self._columns.get(key)
+        if column is None:
+            column = self._columns[key] = parse_amount_column([row.get(key, '') for row in self.rows])
+        return column
+
+# Column keywords per logical order field: (include keywords, exclude keywords).
+# A header maps to a field when its lowercase name contains any include
+# keyword and none of the exclude keywords ('' matches every header).
+ORDER_COLUMN_KEYWORDS = {
+    'symbol': (['symbol', 'ticker', 'stock', 'instrument', 'security', 'name'], []),
+    'side': (['type', 'side', 'action', 'direction', 'order type', 'order_type'], []),
+    'price': (['price', 'execution price', 'exec_price', 'fill price', 'fill_price',
+               'trade price', 'trade_price', 'avg price', 'avg_price', 'average price'], []),
+    'price_any': ([''], ['quantity', 'qty', 'shares', 'profit', 'pnl', 'date', 'time', 'symbol', 'ticker']),
+    'qty': (['quantity', 'qty', 'shares', 'share', 'volume', 'size', 'amount',
+             'executed', 'filled', 'exec_qty', 'fill_qty'], []),
+    'profit': (['profit', 'pnl', 'p&l', 'gain', 'loss', 'realized', 'unrealized',
+                'profit/loss', 'profit_loss', 'net pnl', 'net_pnl'], []),
+    'date_time': (['filled time', 'placed time'], []),
+    'date': (['date', 'timestamp', 'execution date', 'exec_date',
+              'fill date', 'fill_date', 'trade date', 'trade_date',
+              'buy date', 'buy_date', 'sell date', 'sell_date', 'order date', 'order_date'],
+             ['time-in-force', 'time_in_force']),
+    'date_any': ([''], ['symbol', 'price', 'quantity', 'qty', 'shares', 'profit', 'pnl', 'amount', 'value',
+                        'total', 'type', 'side', 'time-in-force', 'time_in_force', 'status', 'name']),
+    'total': (['total', 'value', 'amount', 'cost', 'principal'], []),
+    'status': (['status', 'state', 'order status', 'order_status'], []),
+    # Orders list view
+    'id': (['order id', 'orderid', ' id ', 'id', 'trade id', 'transaction id'], ['side']),
+    'name': (['customer', 'customer name', 'client', 'account', 'account name', 'name'], []),
+    'list_date': (['filled time', 'placed time', 'order date', 'date', 'timestamp'], []),
+    'list_total': (['amount', 'value'], ['qty', 'quantity', 'shares']),
+    'list_price': (['price'], []),
+    'list_qty': (['quantity', 'qty', 'shares', 'filled'], []),
+    # Positions sheet
+    'position_qty': (['quantity', 'qty', 'shares', 'share', 'position'], []),
+    'position_cost': (['cost basis', 'avg price', 'average price', 'cost', 'basis'], []),
+}
+
+@functools.lru_cache(maxsize=64)
+def resolve_order_schema(headers):
+    """Map a tuple of sheet headers to the candidate columns for each order field.
+
+    Every row of a sheet shares the same header, so the keyword search runs
+    once per header set instead of once per row. Candidate columns keep the
+    sheet's column order, which is the order the normalizers try them in.
+    """
+    schema = {}
+    lowered = [(h, str(h).lower()) for h in headers]
+    for field, (include, exclude) in ORDER_COLUMN_KEYWORDS.items():
+        schema[field] = tuple(
+            h for h, low in lowered
+            if any(k in low for k in include) and not any(k in low for k in exclude)
+        )
+    return schema
+
+def iter_rows_with_schema(rows):
+    """Yield (row, schema) pairs, resolving the schema only when the header changes"""
+    headers = schema = None
+    for row in rows:
+        keys = tuple(row)
+        if keys != headers:
+            headers = keys
+            schema = resolve_order_schema(keys)
+        yield row, schema
+
+EPOCH_ORDINAL = datetime(1970, 1, 1).toordinal()
+# Epoch day used for orders whose date could not be parsed (sorts first)
+NO_DATE = -(2 ** 31)
+SIDE_BUY = 0
+SIDE_SELL = 1
+# Swaps SIDE_BUY/SIDE_SELL bytes so a side array can be used as a buy mask
+_INVERT_SIDE = bytes.maketrans(b'\x00\x01', b'\x01\x00')
+
+def epoch_day(date_obj):
+    """Return days since 1970-01-01 for a datetime, or NO_DATE for None"""
+    return date_obj.toordinal() - EPOCH_ORDINAL if date_obj else NO_DATE
+
+_TIME_FORMATS = ('%H:%M:%S', '%H:%M', '%I:%M:%S %p', '%I:%M %p')
+
+def time_of_day_seconds(text):
+    """Return seconds since midnight for a time like '14:07:30 EST' or '2:07 PM', or 0 if unparseable"""
+    parts = text.split()
+    if len(parts) > 1 and parts[-1].isalpha() and parts[-1].upper() not in ('AM', 'PM'):
+        parts.pop()  # time zone
+    text = ' '.join(parts)
+    for fmt in _TIME_FORMATS:
+        try:
+            parsed = datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+        return parsed.hour * 3600 + parsed.minute * 60 + parsed.second
+    return 0
+
+class DictColumn:
+    """Dictionary-encoded string column.
+
+    Holds the distinct values, an int code per row and, per value, the list
+    of row positions holding it (so grouping never has to scan every row).
+    """
+
+    def __init__(self, track_positions=False):
+        self.values = []
+        self.codes = array('i')
+        self.positions = [] if track_positions else None
+        self._lookup = {}
+
+    def append(self, value):
+        code = self._lookup.get(value)
+        if code is None:
+            code = self._lookup[value] = len(self.values)
+            self.values.append(value)
+            if self.positions is not None:
+                self.positions.append(array('i'))
+        if self.positions is not None:
+            self.positions[code].append(len(self.codes))
+        self.codes.append(code)
+
+    def extend(self, other):
+        """Append every row of another DictColumn, re-coding its values"""
+        remap = []
+        for value in other.values:
+            code = self._lookup.get(value)
+            if code is None:
+                code = self._lookup[value] = len(self.values)
+                self.values.append(value)
+                if self.positions is not None:
+                    self.positions.append(array('i'))
+            remap.append(code)
+        offset = len(self.codes)
+        if self.positions is not None:
+            if other.positions is not None:
+                for code, rows in zip(remap, other.positions):
+                    self.positions[code].extend(map(offset.__add__, rows))
+            else:
+                for i, code in enumerate(map(remap.__getitem__, other.codes), offset):
+                    self.positions[code].append(i)
+        self.codes.extend(map(remap.__getitem__, other.codes))
+
+    @classmethod
+    def from_codes(cls, values, codes, track_positions=False):
+        """Return a column of ``codes`` into ``values``, copying both"""
+        column = cls(track_positions)
+        column.values = list(values)
+        column.codes = _array_copy(codes)
+        column._lookup = {value: code for code, value in enumerate(column.values)}
+        if track_positions:
+            column.positions = [array('i') for _ in column.values]
+            for i, code in enumerate(column.codes):
+                column.positions[code].append(i)
+        return column
+
+    def copy(self):
+        other = DictColumn()
+        other.values = list(self.values)
+        other.codes = self.codes[:]
+        if self.positions is not None:
+            other.positions = [rows[:] for rows in self.positions]
+        other._lookup = dict(self._lookup)
+        return other
+
+    def __getitem__(self, i):
+        return self.values[self.codes[i]]
+
+    def __len__(self):
+        return len(self.codes)
+
+# Keys of a serialized order, in payload order
+ORDER_FIELDS = ('symbol', 'type', 'price', 'quantity', 'total_value', 'profit', 'date', 'status')
+
+class OrderStore:
+    """Columnar store of normalized buy/sell orders.
+
+    Numeric fields are typed arrays, dates are epoch days (NO_DATE when the
+    date could not be parsed) and string fields are dictionary-encoded,
+    including the time of day that followed the date, if any. Sheet
+    rows are referenced rather than copied; ``to_dicts`` rebuilds the
+    per-order dicts the JSON API returns.
+    """
+
+    NUMERIC_COLUMNS = ('price', 'quantity', 'total_value', 'profit')
+    DICT_COLUMNS = ('symbol', 'type', 'date', 'status', 'time')
+
+    def __init__(self):
+        self.price = array('d')
+        self.quantity = array('d')
+        self.total_value = array('d')
+        self.profit = array('d')
+        self.day = array('l')
+        self.side = array('b')
+        self.symbol = DictColumn(track_positions=True)
+        self.type = DictColumn()
+        self.date = DictColumn()
+        self.status = DictColumn(track_positions=True)
+        self.time = DictColumn()
+        self.rows = []
+        # Epoch day of each distinct date string and seconds since midnight of each distinct time
+        self._value_days = []
+        self._time_seconds = []
+
+    def __len__(self):
+        return len(self.side)
+
+    def append(self, side, symbol, order_type, price, quantity, total_value, profit, date_str, status, row,
+               time_str=''):
+        """Append one order; call index_dates() afterwards to fill its epoch day"""
+        self.side.append(side)
+        self.symbol.append(symbol)
+        self.type.append(order_type)
+        self.price.append(price)
+        self.quantity.append(quantity)
+        self.total_value.append(total_value)
+        self.profit.append(profit)
+        self.date.append(date_str)
+        self.status.append(status)
+        self.time.append(time_str)
+        self.rows.append(row)
+
+    def extend(self, other, rows):
+        """Append the orders of another store whose ``rows`` are positions into ``rows``"""
+        for name in self.NUMERIC_COLUMNS:
+            getattr(self, name).extend(getattr(other, name))
+        self.side.extend(other.side)
+        for name in self.DICT_COLUMNS:
+            getattr(self, name).extend(getattr(other, name))
+        self.rows.extend(map(rows.__getitem__, other.rows))
+
+    def copy(self):
+        """Return a store with the same orders that can be appended to independently"""
+        other = OrderStore()
+        for name in self.NUMERIC_COLUMNS + ('day', 'side'):
+            setattr(other, name, getattr(self, name)[:])
+        for name in self.DICT_COLUMNS:
+            setattr(other, name, getattr(self, name).copy())
+        other.rows = list(self.rows)
+        other._value_days = list(self._value_days)
+        other._time_seconds = list(self._time_seconds)
+        return other
+
+    def index_dates(self):
+        """Fill epoch days for appended orders, parsing each distinct date string once"""
+        values = self.date.values
+        if len(self._value_days) < len(values):
+            parsed = parse_date_column(values[len(self._value_days):])
+            self._value_days.extend(epoch_day(d) for d in parsed)
+        value_days = self._value_days
+        self.day.extend(value_days[c] for c in self.date.codes[len(self.day):])
+
+    def times(self, start, stop):
+        """Return the epoch seconds (date plus time of day) of the orders in [start, stop)"""
+        values = self.time.values
+        if len(self._time_seconds) < len(values):
+            self._time_seconds.extend(map(time_of_day_seconds, values[len(self._time_seconds):]))
+        seconds = map(self._time_seconds.__getitem__, self.time.codes[start:stop])
+        return [day * 86400 + s for day, s in zip(self.day[start:stop], seconds)]
+
+    def side_mask(self, side):
+        """Return a bytes mask that is non-zero for orders on the given side"""
+        mask = self.side.tobytes()
+        return mask.translate(_INVERT_SIDE) if side == SIDE_BUY else mask
+
+    def side_indices(self, side):
+        """Return the positions of all orders on one side, in sheet order"""
+        return list(itertools.compress(range(len(self.side)), self.side_mask(side)))
+
+    def sorted_by_date(self, indices, reverse=True):
+        """Sort positions by date (newest first by default), keeping sheet order for ties"""
+        return sorted(indices, key=self.day.__getitem__, reverse=reverse)
+
+    def total(self, column, indices=None, side=None):
+        """Sum a numeric column over all orders, the given positions or one side"""
+        values = getattr(self, column)
+        if side is not None:
+            if np is not None and values:
+                sides = np.frombuffer(self.side, dtype=np.int8)
+                return float(np.frombuffer(values, dtype=np.float64)[sides == side].sum())
+            return sum(itertools.compress(values, self.side_mask(side)))
+        if indices is None:
+            return sum(values)
+        return sum(map(values.__getitem__, indices))
+
+    def group_total(self, column, by='symbol', indices=None):
+        """Sum a numeric column grouped by a dictionary-encoded column"""
+        values = getattr(self, column)
+        encoded = getattr(self, by)
+        if indices is None and np is not None and values:
+            sums = np.bincount(np.frombuffer(encoded.codes, dtype=np.int32),
+                               weights=np.frombuffer(values, dtype=np.float64),
+                               minlength=len(encoded.values))
+            return dict(zip(encoded.values, sums.tolist()))
+        if indices is None:
+            return {value: sum(map(values.__getitem__, positions))
+                    for value, positions in zip(encoded.values, encoded.positions)}
+        codes = encoded.codes
+        sums = {}
+        for i in indices:
+            code = codes[i]
+            sums[code] = sums.get(code, 0.0) + values[i]
+        return {encoded.values[c]: v for c, v in sums.items()}
+
+    def symbols(self):
+        """Return the distinct non-empty symbols"""
+        return [v for v in self.symbol.values if v]
+
+    def statuses(self):
+        """Return the distinct statuses, excluding the 'N/A' placeholder"""
+        return [v for v in self.status.values if v and v != 'N/A']
+
+    def to_dict(self, i, include_raw=True):
+        order = {
+            'symbol': self.symbol[i] or 'N/A',
+            'type': self.type[i],
+            'price': self.price[i],
+            'quantity': self.quantity[i],
+            'total_value': self.total_value[i],
+            'profit': self.profit[i],
+            'date': self.date[i],
+            'status': self.status[i]
+        }
+        if include_raw:
+            order['raw'] = self.rows[i]
+        return order
+
+    def to_dicts(self, indices, include_raw=True):
+        """Materialize order dicts for many positions, column by column"""
+        def column(values):
+            return map(values.__getitem__, indices)
+
+        def decoded(encoded, display=None):
+            values = [display(v) for v in encoded.values] if display else encoded.values
+            return map(values.__getitem__, column(encoded.codes))
+
+        columns = [
+            decoded(self.symbol, lambda v: v or 'N/A'), decoded(self.type),
+            column(self.price), column(self.quantity), column(self.total_value), column(self.profit),
+            decoded(self.date), decoded(self.status)
+        ]
+        keys = ORDER_FIELDS
+        if include_raw:
+            columns.append(column(self.rows))
+            keys = ORDER_FIELDS + ('raw',)
+        return [dict(zip(keys, values)) for values in zip(*columns)]
+
+def build_order_store(orders_data):
+    """Normalize orders sheet rows into an OrderStore"""
+    store = OrderStore()
     if orders_data:
-        print("Sample row keys:", list(orders_data[0].keys()) if orders_data else [])
-        print("Sample row values:", list(orders_data[0].values())[:5] if orders_data else [])
-    
-    # Get all unique stock symbols
-    stock_symbols = set()
-    buy_orders = []
-    sell_orders = []
-    total_profit = 0
-    
-    # Process each row - try to identify columns
-    for row in orders_data:
-        # Try to find stock symbol column (case-insensitive, more variations)
+        append_order_rows(store, orders_data)
+    return store
+
+def append_order_rows(store, orders_data):
+    """Normalize orders sheet rows and append them to an existing OrderStore"""
+    if NORMALIZE_WORKERS > 0 and len(orders_data) >= NORMALIZE_POOL_MIN_ROWS:
+        _append_order_rows_pooled(store, orders_data, NORMALIZE_WORKERS)
+    else:
+        _normalize_order_rows(store, orders_data)
+    store.index_dates()
+
+# Long-lived pool of normalize workers, started on first use
+_normalize_pool = None
+_normalize_pool_workers = 0
+_normalize_pool_lock = threading.Lock()
+
+def _normalize_pool_context():
+    """Return a start method whose workers never inherit this process's threads or held locks"""
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('forkserver')
+    return multiprocessing.get_context('spawn')
+
+def _init_normalize_worker():
+    """Pool initializer: workers skip stage timing and logging, which only the server reads"""
+    global _record_stages
+    _record_stages = False
+    logging.disable(logging.CRITICAL)
+
+def get_normalize_pool(workers):
+    """Return the shared normalize pool, (re)starting it with ``workers`` processes if needed"""
+    global _normalize_pool, _normalize_pool_workers
+    with _normalize_pool_lock:
+        if _normalize_pool is not None and _normalize_pool_workers != workers:
+            _normalize_pool.shutdown(wait=False, cancel_futures=True)
+            _normalize_pool = None
+        if _normalize_pool is None:
+            _normalize_pool = ProcessPoolExecutor(max_workers=workers, mp_context=_normalize_pool_context(),
+                                                  initializer=_init_normalize_worker)
+            _normalize_pool_workers = workers
+        return _normalize_pool
+
+def _discard_normalize_pool(pool):
+    """Stop a pool whose workers hung or died, so the next call starts a fresh one"""
+    global _normalize_pool
+    with _normalize_pool_lock:
+        if _normalize_pool is pool:
+            _normalize_pool = None
+    # ProcessPoolExecutor cannot cancel a running task, so stop its processes directly
+    for process in list((getattr(pool, '_processes', None) or {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def _normalize_order_chunk(rows):
+    """Pool worker: normalize rows into a store whose rows are chunk positions"""
+    store = OrderStore()
+    _normalize_order_rows(store, rows, keep_rows=False)
+    store.rows = array('i', store.rows)
+    return store
+
+def _append_order_rows_pooled(store, orders_data, workers):
+    """Normalize rows in parallel chunks and merge them into ``store`` in sheet order.
+
+    Each chunk is pickled to a worker, which sends back its orders as typed
+    arrays and dictionary-encoded columns; the raw rows never travel back.
+    ``store`` is only extended once chunks are back, in order. Chunks not
+    back within NORMALIZE_POOL_TIMEOUT, or lost to a dead worker, are
+    normalized inline and the pool is replaced.
+    """
+    n = len(orders_data)
+    size = -(-n // workers)
+    bounds = [(start, min(start + size, n)) for start in range(0, n, size)]
+    pool = get_normalize_pool(workers)
+    deadline = time.monotonic() + NORMALIZE_POOL_TIMEOUT
+    chunks = []
+    try:
+        futures = [pool.submit(_normalize_order_chunk, orders_data[start:stop]) for start, stop in bounds]
+        for future in futures:
+            chunks.append(future.result(timeout=max(0.0, deadline - time.monotonic())))
+    except (FutureTimeoutError, BrokenProcessPool, RuntimeError) as e:
+        logger.warning("Normalize pool failed after %d of %d chunks, finishing inline: %r", len(chunks), len(bounds), e)
+        _discard_normalize_pool(pool)
+    for (start, stop), chunk in zip(bounds, chunks):
+        store.extend(chunk, orders_data[start:stop])
+    if len(chunks) < len(bounds):
+        _normalize_order_rows(store, orders_data[bounds[len(chunks)][0]:])
+    logger.debug("Normalized %d order rows on %d worker processes", n, len(bounds))
+
+def _normalize_order_rows(store, orders_data, keep_rows=True):
+    """Append the buy/sell orders among ``orders_data`` to ``store``.
+
+    The raw row is kept with each order, or its position in ``orders_data``
+    when ``keep_rows`` is false. Epoch days are not filled in.
+    """
+    # Process each row using the columns resolved for its header; numeric
+    # columns are parsed in bulk the first time a row needs them
+    amounts = AmountColumns(orders_data)
+    for i, (row, schema) in enumerate(iter_rows_with_schema(orders_data)):
+        # Stock symbol column (case-insensitive, more variations)
         symbol = None
-        symbol_keywords = ['symbol', 'ticker', 'stock', 'instrument', 'security', 'name']
-        for key in row.keys():
-            key_lower = key.lower()
-            if any(keyword in key_lower for keyword in symbol_keywords):
-                symbol = row.get(key, '').strip()
-                if symbol:
-                    break
+        for key in schema['symbol']:
+            symbol = row.get(key, '').strip()
+            if symbol:
+                break
         
         if not symbol:
             # Try first column as symbol
@@ -381,109 +2208,71 @@ def process_order_analysis(orders_data):
             if first_val and not str(first_val).replace('.', '').replace('-', '').isdigit():
                 symbol = str(first_val).strip()
         
-        if symbol:
-            stock_symbols.add(symbol)
-        
-        # Try to find order type (Buy/Sell) - more variations
+        # Order type (Buy/Sell)
         order_type = None
-        type_keywords = ['type', 'side', 'action', 'direction', 'order type', 'order_type']
-        for key in row.keys():
-            key_lower = key.lower()
-            if any(keyword in key_lower for keyword in type_keywords):
-                order_type = str(row.get(key, '')).strip().upper()
-                if order_type:
-                    break
+        for key in schema['side']:
+            order_type = str(row.get(key, '')).strip().upper()
+            if order_type:
+                break
         
-        # Try to find price - more variations
+        # Price
         price = 0
-        price_keywords = ['price', 'execution price', 'exec_price', 'fill price', 'fill_price', 
-                         'trade price', 'trade_price', 'avg price', 'avg_price', 'average price']
-        for key in row.keys():
-            key_lower = key.lower()
-            if any(keyword in key_lower for keyword in price_keywords):
-                price_val = row.get(key, '')
-                price = parse_float(price_val)
-                if price > 0:
-                    break
+        for key in schema['price']:
+            price = amounts[key][i]
+            if price > 0:
+                break
         
         # If price still 0, try to find any numeric column that might be price
         if price == 0:
-            for key, value in row.items():
-                key_lower = key.lower()
-                # Skip if it's clearly not a price column
-                if any(skip in key_lower for skip in ['quantity', 'qty', 'shares', 'profit', 'pnl', 'date', 'time', 'symbol', 'ticker']):
-                    continue
-                val = parse_float(value)
+            for key in schema['price_any']:
+                val = amounts[key][i]
                 # If it's a reasonable price (between 0.01 and 10000)
                 if 0.01 <= val <= 10000:
                     price = val
                     break
         
-        # Try to find quantity - more variations
+        # Quantity
         quantity = 0
-        qty_keywords = ['quantity', 'qty', 'shares', 'share', 'volume', 'size', 'amount', 
-                       'executed', 'filled', 'exec_qty', 'fill_qty']
-        for key in row.keys():
-            key_lower = key.lower()
-            if any(keyword in key_lower for keyword in qty_keywords):
-                qty_val = row.get(key, '')
-                quantity = parse_float(qty_val)
-                if quantity > 0:
-                    break
+        for key in schema['qty']:
+            quantity = amounts[key][i]
+            if quantity > 0:
+                break
         
-        # Try to find profit/P&L - more variations
+        # Profit/P&L
         profit = 0
-        profit_keywords = ['profit', 'pnl', 'p&l', 'gain', 'loss', 'realized', 'unrealized', 
-                          'profit/loss', 'profit_loss', 'net pnl', 'net_pnl']
-        for key in row.keys():
-            key_lower = key.lower()
-            if any(keyword in key_lower for keyword in profit_keywords):
-                profit_val = row.get(key, '')
-                profit = parse_float(profit_val)
-                break
+        for key in schema['profit']:
+            profit = amounts[key][i]
+            break
         
-        # Try to find date - prioritize "Filled Time" and "Placed Time" columns
+        # Date - prioritize "Filled Time" and "Placed Time" columns
         date_str = None
+        time_str = ''
         
         # First, try to get "Filled Time" or "Placed Time" (these have actual dates)
-        for key in row.keys():
-            key_lower = key.lower()
-            if 'filled time' in key_lower or 'placed time' in key_lower:
+        for key in schema['date_time']:
+            date_val = row.get(key, '')
+            if date_val:
+                date_str = str(date_val).strip()
+                # Extract just the date part (before the time)
+                if ' ' in date_str:
+                    date_str, time_str = date_str.split(' ', 1)  # "11/04/2025", "14:07:30 EST"
+                break
+        
+        # If not found, try other date keywords ("Time-in-Force" holds "DAY", not a date)
+        if not date_str:
+            for key in schema['date']:
                 date_val = row.get(key, '')
-                if date_val:
-                    date_str = str(date_val).strip()
-                    # Extract just the date part (before the time)
+                date_str = str(date_val) if date_val else ''
+                if date_str and date_str.lower() != 'day' and date_str.lower() != 'n/a':
+                    # Extract date part if it contains time
                     if ' ' in date_str:
-                        date_str = date_str.split(' ')[0]  # Get "11/04/2025" from "11/04/2025 14:07:30 EST"
+                        date_str, time_str = date_str.split(' ', 1)
                     break
         
-        # If not found, try other date keywords (but skip "Time-in-Force" which has "DAY")
-        if not date_str:
-            date_keywords = ['date', 'timestamp', 'execution date', 'exec_date', 
-                            'fill date', 'fill_date', 'trade date', 'trade_date',
-                            'buy date', 'buy_date', 'sell date', 'sell_date', 'order date', 'order_date']
-            for key in row.keys():
-                key_lower = key.lower()
-                # Skip "Time-in-Force" as it contains "DAY" not a date
-                if 'time-in-force' in key_lower or 'time_in_force' in key_lower:
-                    continue
-                if any(keyword in key_lower for keyword in date_keywords):
-                    date_val = row.get(key, '')
-                    date_str = str(date_val) if date_val else ''
-                    if date_str and date_str.lower() != 'day' and date_str.lower() != 'n/a':
-                        # Extract date part if it contains time
-                        if ' ' in date_str:
-                            date_str = date_str.split(' ')[0]
-                        break
-        
         # If still no date, try to find any column that looks like a date
         if not date_str or date_str.lower() == 'day':
-            for key, value in row.items():
-                key_lower = key.lower()
-                # Skip if it's clearly not a date
-                if any(skip in key_lower for skip in ['symbol', 'price', 'quantity', 'qty', 'shares', 'profit', 'pnl', 'amount', 'value', 'total', 'type', 'side', 'time-in-force', 'time_in_force', 'status', 'name']):
-                    continue
-                val_str = str(value).strip()
+            for key in schema['date_any']:
+                val_str = str(row[key]).strip()
                 # Check if it looks like a date (contains numbers and separators)
                 if val_str and (('/' in val_str and any(c.isdigit() for c in val_str)) or 
                                ('-' in val_str and any(c.isdigit() for c in val_str)) or
@@ -491,80 +2280,81 @@ def process_order_analysis(orders_data):
                     date_str = val_str
                     # Extract date part if it contains time
                     if ' ' in date_str:
-                        date_str = date_str.split(' ')[0]
+                        date_str, time_str = date_str.split(' ', 1)
                     break
         
         # Calculate total value
         total_value = price * quantity if price and quantity else 0
         
-        # If total_value is 0 but we have price or quantity, try to calculate from other columns
+        # If total_value is 0, look for a total value column directly
         if total_value == 0:
-            # Look for total value column directly
-            for key in row.keys():
-                key_lower = key.lower()
-                if any(keyword in key_lower for keyword in ['total', 'value', 'amount', 'cost', 'principal']):
-                    total_value = parse_float(row.get(key, 0))
-                    if total_value > 0:
-                        break
-        
-        # Try to find status
-        status = None
-        status_keywords = ['status', 'state', 'order status', 'order_status']
-        for key in row.keys():
-            key_lower = key.lower()
-            if any(keyword in key_lower for keyword in status_keywords):
-                status_val = row.get(key, '')
-                status = str(status_val).strip() if status_val else None
-                if status:
+            for key in schema['total']:
+                total_value = amounts[key][i]
+                if total_value > 0:
                     break
         
-        order_data = {
-            'symbol': symbol or 'N/A',
-            'type': order_type or 'UNKNOWN',
-            'price': price,
-            'quantity': quantity,
-            'total_value': total_value,
-            'profit': profit,
-            'date': date_str or '',
-            'status': status or 'N/A',
-            'raw': row  # Keep raw data for reference
-        }
+        # Status
+        status = None
+        for key in schema['status']:
+            status_val = row.get(key, '')
+            status = str(status_val).strip() if status_val else None
+            if status:
+                break
         
         # Determine if buy or sell
         if order_type in ['BUY', 'B', 'BUYING', 'BUY ORDER']:
-            buy_orders.append(order_data)
+            side = SIDE_BUY
         elif order_type in ['SELL', 'S', 'SELLING', 'SELL ORDER']:
-            sell_orders.append(order_data)
-            total_profit += profit
+            side = SIDE_SELL
+        # If no clear type, try to infer from profit or other indicators
+        # If profit exists and is not 0, it's likely a sell
+        elif profit != 0:
+            side = SIDE_SELL
+        elif symbol:
+            # Default to buy if unclear but has symbol
+            side = SIDE_BUY
         else:
-            # If no clear type, try to infer from profit or other indicators
-            # If profit exists and is not 0, it's likely a sell
-            if profit != 0:
-                sell_orders.append(order_data)
-                total_profit += profit
-            elif symbol:
-                # Default to buy if unclear but has symbol
-                buy_orders.append(order_data)
-    
-    # Sort orders by date if available
-    def sort_by_date(order):
-        if order['date']:
-            date_obj = parse_date(order['date'])
-            return date_obj if date_obj else datetime.min
-        return datetime.min
+            continue
+        
+        store.append(side, symbol or '', order_type or 'UNKNOWN', price, quantity, total_value, profit,
+                     date_str or '', status or 'N/A', row if keep_rows else i, time_str)  # Keep raw row for reference
+
+def process_order_analysis(orders_data):
+    """Process data for order analysis view from orders sheet"""
+    if not orders_data:
+        return {
+            'total_profit': 0,
+            'stock_symbols': [],
+            'buy_orders': [],
+            'sell_orders': []
+        }
     
-    buy_orders.sort(key=sort_by_date, reverse=True)
-    sell_orders.sort(key=sort_by_date, reverse=True)
+    # Column names of the first row, for debugging schema detection
+    logger.debug("Sample order row keys: %s", list(orders_data[0].keys()))
     
-    # Get all unique statuses
-    statuses = set()
-    for order in buy_orders + sell_orders:
-        if order.get('status') and order['status'] != 'N/A':
-            statuses.add(order['status'])
+    return order_analysis_from_store(build_order_store(orders_data))
+
+def order_totals(store, start=0, totals=(0, 0, 0)):
+    """Add the orders of ``store`` from position ``start`` on to (value bought, value sold, profit of sells).
+
+    Summed in sheet order, so totals carried forward as orders are appended
+    come out exactly as if every order were summed at once.
+    """
+    bought, sold, profit = totals
+    sides, values, profits = store.side, store.total_value, store.profit
+    for i in range(start, len(sides)):
+        if sides[i] == SIDE_SELL:
+            sold += values[i]
+            profit += profits[i]
+        else:
+            bought += values[i]
+    return bought, sold, profit
+
+def order_summary_from_totals(store, totals):
+    """Return the order analysis totals of an OrderStore from its ``order_totals``"""
+    total_value_bought, total_value_sold, total_profit = totals
     
     # Calculate total profit as: total value sold - total value bought
-    total_value_bought = sum(order['total_value'] for order in buy_orders)
-    total_value_sold = sum(order['total_value'] for order in sell_orders)
     calculated_total_profit = total_value_sold - total_value_bought
     
     # Use calculated profit if it makes sense, otherwise use sum of individual profits
@@ -574,56 +2364,76 @@ def process_order_analysis(orders_data):
     # Calculate total positions value (current held positions = bought - sold)
     total_positions_value = total_value_bought - total_value_sold
     
-    print(f"Processed {len(buy_orders)} buy orders and {len(sell_orders)} sell orders")
-    print(f"Total value bought: ${total_value_bought:.2f}, Total value sold: ${total_value_sold:.2f}")
-    print(f"Total profit: ${total_profit:.2f}")
-    print(f"Total positions value (held): ${total_positions_value:.2f}")
-    if buy_orders:
-        print(f"Sample buy order: {buy_orders[0]}")
-    if sell_orders:
-        print(f"Sample sell order: {sell_orders[0]}")
-    
     return {
         'total_profit': total_profit,
         'total_value_bought': total_value_bought,
         'total_value_sold': total_value_sold,
         'total_positions_value': total_positions_value,
-        'stock_symbols': sorted(list(stock_symbols)),
-        'statuses': sorted(list(statuses)),
-        'buy_orders': buy_orders,
-        'sell_orders': sell_orders
+        'stock_symbols': sorted(store.symbols()),
+        'statuses': sorted(store.statuses())
     }
 
+def order_analysis_from_store(store, include_orders=True):
+    """Aggregate an OrderStore into the order analysis payload (totals only without include_orders)"""
+    analysis = order_summary_from_totals(store, order_totals(store))
+    if include_orders:
+        # Sort orders by date if available (undated orders last)
+        buy_positions = store.sorted_by_date(store.side_indices(SIDE_BUY))
+        sell_positions = store.sorted_by_date(store.side_indices(SIDE_SELL))
+        logger.debug("Processed %d buy and %d sell orders: bought $%.2f, sold $%.2f, profit $%.2f",
+                     len(buy_positions), len(sell_positions), analysis['total_value_bought'],
+                     analysis['total_value_sold'], analysis['total_profit'])
+        analysis['buy_orders'] = store.to_dicts(buy_positions)
+        analysis['sell_orders'] = store.to_dicts(sell_positions)
+    return analysis
+
+def insert_sorted(positions, appended, key, reverse=False):
+    """Return a copy of sorted ``positions`` with ``appended`` merged in, and where each one went.
+
+    ``positions`` are sorted by ``key`` (a number), ties in position order,
+    and ``appended`` are ascending positions after all of them, so each goes
+    after the equal keys already there: the result is what sorting every
+    position at once gives. ``indices[j]`` is where ``appended[j]`` was
+    inserted, applying the insertions in order.
+    """
+    positions = list(positions)
+    indices = []
+    if reverse:
+        by_key = lambda p: -key(p)
+    else:
+        by_key = key
+    for p in appended:
+        i = bisect.bisect_right(positions, by_key(p), key=by_key)
+        positions.insert(i, p)
+        indices.append(i)
+    return positions, indices
+
 def extract_positions_from_sheet(rows):
     positions = []
     if not rows:
         return positions
-    for row in rows:
-        keys = {k.lower(): k for k in row.keys()}
+    amounts = AmountColumns(rows)
+    for i, (row, schema) in enumerate(iter_rows_with_schema(rows)):
         symbol = None
-        for key in keys:
-            if any(x in key for x in ['symbol', 'ticker', 'stock', 'instrument', 'security', 'name']):
-                symbol = str(row[keys[key]]).strip()
-                if symbol:
-                    break
+        for key in schema['symbol']:
+            symbol = str(row[key]).strip()
+            if symbol:
+                break
         qty = 0.0
-        for key in keys:
-            if any(x in key for x in ['quantity', 'qty', 'shares', 'share', 'position']):
-                qty = parse_float(row[keys[key]], 0)
-                if qty != 0:
-                    break
+        for key in schema['position_qty']:
+            qty = amounts[key][i]
+            if qty != 0:
+                break
         cost_basis = 0.0
-        for key in keys:
-            if any(x in key for x in ['cost basis', 'avg price', 'average price', 'cost', 'basis']):
-                cost_basis = parse_float(row[keys[key]], 0)
-                if cost_basis != 0:
-                    break
-        status_val = None
-        for key in keys:
-            if 'status' in key or 'state' in key:
-                v = row[keys[key]]
-                status_val = str(v).strip() if v is not None else None
+        for key in schema['position_cost']:
+            cost_basis = amounts[key][i]
+            if cost_basis != 0:
                 break
+        status_val = None
+        for key in schema['status']:
+            v = row[key]
+            status_val = str(v).strip() if v is not None else None
+            break
         is_open = True
         if status_val:
             s = status_val.lower()
@@ -635,75 +2445,1760 @@ def extract_positions_from_sheet(rows):
             positions.append({'symbol': symbol, 'quantity': float(qty), 'cost_basis': float(cost_basis)})
     return positions
 
+def _first_column_value(row, columns):
+    """Return the first non-empty stripped value among the given columns"""
+    for k in columns:
+        v = row[k]
+        v = str(v).strip() if v is not None else None
+        if v:
+            return v
+    return None
+
+def _normalize_order_list_row(row, schema, index, amounts, position):
+    """Normalize one orders-sheet row into the orders list shape.
+
+    ``amounts`` holds the batch's numeric columns (see AmountColumns) and
+    ``position`` is the row's place in that batch.
+    """
+    oid = _first_column_value(row, schema['id'])
+    cust = _first_column_value(row, schema['name'])
+    status = _first_column_value(row, schema['status'])
+    date_val = _first_column_value(row, schema['list_date'])
+    if date_val and ' ' in date_val:
+        date_val = date_val.split(' ')[0]
+    total = 0.0
+    for k in schema['list_total']:
+        total = amounts[k][position]
+        if total != 0:
+            break
+    if total == 0:
+        price = 0.0
+        qty = 0.0
+        for k in schema['list_price']:
+            price = amounts[k][position]
+            if price != 0:
+                break
+        for k in schema['list_qty']:
+            qty = amounts[k][position]
+            if qty != 0:
+                break
+        total = price * qty
+    return {
+        'id': oid or f"ORD-{index+1}",
+        'customer': cust or 'N/A',
+        'date': date_val or '',
+        'status': status or 'N/A',
+        'total': float(total)
+    }
+
 def process_orders_list(orders_data):
     result = []
     if not orders_data:
         return result
-    for i, row in enumerate(orders_data):
-        keys = {k.lower(): k for k in row.keys()}
-        oid = None
-        for k in keys:
-            if 'side' in k:
-                continue
-            if any(x in k for x in ['order id', 'orderid', ' id ', 'id', 'trade id', 'transaction id']):
-                v = row[keys[k]]
-                oid = str(v).strip() if v is not None else None
-                if oid:
-                    break
-        cust = None
-        for k in keys:
-            if any(x in k for x in ['customer', 'customer name', 'client', 'account', 'account name', 'name']):
-                v = row[keys[k]]
-                cust = str(v).strip() if v is not None else None
-                if cust:
-                    break
-        status = None
-        for k in keys:
-            if any(x in k for x in ['status', 'state']):
-                v = row[keys[k]]
-                status = str(v).strip() if v is not None else None
-                if status:
-                    break
-        date_val = None
-        for k in keys:
-            if any(x in k for x in ['filled time', 'placed time', 'order date', 'date', 'timestamp']):
-                v = row[keys[k]]
-                date_val = str(v).strip() if v is not None else None
-                if date_val:
-                    if ' ' in date_val:
-                        date_val = date_val.split(' ')[0]
-                    break
-        total = 0.0
-        for k in keys:
-            if any(x in k for x in ['amount', 'value']) and not any(y in k for y in ['qty', 'quantity', 'shares']):
-                total = parse_float(row[keys[k]], 0)
-                if total != 0:
-                    break
-        if total == 0:
-            price = 0.0
-            qty = 0.0
-            for k in keys:
-                if 'price' in k:
-                    price = parse_float(row[keys[k]], 0)
-                    if price != 0:
-                        break
-            for k in keys:
-                if any(x in k for x in ['quantity', 'qty', 'shares', 'filled']):
-                    qty = parse_float(row[keys[k]], 0)
-                    if qty != 0:
-                        break
-            total = price * qty
-        if not oid:
-            oid = f"ORD-{i+1}"
-        result.append({
-            'id': oid,
-            'customer': cust or 'N/A',
-            'date': date_val or '',
-            'status': status or 'N/A',
-            'total': float(total)
-        })
+    amounts = AmountColumns(orders_data)
+    for i, (row, schema) in enumerate(iter_rows_with_schema(orders_data)):
+        result.append(_normalize_order_list_row(row, schema, i, amounts, i))
     return result
 
+ORDERS_LIST_FIELDS = ('id', 'customer', 'date', 'status', 'total')
+
+class OrderDateIndex:
+    """Orders sorted by epoch day, with prefix sums of buy and sell totals.
+
+    A date-range query binary-searches its bounds, so the range metrics cost
+    O(log n) no matter how many orders fall inside. Undated orders are left
+    out of the index.
+    """
+
+    def __init__(self, orders):
+        self.positions = []
+        self.days = array('l')
+        self.buy_prefix = array('d', [0.0])
+        self.sell_prefix = array('d', [0.0])
+        self.count = 0
+        self._append(orders)
+
+    @classmethod
+    def from_arrays(cls, positions, days, buy_prefix, sell_prefix, count):
+        """Return an index of the first ``count`` orders over already built arrays, e.g. ones mapped from a shared snapshot"""
+        index = cls.__new__(cls)
+        index.positions = positions
+        index.days = days
+        index.buy_prefix = buy_prefix
+        index.sell_prefix = sell_prefix
+        index.count = count
+        return index
+
+    def _append(self, orders):
+        """Index ``orders`` past the ones already indexed; False if one is dated before the last indexed day"""
+        start = self.count
+        new = orders[start:]
+        days = [epoch_day(d) for d in parse_date_column(o['date'] for o in new)]
+        dated = sorted((i for i, day in enumerate(days) if day != NO_DATE), key=days.__getitem__)
+        if dated and len(self.days) and days[dated[0]] < self.days[-1]:
+            return False
+        buy_total, sell_total = self.buy_prefix[-1], self.sell_prefix[-1]
+        for i in dated:
+            order = new[i]
+            if order['type'] == 'BUY':
+                buy_total += order['total']
+            elif order['type'] == 'SELL':
+                sell_total += order['total']
+            self.positions.append(start + i)
+            self.days.append(days[i])
+            self.buy_prefix.append(buy_total)
+            self.sell_prefix.append(sell_total)
+        self.count = len(orders)
+        return True
+
+    def extended(self, orders):
+        """Return a new index that also covers the orders appended since this one, or None if any is backdated"""
+        index = OrderDateIndex.from_arrays(list(self.positions), _array_copy(self.days), _array_copy(self.buy_prefix),
+                                           _array_copy(self.sell_prefix), self.count)
+        return index if index._append(orders) else None
+
+    def bounds(self, start_day=None, end_day=None):
+        """Return the [lo, hi) slice of the index covering start_day..end_day inclusive"""
+        lo = bisect.bisect_left(self.days, start_day) if start_day is not None else 0
+        hi = bisect.bisect_right(self.days, end_day) if end_day is not None else len(self.days)
+        return lo, max(lo, hi)
+
+    def metrics(self, lo, hi):
+        """Return aggregate_orders_metrics for the orders in an index slice"""
+        buy_total = self.buy_prefix[hi] - self.buy_prefix[lo]
+        sell_total = self.sell_prefix[hi] - self.sell_prefix[lo]
+        return {
+            'buy_total': buy_total,
+            'sell_total': sell_total,
+            'profit': sell_total - buy_total,
+            'orders_count': hi - lo
+        }
+
+class TermIndex:
+    """Posting lists and substring search over one string field of the orders.
+
+    Every lowercase substring of up to NGRAM characters maps to the distinct
+    values containing it, so a ``query in value.lower()`` match only checks
+    the values sharing all of the query's n-grams. Postings hold each value's
+    order positions in ascending order. The results of the last
+    MATCH_CACHE_SIZE distinct queries are kept.
+    """
+
+    NGRAM = 3
+    MATCH_CACHE_SIZE = 1024
+
+    def __init__(self):
+        self.postings = {}
+        self._grams = {}
+        self._sorted = None
+        self._matches = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_postings(cls, postings):
+        """Return an index over ready-made postings (value to ascending positions), which are not copied"""
+        index = cls()
+        for value, posting in postings.items():
+            index.postings[value] = posting
+            index._index_grams(value)
+        return index
+
+    def add(self, value, position):
+        with self._lock:
+            posting = self.postings.get(value)
+            if posting is None:
+                posting = self.postings[value] = array('i')
+                self._index_grams(value)
+                self._sorted = None
+                self._matches.clear()
+            posting.append(position)
+
+    def _index_grams(self, value):
+        text = value.lower()
+        for n in range(1, self.NGRAM + 1):
+            for j in range(len(text) - n + 1):
+                self._grams.setdefault(text[j:j + n], set()).add(value)
+
+    def copy(self):
+        other = TermIndex()
+        with self._lock:
+            other.postings = {value: posting[:] for value, posting in self.postings.items()}
+            other._grams = {gram: set(values) for gram, values in self._grams.items()}
+            other._sorted = self._sorted
+            other._matches.update(self._matches)
+        return other
+
+    def values(self):
+        """Return the distinct values in sorted order"""
+        with self._lock:
+            return self._values()
+
+    def _values(self):
+        if self._sorted is None:
+            self._sorted = sorted(self.postings)
+        return self._sorted
+
+    def matching(self, query):
+        """Return the sorted values whose lowercase form contains query"""
+        query = query.lower()
+        with self._lock:
+            found = self._matches.get(query)
+            if found is not None:
+                self._matches.move_to_end(query)
+                return found
+            n = self.NGRAM
+            if not query:
+                found = self._values()
+            elif len(query) <= n:
+                found = sorted(self._grams.get(query, ()))
+            else:
+                grams = sorted((self._grams.get(query[j:j + n], set()) for j in range(len(query) - n + 1)), key=len)
+                found = sorted(v for v in grams[0].intersection(*grams[1:]) if query in v.lower())
+            self._matches[query] = found
+            if len(self._matches) > self.MATCH_CACHE_SIZE:
+                self._matches.popitem(last=False)
+        return found
+
+    def positions(self, query):
+        """Return the ascending order positions of all values matching query"""
+        values = self.matching(query)
+        with self._lock:
+            postings = [self.postings[v] for v in values]
+        if len(postings) == 1:
+            return postings[0]
+        return sorted(itertools.chain.from_iterable(postings))
+
+# Order statuses that never produced a fill
+_UNFILLED_STATUS_WORDS = ('cancel', 'reject', 'fail', 'expire')
+# Remaining quantities below this are treated as closed (float rounding)
+POSITION_EPSILON = 1e-9
+
+class PositionBook:
+    """Open positions with FIFO and average-cost basis, built from an OrderStore.
+
+    Orders are applied in order of their full timestamp, orders placed in
+    the same second in sheet order. ``sync`` folds in orders appended since
+    the last call and returns False when an appended order is timestamped
+    before ones already applied, in which case the book must be rebuilt. Sells beyond the held quantity only close the position, since
+    the cost of the missing shares is unknown.
+    """
+
+    def __init__(self):
+        self._symbols = {}
+        self._lock = threading.Lock()
+        self.applied = 0
+        # (epoch seconds, store position) of the latest order applied
+        self.last_key = (NO_DATE * 86400, -1)
+
+    def copy(self):
+        """Return a book in the same state that can be synced independently"""
+        other = PositionBook()
+        with self._lock:
+            other._symbols = {symbol: dict(state, lots=collections.deque(state['lots']))
+                              for symbol, state in self._symbols.items()}
+            other.applied = self.applied
+            other.last_key = self.last_key
+        return other
+
+    def sync(self, store):
+        """Apply orders appended to ``store`` since the last sync"""
+        with self._lock:
+            count = len(store.side)
+            if self.applied >= count:
+                return True
+            keys = sorted(zip(store.times(self.applied, count), range(self.applied, count)))
+            if keys[0] < self.last_key:
+                return False
+            for _, i in keys:
+                self._apply(store, i)
+            self.applied = count
+            self.last_key = keys[-1]
+            return True
+
+    def _apply(self, store, i):
+        quantity = store.quantity[i]
+        status = store.status[i].lower()
+        if quantity <= 0 or any(word in status for word in _UNFILLED_STATUS_WORDS):
+            return
+        price = store.price[i]
+        state = self._symbols.get(store.symbol[i] or 'N/A')
+        if state is None:
+            state = self._symbols[store.symbol[i] or 'N/A'] = {
+                'lots': collections.deque(), 'quantity': 0.0, 'avg_cost': 0.0,
+                'realized_fifo': 0.0, 'realized_avg': 0.0
+            }
+        if store.side[i] == SIDE_BUY:
+            held = state['quantity']
+            state['avg_cost'] = (state['avg_cost'] * held + price * quantity) / (held + quantity)
+            state['quantity'] = held + quantity
+            state['lots'].append((quantity, price, store.day[i]))
+            return
+        sold = min(quantity, state['quantity'])
+        state['realized_avg'] += (price - state['avg_cost']) * sold
+        lots = state['lots']
+        remaining = sold
+        while remaining > POSITION_EPSILON and lots:
+            lot_quantity, lot_price, lot_day = lots[0]
+            take = min(lot_quantity, remaining)
+            state['realized_fifo'] += (price - lot_price) * take
+            remaining -= take
+            if lot_quantity - take <= POSITION_EPSILON:
+                lots.popleft()
+            else:
+                # Lots are shared with copies of the book, so replace rather than update them
+                lots[0] = (lot_quantity - take, lot_price, lot_day)
+        state['quantity'] -= sold
+        if state['quantity'] <= POSITION_EPSILON:
+            state['quantity'] = 0.0
+            state['avg_cost'] = 0.0
+            lots.clear()
+
+    def summary(self, today=None):
+        """Return the positions payload: open positions plus realized P&L totals"""
+        today_day = epoch_day(today or datetime.now())
+        positions = []
+        realized_fifo = realized_avg = 0.0
+        with self._lock:
+            for symbol in sorted(self._symbols):
+                state = self._symbols[symbol]
+                realized_fifo += state['realized_fifo']
+                realized_avg += state['realized_avg']
+                quantity = state['quantity']
+                if quantity <= 0:
+                    continue
+                lots = state['lots']
+                opened = next((lot[2] for lot in lots if lot[2] != NO_DATE), None)
+                positions.append({
+                    'symbol': symbol,
+                    'quantity': quantity,
+                    'cost_basis': state['avg_cost'],
+                    'avg_cost': state['avg_cost'],
+                    'fifo_cost': sum(lot[0] * lot[1] for lot in lots) / quantity,
+                    'realized_pnl_fifo': state['realized_fifo'],
+                    'realized_pnl_avg': state['realized_avg'],
+                    'opened': datetime.fromordinal(opened + EPOCH_ORDINAL).strftime('%Y-%m-%d') if opened is not None else None,
+                    'holding_days': today_day - opened if opened is not None else 0
+                })
+        return {
+            'positions': positions,
+            'realized_pnl': {'fifo': realized_fifo, 'average': realized_avg},
+            'source': 'orders'
+        }
+
+# Order tables served page by page: their fields, default sort and default projection
+ORDER_TABLES = {
+    'buy': ORDER_FIELDS + ('raw',),
+    'sell': ORDER_FIELDS + ('raw',),
+    'orders_list': ORDERS_LIST_FIELDS
+}
+ORDER_TABLE_SORT = {'buy': '-date', 'sell': '-date', 'orders_list': ''}
+ORDER_TABLE_FIELDS = {'buy': ORDER_FIELDS, 'sell': ORDER_FIELDS, 'orders_list': ORDERS_LIST_FIELDS}
+
+def encode_order_cursor(sort, after):
+    """Encode a keyset cursor: the sort it belongs to and the last position returned"""
+    text = json.dumps({'s': sort, 'a': after}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(text.encode()).decode().rstrip('=')
+
+def decode_order_cursor(cursor):
+    """Decode an order table cursor into (sort, after), raising ValueError if malformed"""
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        sort, after = state['s'], state['a']
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError('Malformed cursor') from e
+    if not isinstance(sort, str) or not isinstance(after, int):
+        raise ValueError('Malformed cursor')
+    return sort, after
+
+class OrderViews:
+    """Normalized views of one orders sheet, extended as rows are appended.
+
+    Holds the OrderStore behind the order analysis and the modern orders
+    list; the /api/data orders list is projected from the latter. Symbol and
+    status TermIndexes over the modern list back the filter endpoints.
+
+    The derived payloads, indexes and table orders are built on first use
+    and record how many orders they cover; after an append they are
+    extended with only the new orders into new objects, so copies can
+    share them.
+    """
+
+    def __init__(self):
+        self.store = OrderStore()
+        self.orders = []
+        self._totals = None
+        self._analysis = None
+        self._orders_list = None
+        self._date_index = None
+        self._summary = None
+        self._metrics = None
+        self._table_orders = {}
+        self._table_ranks = {}
+        self._positions = None
+        self.symbols = TermIndex()
+        self.statuses = TermIndex()
+        # First sheet row and store position of every add_rows batch
+        self._batch_rows = []
+        self._batch_stores = []
+
+    def copy(self):
+        """Return views over the same orders that ``add_rows`` can extend without touching these"""
+        other = OrderViews()
+        other.store = self.store.copy()
+        other.orders = list(self.orders)
+        other.symbols = self.symbols.copy()
+        other.statuses = self.statuses.copy()
+        other._batch_rows = list(self._batch_rows)
+        other._batch_stores = list(self._batch_stores)
+        other._totals = self._totals
+        other._analysis = self._analysis
+        other._orders_list = self._orders_list
+        other._date_index = self._date_index
+        other._summary = self._summary
+        other._metrics = self._metrics
+        other._table_orders = dict(self._table_orders)
+        book = self._positions
+        if book is not None:
+            other._positions = book.copy()
+        return other
+
+    def image(self, rows=None):
+        """Lay out these views as flat columns; return (meta, sections).
+
+        ``sections`` maps names to arrays or bytes, and ``meta`` holds what is
+        small enough to keep as JSON: the distinct values of the
+        dictionary-encoded columns and the unfiltered metrics. Sheet rows are
+        stored as JSON, or as their positions in ``rows`` when the views were
+        synced from it. MappedOrderViews reads an image in place and
+        ``from_image`` restores one.
+        """
+        store, orders = self.store, self.orders
+        values, sections = {}, {}
+
+        def add_dict(name, column):
+            values[name] = column.values
+            sections[name] = column.codes
+
+        def add_strings(name, items):
+            sections[name + '.offsets'], sections[name] = PackedStrings.pack(items)
+
+        for name in OrderStore.NUMERIC_COLUMNS + ('day', 'side'):
+            sections['store.' + name] = getattr(store, name)
+        for name in OrderStore.DICT_COLUMNS:
+            add_dict('store.' + name, getattr(store, name))
+        if rows is None:
+            add_strings('store.rows', (_dumps_json(_row_to_json(row)) for row in store.rows))
+        else:
+            row_numbers = {id(row): i for i, row in enumerate(rows)}
+            sections['store.row_numbers'] = array('i', (row_numbers[id(row)] for row in store.rows))
+        for field in ('id', 'customer', 'date'):
+            add_strings('orders.' + field, (o[field].encode() for o in orders))
+        sections['orders.total'] = array('d', (o['total'] for o in orders))
+        for field in ('status', 'type', 'symbol'):
+            column = DictColumn()
+            for o in orders:
+                column.append(o[field])
+            add_dict('orders.' + field, column)
+        for name in ('symbols', 'statuses'):
+            index = getattr(self, name)
+            terms = index.values()
+            postings = [index.postings[term] for term in terms]
+            values['terms.' + name] = terms
+            sections[f'terms.{name}.offsets'] = array('q', itertools.accumulate(map(len, postings), initial=0))
+            sections['terms.' + name] = array('i', itertools.chain.from_iterable(postings))
+        date_index = self.date_index()
+        sections['dates.positions'] = array('i', date_index.positions)
+        for name in ('days', 'buy_prefix', 'sell_prefix'):
+            sections['dates.' + name] = getattr(date_index, name)
+        for table, sort in ORDER_TABLE_SORT.items():
+            sections[f'table.{table}'] = array('i', self.table_order(table, sort))
+            sections[f'table.{table}.rank'] = self.table_rank(table, sort)
+        return {'values': values, 'metrics': self.metrics()}, sections
+
+    @classmethod
+    def from_image(cls, meta, section, rows):
+        """Return views restored from ``image(rows)`` that ``add_rows`` can extend.
+
+        ``section(name)`` returns a section of the image as a memoryview.
+        """
+        mapped = MappedOrderViews(meta, section, rows)
+        views = cls()
+        store = views.store
+        for name in OrderStore.NUMERIC_COLUMNS + ('day', 'side'):
+            setattr(store, name, _array_copy(getattr(mapped.store, name)))
+        for name in OrderStore.DICT_COLUMNS:
+            column = getattr(mapped.store, name)
+            setattr(store, name, DictColumn.from_codes(column.values, column.codes,
+                                                       getattr(store, name).positions is not None))
+        store.rows = mapped.store.rows
+        views.orders = list(mapped.orders)
+        for name in ('symbols', 'statuses'):
+            postings = getattr(mapped, name).postings
+            setattr(views, name, TermIndex.from_postings({term: _array_copy(p) for term, p in postings.items()}))
+        index = mapped.date_index()
+        views._date_index = OrderDateIndex.from_arrays(list(index.positions), *map(_array_copy, (
+            index.days, index.buy_prefix, index.sell_prefix)), index.count)
+        for key, (positions, count) in mapped._table_orders.items():
+            views._table_orders[key] = (list(positions), count)
+            views._table_ranks[key] = _array_copy(mapped._table_ranks[key])
+        views._metrics = dict(meta['metrics'])
+        views._batch_rows, views._batch_stores = [0], [0]
+        return views
+
+    def add_rows(self, rows, offset=0):
+        self._batch_rows.append(offset)
+        self._batch_stores.append(len(self.store))
+        append_order_rows(self.store, rows)
+        orders = self.orders
+        amounts = AmountColumns(rows)
+        for i, (row, schema) in enumerate(iter_rows_with_schema(rows)):
+            order = _normalize_modern_order_row(row, schema, offset + i, amounts, i)
+            self.symbols.add(order['symbol'], len(orders))
+            self.statuses.add(order['status'], len(orders))
+            orders.append(order)
+
+    def store_position(self, row):
+        """Return the store position of the first order from sheet rows at or after ``row``.
+
+        Only known where a batch of rows started (or past the last row);
+        returns None otherwise.
+        """
+        if row == len(self.orders):
+            return len(self.store)
+        i = bisect.bisect_left(self._batch_rows, row)
+        if i < len(self._batch_rows) and self._batch_rows[i] == row:
+            return self._batch_stores[i]
+        return None
+
+    def date_index(self):
+        """Return the OrderDateIndex over the modern orders list, rebuilt only if appended orders are backdated"""
+        index = self._date_index
+        if index is not None and index.count != len(self.orders):
+            index = index.extended(self.orders)
+        if index is None:
+            index = OrderDateIndex(self.orders)
+        self._date_index = index
+        return index
+
+    def order_analysis(self):
+        """Return the order analysis payload (same as process_order_analysis)"""
+        if not self.orders:
+            return process_order_analysis(None)
+        store = self.store
+        cached = self._analysis
+        if cached is None or cached[0] != len(store):
+            buy = self.table_order('buy', ORDER_TABLE_SORT['buy'])
+            sell = self.table_order('sell', ORDER_TABLE_SORT['sell'])
+            if cached is None:
+                buy_orders, sell_orders = store.to_dicts(buy), store.to_dicts(sell)
+            else:
+                count, analysis = cached[:2]
+                buy_orders = self._insert_dicts(analysis['buy_orders'], cached[2], count, SIDE_BUY)
+                sell_orders = self._insert_dicts(analysis['sell_orders'], cached[3], count, SIDE_SELL)
+            analysis = dict(self.order_summary(), buy_orders=buy_orders, sell_orders=sell_orders)
+            cached = self._analysis = (len(store), analysis, buy, sell)
+        return cached[1]
+
+    def _insert_dicts(self, dicts, positions, count, side):
+        """Return ``dicts`` of date-sorted store ``positions`` with the ``side`` orders from ``count`` on merged in"""
+        store = self.store
+        appended = self._appended(side, count)
+        _, indices = insert_sorted(positions, appended, store.day.__getitem__, reverse=True)
+        dicts = list(dicts)
+        for i, order in zip(indices, store.to_dicts(appended)):
+            dicts.insert(i, order)
+        return dicts
+
+    def orders_list(self):
+        """Return the orders list payload (same as process_orders_list)"""
+        cached = self._orders_list
+        if cached is None or len(cached) != len(self.orders):
+            start = len(cached) if cached is not None else 0
+            cached = self._orders_list = (cached or []) + [
+                {k: o[k] for k in ORDERS_LIST_FIELDS} for o in self.orders[start:]]
+        return cached
+
+    def order_summary(self):
+        """Return the order analysis totals without the buy and sell order lists"""
+        if not self.orders:
+            return {k: v for k, v in process_order_analysis(None).items() if k not in ('buy_orders', 'sell_orders')}
+        store = self.store
+        cached = self._summary
+        if cached is None or cached[0] != len(store):
+            count, totals = self._totals or (0, (0, 0, 0))
+            if count != len(store):
+                self._totals = len(store), order_totals(store, count, totals)
+            cached = self._summary = (len(store), order_summary_from_totals(store, self._totals[1]))
+        return cached[1]
+
+    def metrics(self):
+        """Return aggregate_orders_metrics over every order, adding in the orders appended since last use"""
+        metrics = self._metrics
+        if metrics is None or metrics['orders_count'] != len(self.orders):
+            start = metrics['orders_count'] if metrics is not None else 0
+            metrics = self._metrics = aggregate_orders_metrics(self.orders[start:], metrics)
+        return metrics
+
+    def position_book(self):
+        """Return the PositionBook, folding in appended orders or rebuilding it if they are backdated"""
+        book = self._positions
+        if book is None or not book.sync(self.store):
+            book = PositionBook()
+            book.sync(self.store)
+            self._positions = book
+        return book
+
+    def _sort_keys(self, table, field):
+        """Return a sequence of sort keys indexed by position for one table column"""
+        if table == 'orders_list':
+            if field == 'date':
+                return [epoch_day(d) for d in parse_date_column(o['date'] for o in self.orders)]
+            return [o[field] for o in self.orders]
+        store = self.store
+        if field == 'date':
+            return store.day
+        column = getattr(store, field)
+        if isinstance(column, DictColumn):
+            values = [v or 'N/A' for v in column.values] if field == 'symbol' else column.values
+            return [values[c] for c in column.codes]
+        return column
+
+    def _appended(self, side, count):
+        """Return the store positions from ``count`` on of the orders on ``side``"""
+        sides = self.store.side
+        return [i for i in range(count, len(sides)) if sides[i] == side]
+
+    def _table_size(self, table):
+        """Return the number of positions a table's rows are drawn from"""
+        return len(self.orders) if table == 'orders_list' else len(self.store)
+
+    def _extend_table_order(self, table, sort, positions, count):
+        """Return ``positions`` of a table with the rows from ``count`` on merged in, or None to rebuild it.
+
+        Sheet order and the sorts keyed by numeric store columns are
+        extended; the others are rebuilt when next used.
+        """
+        field = sort.lstrip('-')
+        if table == 'orders_list':
+            if field:
+                return None
+            return list(positions) + list(range(count, len(self.orders)))
+        appended = self._appended(SIDE_BUY if table == 'buy' else SIDE_SELL, count)
+        if not field:
+            return list(positions) + appended
+        keys = self._sort_keys(table, field)
+        if not isinstance(keys, array):
+            return None
+        return insert_sorted(positions, appended, keys.__getitem__, reverse=sort.startswith('-'))[0]
+
+    def table_order(self, table, sort):
+        """Return the positions of a table's rows in ``sort`` order, built on first use.
+
+        ``sort`` is a field name, prefixed with '-' for descending, or '' for
+        sheet order. Ties keep sheet order either way.
+        """
+        key = (table, sort)
+        size = self._table_size(table)
+        cached = self._table_orders.get(key)
+        if cached is not None and cached[1] != size:
+            positions = self._extend_table_order(table, sort, *cached)
+            cached = self._table_orders[key] = (positions, size) if positions is not None else None
+        if cached is None:
+            field = sort.lstrip('-')
+            if field and (field not in ORDER_TABLES[table] or field == 'raw'):
+                raise ValueError(f'Cannot sort {table} by {field!r}')
+            if table == 'orders_list':
+                positions = list(range(len(self.orders)))
+            else:
+                positions = self.store.side_indices(SIDE_BUY if table == 'buy' else SIDE_SELL)
+            if field:
+                positions = sorted(positions, key=self._sort_keys(table, field).__getitem__, reverse=sort.startswith('-'))
+            cached = self._table_orders[key] = (positions, size)
+        return cached[0]
+
+    def table_rank(self, table, sort):
+        """Return the rank of each position in ``table_order``, -1 for positions outside the table"""
+        key = (table, sort)
+        positions = self.table_order(table, sort)
+        rank = self._table_ranks.get(key)
+        if rank is None or len(rank) != self._table_size(table):
+            rank = self._table_ranks[key] = array('i', [-1]) * self._table_size(table)
+            for r, p in enumerate(positions):
+                rank[p] = r
+        return rank
+
+    def table_page(self, table, sort, fields, after=None, limit=ORDER_PAGE_SIZE):
+        """Return (rows, last position or None if no more, total) for one page of a table"""
+        positions = self.table_order(table, sort)
+        start = 0
+        if after is not None:
+            rank = self.table_rank(table, sort)
+            if not 0 <= after < len(rank) or rank[after] < 0:
+                raise ValueError('Cursor no longer matches the order data')
+            start = rank[after] + 1
+        page = positions[start:start + limit]
+        if table == 'orders_list':
+            rows = [self.orders[i] for i in page]
+        else:
+            rows = self.store.to_dicts(page, include_raw='raw' in fields)
+        items = [{k: row[k] for k in fields} for row in rows]
+        more = page and start + len(page) < len(positions)
+        return items, page[-1] if more else None, len(positions)
+
+def parse_version_token(token):
+    """Split a ``lineage:version`` token, returning (None, None) if it is malformed"""
+    lineage, _, version = token.partition(':')
+    try:
+        return lineage, int(version)
+    except ValueError:
+        return None, None
+
+class IncrementalSheetState:
+    """Derived state of one append-only sheet.
+
+    ``sync`` compares new rows against the rows the state was built from:
+    when they only add rows at the end, just the new rows are folded into a
+    copy of the state; any change to earlier rows rebuilds the state from
+    scratch. Rows that are an older prefix of the current ones, such as a
+    previous fetch a slower request still holds, get the current state. A state returned by ``sync`` is never modified afterwards, so
+    requests can keep reading it while a later sync builds the next one.
+
+    Every new version is logged with the row count before and after it and
+    the earlier rows it modified, so ``changes_since`` can tell a client
+    holding an older version token which rows to fetch again.
+    """
+
+    def __init__(self, builder):
+        self.builder = builder
+        self.rows = []
+        self.state = builder()
+        self.version = 0
+        # Tokens from another state (or process) never match this one's history
+        self.lineage = os.urandom(4).hex()
+        # (version, rows before, rows after, modified positions below rows before, or None if rows were removed)
+        self.changes = collections.deque(maxlen=SHEET_CHANGE_HISTORY)
+        self.counters = {'appends': 0, 'rebuilds': 0, 'rows_processed': 0}
+        self._lock = threading.Lock()
+
+    def token(self, version=None):
+        """Return the version token clients send back as ``since``"""
+        return f'{self.lineage}:{self.version if version is None else version}'
+
+    def changes_since(self, token, upto=None):
+        """Return (rows at ``token``, rows at ``upto``, sorted modified positions), or None.
+
+        ``upto`` defaults to the current version. None means the token is
+        from another lineage, newer than ``upto``, older than the log reaches,
+        or that rows were removed in between, so only a full payload will do.
+        """
+        lineage, version = parse_version_token(token)
+        with self._lock:
+            upto = self.version if upto is None else upto
+            if lineage != self.lineage or version is None or not 0 <= version <= upto:
+                return None
+            steps = [c for c in self.changes if version < c[0] <= upto]
+            if version == upto:
+                rows = len(self.rows) if upto == self.version else next(
+                    (c[2] for c in self.changes if c[0] == upto), None)
+                return (rows, rows, []) if rows is not None else None
+            if len(steps) != upto - version or steps[0][0] != version + 1:
+                return None
+        rows_before = steps[0][1]
+        modified = set()
+        for _, _, _, positions in steps:
+            if positions is None:
+                return None
+            modified.update(p for p in positions if p < rows_before)
+        return rows_before, steps[-1][2], sorted(modified)
+
+    def sync(self, rows):
+        """Return the state for ``rows``; None (a failed fetch) keeps the current state"""
+        return self.sync_with_version(rows)[0]
+
+    def sync_with_version(self, rows):
+        """Sync with ``rows`` and return (state, version) as of that same sync"""
+        with self._lock:
+            if rows is None or rows is self.rows or self._behind(rows):
+                return self.state, self.version
+            n = len(self.rows)
+            if n and len(rows) >= n and self._extends(rows):
+                if len(rows) > n:
+                    state = self.state.copy()
+                    with timed('normalize'):
+                        state.add_rows(rows[n:], n)
+                    self.state = state
+                    self.version += 1
+                    self.changes.append((self.version, n, len(rows), ()))
+                    self.counters['appends'] += 1
+                    self.counters['rows_processed'] += len(rows) - n
+            else:
+                # Build into a fresh object so readers of the old state are unaffected
+                state = self.builder()
+                with timed('normalize'):
+                    state.add_rows(rows, 0)
+                old = self.rows
+                modified = [i for i in range(n) if rows[i] != old[i]] if len(rows) >= n else None
+                self.state = state
+                self.version += 1
+                self.changes.append((self.version, n, len(rows), modified))
+                self.counters['rebuilds'] += 1
+                self.counters['rows_processed'] += len(rows)
+            self.rows = rows
+            return self.state, self.version
+
+    def restore(self, rows, state):
+        """Adopt ``state``, built elsewhere from ``rows`` (e.g. persisted), as a new version"""
+        with self._lock:
+            self.version += 1
+            self.changes.append((self.version, len(self.rows), len(rows), None))
+            self.rows = rows
+            self.state = state
+
+    def _behind(self, rows):
+        """Return whether ``rows`` are an earlier version of the rows the state was built from"""
+        if len(rows) >= len(self.rows):
+            return False
+        if isinstance(rows, SheetRows):
+            # A later fetch that lost rows is not an ancestor, so it is still synced
+            return isinstance(self.rows, SheetRows) and self.rows.follows(rows)
+        return rows == self.rows[:len(rows)]
+
+    def _extends(self, rows):
+        """Return whether ``rows`` start with the rows the state was built from"""
+        if isinstance(rows, SheetRows) and rows.extends(self.rows):
+            return True
+        # Rows from outside the sheet cache are compared; shared row objects compare by identity
+        return rows[:len(self.rows)] == self.rows
+
+SHEET_STATE_BUILDERS = {'transfers': TransferAggregator, 'orders': OrderViews}
+_sheet_states = {}
+_sheet_states_lock = threading.Lock()
+
+def sheet_state_holder(name):
+    """Return the IncrementalSheetState of a named sheet, creating it on first use"""
+    with _sheet_states_lock:
+        holder = _sheet_states.get(name)
+        if holder is None:
+            holder = _sheet_states[name] = IncrementalSheetState(SHEET_STATE_BUILDERS[name])
+    return holder
+
+def get_sheet_state(name, rows):
+    """Return the derived state for a named sheet, synced with ``rows``"""
+    return sync_sheet_state(name, rows)[0]
+
+def sync_sheet_state(name, rows):
+    """Sync a named sheet's state with ``rows`` and return (state, version) as of that sync"""
+    state, version = sheet_state_holder(name).sync_with_version(rows)
+    persist_sheet_state(name, rows, state)
+    return state, version
+
+def persist_sheet_state(name, rows, state):
+    """Queue ``state`` for the snapshot store when ``rows`` came from the sheet cache"""
+    store = sheet_cache.store
+    sheet = configured_sheets().get(name)
+    if store is not None and sheet is not None and isinstance(rows, SheetRows):
+        store.save_state((sheet[0], str(sheet[1])), name, rows, state)
+
+if not IN_POOL_WORKER:
+    restore_sheet_cache()
+
+# Salts ETags so validators from another process never match this one's data
+_ETAG_SALT = os.urandom(8).hex()
+
+def fetch_with_etag(sheets, fetch):
+    """Call ``fetch()`` and return (result, ETag for this request's response).
+
+    The ETag is derived from the cached versions of the given (spreadsheet_id,
+    gid) sheets and the request path. It is None when a sheet changed while
+    fetching, since the result may then belong to either version.
+    """
+    before = sheet_cache.fingerprint(sheets)
+    with timed('fetch'):
+        result = fetch()
+    if sheet_cache.fingerprint(sheets) != before:
+        return result, None
+    return result, make_etag(before)
+
+# Query arguments that pick how a response is sent rather than the data it stands for
+_ETAG_IGNORED_ARGS = ('since',)
+
+def make_etag(fingerprint, salt=None):
+    """Return the ETag for this request's path over data with the given sheet fingerprint.
+
+    ``?since=`` is left out: a delta brings the client to the same data as
+    the full response, so both carry one ETag and a refresh of unchanged
+    data is a 304 whichever way it was last fetched.
+    """
+    args = sorted((k, v) for k, v in request.args.items(multi=True) if k not in _ETAG_IGNORED_ARGS)
+    token = f'{_ETAG_SALT if salt is None else salt}|{fingerprint}|{request.path}?{urlencode(args)}'
+    return hashlib.sha1(token.encode()).hexdigest()
+
+def not_modified(etag):
+    """Return a 304 response if the client already holds ``etag``, otherwise None"""
+    if etag is None or not request.if_none_match.contains_weak(etag):
+        return None
+    return with_etag(app.response_class(status=304), etag)
+
+def with_etag(response, etag):
+    """Attach a weak ETag and ask clients to revalidate before reusing the response"""
+    if etag is not None:
+        response.set_etag(etag, weak=True)
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+class ResponseBodyCache:
+    """LRU of serialized (and compressed) response bodies, bounded by total bytes.
+
+    Keys are (ETag, content-coding) pairs, so an unchanged sheet version is
+    serialized and compressed once and then served from memory.
+    """
+
+    def __init__(self, max_bytes=RESPONSE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._bodies = collections.OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get_or_build(self, key, build):
+        """Return the cached body for ``key``, calling ``build()`` to make it on a miss"""
+        with self._lock:
+            body = self._bodies.get(key)
+            if body is not None:
+                self._bodies.move_to_end(key)
+                self._counters['hits'] += 1
+                return body
+            self._counters['misses'] += 1
+        body = build()
+        if len(body) <= self.max_bytes:
+            with self._lock:
+                if key not in self._bodies:
+                    self._bodies[key] = body
+                    self._size += len(body)
+                while self._size > self.max_bytes:
+                    _, evicted = self._bodies.popitem(last=False)
+                    self._size -= len(evicted)
+                    self._counters['evictions'] += 1
+        return body
+
+    def stats(self):
+        """Return hit/miss counters and the cached size"""
+        with self._lock:
+            return dict(self._counters, entries=len(self._bodies), bytes=self._size)
+
+    def clear(self):
+        """Drop all cached bodies and reset counters"""
+        with self._lock:
+            self._bodies.clear()
+            self._size = 0
+            for name in self._counters:
+                self._counters[name] = 0
+
+response_bodies = ResponseBodyCache()
+
+def json_response(etag, build, body_key=None):
+    """Return ``build()`` as a JSON response, or a 304 if the client holds ``etag``.
+
+    With an ETag the serialized body is cached, so repeat requests for an
+    unchanged sheet version skip both building and encoding the payload.
+    ``body_key`` tells apart bodies sharing an ETag, such as ?since= deltas.
+    """
+    if etag is None:
+        return jsonify(build())
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
+    body_key = body_key or etag
+    body = response_bodies.get_or_build((body_key, 'identity'), lambda: app.json.response(build()).get_data())
+    response = app.response_class(body, mimetype=app.json.mimetype)
+    response.body_key = body_key
+    return with_etag(response, etag)
+
+def iter_chunks(view, size=RESPONSE_CHUNK_SIZE):
+    """Yield a buffer as bytes, ``size`` bytes at a time"""
+    for start in range(0, len(view), size):
+        yield view[start:start + size].tobytes()
+
+def mapped_response(etag, bodies):
+    """Stream an already serialized JSON body, or return a 304 if the client holds ``etag``.
+
+    ``bodies`` maps content-codings to buffers holding the body (see
+    SharedSnapshot.bodies); the smallest one the client accepts is sent.
+    The buffer is written out in chunks and bypasses compress_response,
+    so serving it never copies the whole body into this process.
+    """
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
+    accepted = request.accept_encodings
+    encoding = next((e for e in ('br', 'gzip') if e in bodies and accepted[e]), 'identity')
+    body = bodies[encoding]
+    response = app.response_class(iter_chunks(body), mimetype=app.json.mimetype, direct_passthrough=True)
+    response.content_length = len(body)
+    if len(bodies) > 1:
+        response.vary.add('Accept-Encoding')
+    if encoding != 'identity':
+        response.headers['Content-Encoding'] = encoding
+    return with_etag(response, etag)
+
+@app.after_request
+def compress_response(response):
+    """Compress large JSON responses with brotli or gzip when the client accepts it"""
+    if (response.status_code != 200 or response.mimetype != 'application/json'
+            or response.direct_passthrough or 'Content-Encoding' in response.headers):
+        return response
+    response.vary.add('Accept-Encoding')
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_SIZE:
+        return response
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        encoding, compress = 'br', lambda: brotli.compress(body, quality=COMPRESS_LEVEL)
+    elif accepted['gzip']:
+        encoding, compress = 'gzip', lambda: gzip.compress(body, compresslevel=COMPRESS_LEVEL, mtime=0)
+    else:
+        return response
+    # Bodies from json_response are compressed once per ETag
+    body_key = getattr(response, 'body_key', None)
+    with timed('compress'):
+        response.set_data(response_bodies.get_or_build((body_key, encoding), compress) if body_key else compress())
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+class DashboardSnapshot:
+    """Dashboard views built from one set of sheet versions, never modified once published.
+
+    Holds the finished /api/data payloads (full and lite) and positions
+    payload, plus the order views behind the orders endpoints. Those views
+    are the orders state synced for this snapshot, which later syncs never
+    modify (they extend a copy), so ``order_count`` is simply their size.
+    """
+
+    def __init__(self, version, fingerprint, sheets, errors):
+        started = time.perf_counter()
+        self.version = version
+        self.fingerprint = fingerprint
+        self.errors = dict(errors)
+        # Only a failed transfers or orders sheet makes /api/data partial
+        self.partial = sorted(name for name in self.errors if name in DATA_SHEETS)
+        # Replaced by the shared token once published, so every process agrees on ETags
+        self.etag_salt = _ETAG_SALT
+        # Version of the orders sheet these views stand for, for ?since= deltas
+        self.orders, self.orders_version = sync_sheet_state('orders', sheets['orders'])
+        self.orders_holder = sheet_state_holder('orders')
+        self.payloads = None
+        if sheets['transfers']:
+            transfers = get_sheet_state('transfers', sheets['transfers'])
+            self.payloads = {lite: build_data_payload(transfers, self.orders, lite) for lite in (False, True)}
+            if self.partial:
+                for payload in self.payloads.values():
+                    payload['partial'] = self.partial
+        self.order_count = len(self.orders.orders)
+        self.store_count = len(self.orders.store)
+        self.date_index = self.orders.date_index()
+        self.statuses = [s for s in self.orders.statuses.values() if s != 'N/A']
+        if 'positions' in sheets:
+            self.positions = {'positions': extract_positions_from_sheet(sheets['positions'] or []), 'source': 'sheet'}
+        else:
+            self.positions = self.orders.position_book().summary()
+        self.built_at = time.time()
+        self.built_monotonic = time.monotonic()
+        self.build_seconds = time.perf_counter() - started
+        stage_metrics.observe('snapshot_build', self.build_seconds)
+
+    def etag(self):
+        """Return the ETag for this request's path, or None for a partial snapshot"""
+        return None if self.partial else make_etag(self.fingerprint, self.etag_salt)
+
+    def payload_response(self, lite):
+        """Return the /api/data response, or None when the transfers sheet was unavailable"""
+        if self.payloads is None:
+            return None
+        return json_response(self.etag(), lambda: self.payloads[lite])
+
+    def positions_response(self):
+        return jsonify(self.positions)
+
+    @property
+    def version_tag(self):
+        """Version label that is unique across processes and restarts"""
+        return f'{self.version}.{self.etag_salt}'
+
+    def delta_from(self, previous):
+        """Return the orders and aggregates added since ``previous``, or None if a full reload is needed.
+
+        A delta is only possible when the orders sheet was only appended to
+        between the two snapshots, so ``previous`` holds a prefix of these orders.
+        """
+        if (not isinstance(previous, DashboardSnapshot) or previous.orders_holder is not self.orders_holder
+                or self.payloads is None or previous.payloads is None or self.partial):
+            return None
+        changes = self.orders_holder.changes_since(previous.orders_token, self.orders_version)
+        if changes is None or changes[2]:
+            return None
+        if (self.store_count - previous.store_count + self.order_count - previous.order_count
+                > EVENTS_MAX_DELTA_ORDERS):
+            return None
+        return appended_orders_delta(self.orders, previous.store_count, self.store_count,
+                                     previous.order_count, self.order_count,
+                                     self.payloads[True], previous.payloads[True])
+
+    @property
+    def orders_token(self):
+        """Version token of the orders these views stand for"""
+        return self.orders_holder.token(self.orders_version)
+
+    def data_delta(self, since):
+        """Return the /api/data?since= delta response, or None when a full payload is needed"""
+        if self.payloads is None or self.partial:
+            return None
+        changes = self.orders_holder.changes_since(since, self.orders_version)
+        delta = data_since_delta(self.orders, changes, self.order_count, self.store_count, self.payloads[True])
+        if delta is None:
+            return None
+        etag = self.etag()
+        return json_response(etag, lambda: dict(delta, since=since, version=self.orders_token),
+                             body_key=f'{etag}|{since}')
+
+# /api/data keys holding order tables rather than aggregates
+_ORDER_PAYLOAD_KEYS = ('order_analysis', 'orders_list', 'pages', 'lite')
+
+def appended_orders_delta(views, store_from, store_to, order_from, order_to, lite, before=None):
+    """Return the orders appended between two points of ``views`` plus the lite aggregates.
+
+    Only aggregates that differ from ``before`` are included when it is given.
+    """
+    store = views.store
+    sides = store.side
+    added = range(store_from, store_to)
+    return {
+        'buy_orders': store.to_dicts([i for i in added if sides[i] == SIDE_BUY], include_raw=False),
+        'sell_orders': store.to_dicts([i for i in added if sides[i] == SIDE_SELL], include_raw=False),
+        'orders_list': [{k: o[k] for k in ORDERS_LIST_FIELDS} for o in views.orders[order_from:order_to]],
+        'aggregates': {k: v for k, v in lite.items()
+                       if k not in _ORDER_PAYLOAD_KEYS and (before is None or before.get(k) != v)},
+        'order_summary': {k: v for k, v in lite['order_analysis'].items() if k not in ('buy_orders', 'sell_orders')}
+    }
+
+def data_since_delta(views, changes, order_count, store_count, lite):
+    """Return the /api/data delta for ``changes`` from ``IncrementalSheetState.changes_since``, or None.
+
+    The dashboard's order tables carry no row ids, so only appended orders
+    can be sent; a modified earlier row needs the full payload.
+    """
+    if changes is None:
+        return None
+    rows_before, rows_after, modified = changes
+    if modified or rows_after != order_count or order_count - rows_before > DELTA_MAX_ORDERS:
+        return None
+    store_from = views.store_position(rows_before)
+    if store_from is None:
+        return None
+    return appended_orders_delta(views, store_from, store_count, rows_before, order_count, lite)
+
+class RefreshScheduler:
+    """Refetches every configured sheet on a fixed interval and publishes DashboardSnapshots.
+
+    A snapshot is only rebuilt when a sheet version changed, and is swapped
+    in with a single assignment, so request handlers never see a half-built
+    one. A sheet that fails to refresh keeps its last fetched rows and is
+    reported as partial, while changes to the other sheets are still
+    published; when nothing new was fetched the previous snapshot is kept.
+    """
+
+    def __init__(self, interval=REFRESH_INTERVAL, publisher=None):
+        self.interval = interval
+        self.publisher = publisher
+        self._snapshot = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._counters = {'checks': 0, 'builds': 0, 'unchanged': 0, 'errors': 0}
+        self.last_check_at = None
+        self.last_error = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def current(self):
+        """Return the latest published snapshot, or None before the first build"""
+        return self._snapshot
+
+    def start(self):
+        """Start the scheduler thread unless it is already running"""
+        with self._lock:
+            if self.running:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='dashboard-refresh', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the scheduler thread and wait for an in-progress refresh to finish"""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh_once()
+            except Exception as e:
+                self._counters['errors'] += 1
+                self.last_error = str(e)
+                logger.exception("Error refreshing dashboard snapshot: %s", e)
+            self._stop.wait(self.interval)
+
+    def refresh_once(self):
+        """Refetch the sheets and publish a new snapshot if any of them changed"""
+        sources = configured_sheets()
+        sheets, errors = fetch_sheets(sources, fetcher=sheet_cache.refresh)
+        self._counters['checks'] += 1
+        self.last_check_at = time.time()
+        current = self._snapshot
+        if errors:
+            self._counters['errors'] += 1
+            self.last_error = f"Failed sheets: {', '.join(sorted(errors))}"
+            for name in errors:
+                sheets[name] = sheets[name] or sheet_cache.peek(*sources[name])
+        # Failed sheets keep their cached version, so only the sheets that fetched can change it
+        fingerprint = sheet_cache.fingerprint(list(sources.values()))
+        if (current is not None and current.fingerprint == fingerprint
+                and errors.keys() >= current.errors.keys()):
+            self._counters['unchanged'] += 1
+            return current
+        version = current.version + 1 if current is not None else 1
+        snapshot = DashboardSnapshot(version, fingerprint, sheets, errors)
+        if self.publisher is not None:
+            self.publisher.publish(snapshot)
+        self._snapshot = snapshot
+        self._counters['builds'] += 1
+        logger.info("Published dashboard snapshot v%d in %.3fs", version, snapshot.build_seconds)
+        return snapshot
+
+    def status(self):
+        """Return scheduler counters and the current snapshot's age and build time"""
+        snapshot = self._snapshot
+        now = time.time()
+        status = dict(self._counters, running=self.running, interval=self.interval,
+                      last_check_age_seconds=round(now - self.last_check_at, 3) if self.last_check_at else None,
+                      last_error=self.last_error, snapshot=None)
+        if snapshot is not None:
+            status['snapshot'] = {
+                'version': snapshot.version,
+                'built_at': datetime.fromtimestamp(snapshot.built_at).isoformat(timespec='seconds'),
+                'age_seconds': round(time.monotonic() - snapshot.built_monotonic, 3),
+                'build_seconds': round(snapshot.build_seconds, 3),
+                'orders': snapshot.order_count,
+                'partial': sorted(snapshot.errors)
+            }
+        return status
+
+    def clear(self):
+        """Drop the current snapshot and reset counters"""
+        self._snapshot = None
+        self.last_check_at = None
+        self.last_error = None
+        for name in self._counters:
+            self._counters[name] = 0
+
+_SHARED_MAGIC = b'WBSNAP02'
+# Fields of a modern orders-view order, in payload order
+MODERN_ORDER_FIELDS = ('id', 'customer', 'date', 'status', 'total', 'type', 'symbol')
+
+def _decode_text(view):
+    return str(view, 'utf-8')
+
+def _decode_row(view):
+    return _row_from_json(_loads_json(view))
+
+class _MappedSequence:
+    """Read-only sequence whose items are decoded by ``_item`` each time they are read"""
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._item(j) for j in range(*i.indices(len(self)))]
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError('index out of range')
+        return self._item(i)
+
+    def __iter__(self):
+        return map(self._item, range(len(self)))
+
+class PackedStrings(_MappedSequence):
+    """Strings (or JSON documents) packed end to end into one buffer.
+
+    Item i is ``decode(blob[offsets[i]:offsets[i + 1]])``.
+    """
+
+    def __init__(self, offsets, blob, decode=_decode_text):
+        self._offsets = offsets
+        self._blob = blob
+        self._decode = decode
+
+    @staticmethod
+    def pack(items):
+        """Return (offsets, blob) for an iterable of bytes"""
+        offsets = array('q', [0])
+        blob = bytearray()
+        for item in items:
+            blob += item
+            offsets.append(len(blob))
+        return offsets, blob
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def _item(self, i):
+        return self._decode(self._blob[self._offsets[i]:self._offsets[i + 1]])
+
+class MappedOrders(_MappedSequence):
+    """Modern orders-view orders rebuilt from columns as they are read"""
+
+    def __init__(self, columns):
+        self._columns = [columns[field] for field in MODERN_ORDER_FIELDS]
+
+    def __len__(self):
+        return len(self._columns[0])
+
+    def _item(self, i):
+        return dict(zip(MODERN_ORDER_FIELDS, [column[i] for column in self._columns]))
+
+class MappedOrderViews(OrderViews):
+    """Read-only OrderViews over an image of their columns (see OrderViews.image).
+
+    Numeric columns, codes, postings, the date index and the default table
+    orders are memoryviews into the image, so every process mapping the same
+    shared snapshot shares one copy of them. Only the distinct values of the
+    dictionary-encoded columns are decoded up front; orders and sheet rows
+    are decoded as they are read, unless the image refers to ``rows``.
+    """
+
+    def __init__(self, meta, section, rows=None):
+        super().__init__()
+        values = meta['values']
+
+        def dict_column(name):
+            column = DictColumn()
+            column.values = values[name]
+            column.codes = section(name)
+            return column
+
+        def strings(name, decode=_decode_text):
+            return PackedStrings(section(name + '.offsets'), section(name), decode)
+
+        store = self.store
+        for name in OrderStore.NUMERIC_COLUMNS + ('day', 'side'):
+            setattr(store, name, section('store.' + name))
+        for name in OrderStore.DICT_COLUMNS:
+            setattr(store, name, dict_column('store.' + name))
+        if rows is None:
+            store.rows = strings('store.rows', _decode_row)
+        else:
+            store.rows = list(map(rows.__getitem__, section('store.row_numbers')))
+        columns = {field: strings('orders.' + field) for field in ('id', 'customer', 'date')}
+        columns.update({field: dict_column('orders.' + field) for field in ('status', 'type', 'symbol')})
+        columns['total'] = section('orders.total')
+        self.orders = MappedOrders(columns)
+        for name in ('symbols', 'statuses'):
+            offsets, postings = section(f'terms.{name}.offsets'), section('terms.' + name)
+            setattr(self, name, TermIndex.from_postings({
+                term: postings[offsets[i]:offsets[i + 1]] for i, term in enumerate(values['terms.' + name])
+            }))
+        self._date_index = OrderDateIndex.from_arrays(
+            *(section('dates.' + name) for name in ('positions', 'days', 'buy_prefix', 'sell_prefix')), len(self.orders))
+        for table, sort in ORDER_TABLE_SORT.items():
+            self._table_orders[(table, sort)] = (section(f'table.{table}'), self._table_size(table))
+            self._table_ranks[(table, sort)] = section(f'table.{table}.rank')
+        self._metrics = meta['metrics']
+
+    def add_rows(self, rows, offset=0):
+        raise TypeError('Mapped order views are read-only')
+
+    def copy(self):
+        raise TypeError('Mapped order views are read-only')
+
+def _compressed_sections(name, body):
+    """Return ``body`` under ``name`` plus the gzip (and brotli) copies compress_response would send"""
+    sections = {name: body}
+    if len(body) >= COMPRESS_MIN_SIZE:
+        sections[name + '.gzip'] = gzip.compress(body, compresslevel=COMPRESS_LEVEL, mtime=0)
+        if brotli is not None:
+            sections[name + '.br'] = brotli.compress(body, quality=COMPRESS_LEVEL)
+    return sections
+
+class SharedSnapshot:
+    """Read-only view of a dashboard snapshot mapped from a SharedSnapshotFile.
+
+    Serves the same attributes and responses as DashboardSnapshot. The
+    /api/data and positions bodies, and their compressed copies, are
+    streamed straight out of the mapping, and the orders endpoints read
+    MappedOrderViews over the published columns.
+    """
+
+    def __init__(self, buffer, manifest, base):
+        self._buffer = memoryview(buffer)
+        self.version = manifest['version']
+        self.etag_salt = manifest['token']
+        self.fingerprint = manifest['fingerprint']
+        self.errors = manifest['errors']
+        self.partial = sorted(name for name in self.errors if name in DATA_SHEETS)
+        self.order_count = manifest['order_count']
+        self.statuses = manifest['statuses']
+        self.built_at = manifest['built_at']
+        self.built_monotonic = time.monotonic() - max(time.time() - self.built_at, 0)
+        self.build_seconds = manifest['build_seconds']
+        self.size = len(self._buffer)
+        self._sections = manifest['sections']
+        self._base = base
+        self._views_meta = manifest['views']
+        self._views = None
+        self._lock = threading.Lock()
+
+    def section(self, name):
+        """Return a section of the mapping as a memoryview of its item type, without copying"""
+        return section_view(self._buffer, self._sections[name], self._base)
+
+    def bodies(self, name):
+        """Return a published body and its compressed copies, keyed by content-coding"""
+        bodies = {'identity': self.section(name)}
+        for encoding in ('br', 'gzip'):
+            if f'{name}.{encoding}' in self._sections:
+                bodies[encoding] = self.section(f'{name}.{encoding}')
+        return bodies
+
+    def etag(self):
+        """Return the ETag for this request's path, or None for a partial snapshot"""
+        return None if self.partial else make_etag(self.fingerprint, self.etag_salt)
+
+    def payload_response(self, lite):
+        """Return the /api/data response, or None when the transfers sheet was unavailable"""
+        name = 'data_lite' if lite else 'data'
+        if name not in self._sections:
+            return None
+        return mapped_response(self.etag(), self.bodies(name))
+
+    def positions_response(self):
+        return mapped_response(None, self.bodies('positions'))
+
+    @property
+    def version_tag(self):
+        return f'{self.version}.{self.etag_salt}'
+
+    def delta_from(self, previous):
+        """Mapped snapshots do not keep the previous version's views, so always reload"""
+        return None
+
+    # Order versions are per process, so ?since= always gets the full payload
+    orders_holder = orders_version = orders_token = None
+
+    def data_delta(self, since):
+        return None
+
+    @property
+    def orders(self):
+        """MappedOrderViews over the published columns, set up on first use"""
+        if self._views is None:
+            with self._lock:
+                if self._views is None:
+                    self._views = MappedOrderViews(self._views_meta, self.section)
+        return self._views
+
+    @property
+    def date_index(self):
+        return self.orders.date_index()
+
+class SharedSnapshotFile:
+    """Dashboard snapshots shared between the processes of one server through a file.
+
+    One process holds an exclusive lock on ``<path>.lock``; it runs the
+    background refresh and publishes every new snapshot by writing a
+    complete file next to ``path`` and renaming it over ``path``. The other
+    processes map the current file read-only and switch to a new one as
+    soon as it appears, so a reader only ever sees whole versions. When the
+    publishing process exits its lock is released and the next process to
+    try takes over.
+    """
+
+    # Seconds between lock attempts by processes that are not publishing
+    ACQUIRE_INTERVAL = 1.0
+
+    def __init__(self, path):
+        self.path = path
+        self._lock_fd = None
+        self._next_acquire = 0
+        self._mapped = None
+        self._mapped_key = None
+        self._lock = threading.Lock()
+        self._counters = {'publishes': 0, 'attaches': 0, 'errors': 0}
+
+    @property
+    def is_publisher(self):
+        return self._lock_fd is not None
+
+    def acquire(self):
+        """Try to become the publishing process; return True if this process publishes"""
+        if self._lock_fd is not None:
+            return True
+        if fcntl is None:
+            return True
+        now = time.monotonic()
+        if now < self._next_acquire:
+            return False
+        self._next_acquire = now + self.ACQUIRE_INTERVAL
+        fd = os.open(self.path + '.lock', os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        logger.info("Process %d publishes shared snapshots to %s", os.getpid(), self.path)
+        return True
+
+    def release(self):
+        """Give up publishing so another process can take over"""
+        fd, self._lock_fd = self._lock_fd, None
+        self._next_acquire = 0
+        if fd is not None:
+            os.close(fd)
+
+    def publish(self, snapshot):
+        """Write ``snapshot`` as the new current version; return False if it could not be published.
+
+        Failures are counted and logged rather than raised, so the caller
+        still serves ``snapshot`` itself.
+        """
+        token = os.urandom(8).hex()
+        try:
+            sections = {}
+            if snapshot.payloads is not None:
+                sections.update(_compressed_sections('data', app.json.response(snapshot.payloads[False]).get_data()))
+                sections.update(_compressed_sections('data_lite', app.json.response(snapshot.payloads[True]).get_data()))
+            sections.update(_compressed_sections('positions', app.json.response(snapshot.positions).get_data()))
+            views, columns = snapshot.orders.image()
+            sections.update(columns)
+            layout, sections = layout_sections(sections)
+            manifest = json.dumps({
+                'version': snapshot.version,
+                'token': token,
+                'fingerprint': str(snapshot.fingerprint),
+                'errors': snapshot.errors,
+                'order_count': snapshot.order_count,
+                'statuses': snapshot.statuses,
+                'built_at': snapshot.built_at,
+                'build_seconds': snapshot.build_seconds,
+                'publisher': os.getpid(),
+                'views': views,
+                'sections': layout
+            }).encode()
+        except Exception as e:
+            self._counters['errors'] += 1
+            logger.exception("Error encoding shared snapshot v%d: %s", snapshot.version, e)
+            return False
+        tmp = f'{self.path}.{os.getpid()}.tmp'
+        try:
+            with open(tmp, 'wb') as f:
+                header = _SHARED_MAGIC + len(manifest).to_bytes(8, 'little') + manifest
+                f.write(header + bytes(-len(header) % SECTION_ALIGN))
+                for chunk in iter_section_bytes(layout, sections):
+                    f.write(chunk)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            self._counters['errors'] += 1
+            logger.error("Error publishing shared snapshot to %s: %s", self.path, e)
+            return False
+        snapshot.etag_salt = token
+        self._counters['publishes'] += 1
+        return True
+
+    def current(self):
+        """Return the latest published version as a SharedSnapshot, or None before the first"""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return self._mapped
+        if (st.st_ino, st.st_mtime_ns, st.st_size) != self._mapped_key:
+            with self._lock:
+                self._attach()
+        return self._mapped
+
+    def _attach(self):
+        try:
+            with open(self.path, 'rb') as f:
+                st = os.fstat(f.fileno())
+                key = (st.st_ino, st.st_mtime_ns, st.st_size)
+                if key == self._mapped_key:
+                    return
+                self._mapped_key = key
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            header = len(_SHARED_MAGIC) + 8
+            if buffer[:len(_SHARED_MAGIC)] != _SHARED_MAGIC:
+                raise ValueError('not a shared snapshot file')
+            length = int.from_bytes(buffer[len(_SHARED_MAGIC):header], 'little')
+            manifest = json.loads(buffer[header:header + length])
+            base = header + length
+            snapshot = SharedSnapshot(buffer, manifest, base + -base % SECTION_ALIGN)
+        except (OSError, ValueError, KeyError) as e:
+            self._counters['errors'] += 1
+            logger.error("Error attaching shared snapshot %s: %s", self.path, e)
+            return
+        # The previous mapping stays valid until the last response using it is done
+        self._mapped = snapshot
+        self._counters['attaches'] += 1
+
+    def stats(self):
+        """Return this process's role, counters and the mapped version"""
+        mapped = self._mapped
+        return dict(self._counters, path=self.path, role='publisher' if self.is_publisher else 'reader',
+                    mapped_version=mapped.version if mapped is not None else None,
+                    mapped_bytes=mapped.size if mapped is not None else 0)
+
+shared_snapshot = SharedSnapshotFile(SHARED_SNAPSHOT_PATH) if SHARED_SNAPSHOT_PATH else None
+refresh_scheduler = RefreshScheduler(publisher=shared_snapshot)
+
+@app.before_request
+def start_refresh_scheduler():
+    """Start the background refresh on the first request when REFRESH_INTERVAL is set.
+
+    With a shared snapshot file only the process holding its lock refreshes.
+    """
+    if REFRESH_INTERVAL > 0 and not refresh_scheduler.running:
+        if shared_snapshot is None or shared_snapshot.acquire():
+            refresh_scheduler.start()
+
+def current_snapshot():
+    """Return the published snapshot handlers should read, or None to compute on request"""
+    if refresh_scheduler.running:
+        return refresh_scheduler.current()
+    if shared_snapshot is not None:
+        return shared_snapshot.current()
+    return None
+
+def encode_event(event, data):
+    """Encode one server-sent event with a JSON data line"""
+    return f'event: {event}\ndata: '.encode() + app.json.dumps_bytes(data) + b'\n\n'
+
+class SnapshotEvents:
+    """Tells every /api/events subscriber about each newly published snapshot.
+
+    A watcher thread, alive only while someone is subscribed, polls
+    ``source`` and encodes one message per new snapshot that every
+    subscriber's queue shares, so a change costs one delta and one encode no
+    matter how many dashboards are open. A subscriber that falls
+    QUEUE_SIZE messages behind has its backlog replaced by a reload notice.
+    """
+
+    QUEUE_SIZE = 32
+
+    def __init__(self, source, poll_interval=EVENTS_POLL_INTERVAL):
+        self.source = source
+        self.poll_interval = poll_interval
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._check_lock = threading.Lock()
+        self._thread = None
+        self._last = None
+        self._counters = {'events': 0, 'deltas': 0, 'reloads': 0, 'overflows': 0}
+
+    def subscribe(self):
+        """Register a subscriber; returns its queue of encoded events"""
+        subscriber = queue.Queue(self.QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.add(subscriber)
+            if self._thread is None:
+                # Only snapshots published from now on are announced
+                self._last = self.source()
+                self._thread = threading.Thread(target=self._run, name='snapshot-events', daemon=True)
+                self._thread.start()
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def version_tag(self):
+        """Return the version tag of the last announced snapshot, or None"""
+        last = self._last
+        return last.version_tag if last is not None else None
+
+    def _run(self):
+        while True:
+            time.sleep(self.poll_interval)
+            with self._lock:
+                if not self._subscribers:
+                    self._thread = None
+                    return
+            try:
+                self.check()
+            except Exception as e:
+                logger.exception("Error announcing snapshot: %s", e)
+
+    def check(self):
+        """Announce the current snapshot if it is new; return True if an event was sent"""
+        with self._check_lock:
+            snapshot = self.source()
+            previous = self._last
+            if snapshot is None or snapshot is previous:
+                return False
+            self._last = snapshot
+        delta = snapshot.delta_from(previous) if previous is not None else None
+        self._counters['events'] += 1
+        self._counters['deltas' if delta is not None else 'reloads'] += 1
+        base = previous.version_tag if previous is not None else None
+        message = {'version': snapshot.version_tag, 'base': base, 'delta': delta,
+                   'data_version': snapshot.orders_token}
+        self.broadcast(encode_event('snapshot', message),
+                       lambda: encode_event('snapshot', dict(message, base=None, delta=None)))
+        return True
+
+    def broadcast(self, message, reload_message):
+        """Queue ``message`` for every subscriber; lagging ones get ``reload_message()`` instead"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        reload = None
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(message)
+            except queue.Full:
+                self._counters['overflows'] += 1
+                reload = reload or reload_message()
+                with subscriber.mutex:
+                    subscriber.queue.clear()
+                subscriber.put_nowait(reload)
+
+    def stats(self):
+        with self._lock:
+            subscribers = len(self._subscribers)
+        return dict(self._counters, subscribers=subscribers, version=self.version_tag())
+
+snapshot_events = SnapshotEvents(lambda: current_snapshot())
+
+def start_refresh_for_events():
+    """Make sure some process publishes snapshots for event subscribers to hear about"""
+    if refresh_scheduler.running:
+        return
+    if shared_snapshot is not None and not shared_snapshot.acquire():
+        return
+    if refresh_scheduler.interval <= 0:
+        refresh_scheduler.interval = EVENTS_REFRESH_INTERVAL
+    refresh_scheduler.start()
+
+def current_order_views():
+    """Return the OrderViews of the current snapshot, or synced on request"""
+    snapshot = current_snapshot()
+    if snapshot is not None:
+        return snapshot.orders
+    with timed('fetch'):
+        rows = get_orders_sheet_data()
+    return get_sheet_state('orders', rows)
+
 @app.route('/')
 def index():
     """Main dashboard page"""
@@ -712,171 +4207,265 @@ def index():
 @app.route('/api/data')
 def get_data():
     """API endpoint to fetch and return processed data"""
-    raw_data = get_sheet_data()
+    lite = request.args.get('lite', '').lower() in ('1', 'true')
+    since = request.args.get('since', '').strip()
+    snapshot = current_snapshot()
+    if snapshot is not None:
+        response = (since and snapshot.data_delta(since)) or snapshot.payload_response(lite)
+        if response is None:
+            return sheets_unavailable_response()
+        # Lets the dashboard match /api/events deltas to the data it holds
+        response.headers['X-Snapshot-Version'] = snapshot.version_tag
+        if snapshot.orders_token is not None:
+            response.headers['X-Data-Version'] = snapshot.orders_token
+        return response
+    # Fetch every configured sheet concurrently; positions only warms the cache
+    sources = configured_sheets()
+    (sheets, errors), etag = fetch_with_etag([sources['transfers'], sources['orders']],
+                                             lambda: fetch_sheets(sources))
+    raw_data = sheets['transfers']
     
     if not raw_data:
-        error_msg = 'Unable to fetch data from Google Sheets. '
-        if USE_PUBLIC_ACCESS:
-            error_msg += 'The sheet may not be publicly accessible. Please make it public (Share → Anyone with the link) or set up Google Sheets API credentials.'
-        else:
-            error_msg += 'Please check your credentials or make the sheet publicly accessible.'
-        return jsonify({
-            'error': error_msg
-        }), 500
-    
-    # Fetch orders data from separate sheet
-    orders_data = get_sheet_data(ORDERS_SPREADSHEET_ID, ORDERS_WORKSHEET_GID)
+        return sheets_unavailable_response()
     
+    # Orders come from a separate sheet; a failure there still returns the transfer views
+    partial = sorted(name for name in errors if name in DATA_SHEETS)
+    if partial:
+        payload = data_payload(raw_data, sheets['orders'], lite)
+        payload['partial'] = partial
+        return jsonify(payload)
+    # The token is taken in the same sync as the views, so it always describes them
+    views, version = sync_sheet_state('orders', sheets['orders'])
+    transfers = get_sheet_state('transfers', raw_data)
+    holder = sheet_state_holder('orders')
+    token = holder.token(version)
+
+    def build():
+        delta = None
+        if since:
+            delta = data_since_delta(views, holder.changes_since(since, version), len(views.orders), len(views.store),
+                                     build_data_payload(transfers, views, lite=True))
+        if delta is None:
+            return build_data_payload(transfers, views, lite)
+        return dict(delta, since=since, version=token)
+    response = json_response(etag, build, body_key=since and f'{etag}|{since}')
+    # Sent back as ?since= to fetch only the orders added after this response
+    response.headers['X-Data-Version'] = token
+    return response
+
+def sheets_unavailable_response():
+    """Return the 500 response sent when the transfers sheet cannot be fetched"""
+    error_msg = 'Unable to fetch data from Google Sheets. '
+    if USE_PUBLIC_ACCESS:
+        error_msg += 'The sheet may not be publicly accessible. Please make it public (Share → Anyone with the link) or set up Google Sheets API credentials.'
+    else:
+        error_msg += 'Please check your credentials or make the sheet publicly accessible.'
     return jsonify({
-        'monthly_cash_flow': process_monthly_cash_flow(raw_data),
-        'yearly_transfer_volume': process_yearly_transfer_volume(raw_data),
-        'transaction_status': process_transaction_status(raw_data),
-        'transfer_by_type': process_transfer_by_type(raw_data),
-        'summary_metrics': calculate_summary_metrics(raw_data),
-        'order_analysis': process_order_analysis(orders_data),
-        'orders_list': process_orders_list(orders_data)
-    })
+        'error': error_msg
+    }), 500
+
+def data_payload(raw_data, orders_data, lite=False):
+    """Build the /api/data payload from the transfers and orders sheet rows"""
+    return build_data_payload(get_sheet_state('transfers', raw_data), get_sheet_state('orders', orders_data), lite)
+
+def build_data_payload(transfers, order_views, lite=False):
+    """Build the /api/data payload from synced transfer and order states"""
+    with timed('aggregate'):
+        payload = dict(transfers.result())
+        if lite:
+            # Aggregates plus the first page of each order table; the rest is
+            # fetched through /api/orders/table/<name>
+            pages, first = {}, {}
+            for table in ORDER_TABLES:
+                sort = ORDER_TABLE_SORT[table]
+                first[table], after, total = order_views.table_page(table, sort, ORDER_TABLE_FIELDS[table])
+                pages[table] = {
+                    'total': total,
+                    'next_cursor': encode_order_cursor(sort, after) if after is not None else None
+                }
+            analysis = dict(order_views.order_summary())
+            analysis['buy_orders'] = first['buy']
+            analysis['sell_orders'] = first['sell']
+            payload['order_analysis'] = analysis
+            payload['orders_list'] = first['orders_list']
+            payload['pages'] = pages
+            payload['lite'] = True
+        else:
+            payload['order_analysis'] = order_views.order_analysis()
+            payload['orders_list'] = order_views.orders_list()
+        return payload
 
 def get_orders_sheet_data():
-    """Fetch raw orders sheet from Google Sheets"""
-    return get_sheet_data(ORDERS_SPREADSHEET_ID, ORDERS_WORKSHEET_GID)
+    """Fetch raw orders sheet from Google Sheets (via the sheet cache)"""
+    return get_cached_sheet_data(ORDERS_SPREADSHEET_ID, ORDERS_WORKSHEET_GID)
+
+def _normalize_modern_order_row(row, schema, index, amounts, position):
+    """Normalize one orders-sheet row for the modern orders view"""
+    order = _normalize_order_list_row(row, schema, index, amounts, position)
+    status = order['status']
+    order['type'] = 'BUY' if status.lower() == 'buy' or (row.get('Side', '').upper() == 'BUY') else 'SELL'
+    order['symbol'] = row.get('Symbol', row.get('symbol', 'N/A'))
+    return order
 
 def process_orders_list_v2(rows):
     """Normalize orders for modern view"""
     orders = []
     if not rows:
         return orders
-    for i, row in enumerate(rows):
-        keys = {k.lower(): k for k in row.keys()}
-        oid = None
-        for k in keys:
-            if 'side' in k:
-                continue
-            if any(x in k for x in ['order id', 'orderid', ' id ', 'id', 'trade id', 'transaction id']):
-                v = row[keys[k]]
-                oid = str(v).strip() if v is not None else None
-                if oid:
-                    break
-        cust = None
-        for k in keys:
-            if any(x in k for x in ['customer', 'customer name', 'client', 'account', 'account name', 'name']):
-                v = row[keys[k]]
-                cust = str(v).strip() if v is not None else None
-                if cust:
-                    break
-        status = None
-        for k in keys:
-            if any(x in k for x in ['status', 'state']):
-                v = row[keys[k]]
-                status = str(v).strip() if v is not None else None
-                if status:
-                    break
-        date_val = None
-        for k in keys:
-            if any(x in k for x in ['filled time', 'placed time', 'order date', 'date', 'timestamp']):
-                v = row[keys[k]]
-                date_val = str(v).strip() if v is not None else None
-                if date_val:
-                    if ' ' in date_val:
-                        date_val = date_val.split(' ')[0]
-                    break
-        total = 0.0
-        for k in keys:
-            if any(x in k for x in ['amount', 'value']) and not any(y in k for y in ['qty', 'quantity', 'shares']):
-                total = parse_float(row[keys[k]], 0)
-                if total != 0:
-                    break
-        if total == 0:
-            price = 0.0
-            qty = 0.0
-            for k in keys:
-                if 'price' in k:
-                    price = parse_float(row[keys[k]], 0)
-                    if price != 0:
-                        break
-            for k in keys:
-                if any(x in k for x in ['quantity', 'qty', 'shares', 'filled']):
-                    qty = parse_float(row[keys[k]], 0)
-                    if qty != 0:
-                        break
-            total = price * qty
-        if not oid:
-            oid = f"ORD-{i+1}"
-        orders.append({
-            'id': oid,
-            'customer': cust or 'N/A',
-            'date': date_val or '',
-            'status': status or 'N/A',
-            'total': float(total),
-            'type': 'BUY' if (status and status.lower() == 'buy') or (row.get('Side', '').upper() == 'BUY') else 'SELL',
-            'symbol': row.get('Symbol', row.get('symbol', 'N/A'))
-        })
+    amounts = AmountColumns(rows)
+    for i, (row, schema) in enumerate(iter_rows_with_schema(rows)):
+        orders.append(_normalize_modern_order_row(row, schema, i, amounts, i))
     return orders
 
-def aggregate_orders_metrics(orders):
-    """Aggregate KPIs for orders view"""
-    buy_total = sum(o['total'] for o in orders if o['type'] == 'BUY')
-    sell_total = sum(o['total'] for o in orders if o['type'] == 'SELL')
+def aggregate_orders_metrics(orders, base=None):
+    """Aggregate KPIs for orders view, adding to the ``base`` metrics of earlier orders if given"""
+    buy_total = base['buy_total'] if base else 0
+    sell_total = base['sell_total'] if base else 0
+    for o in orders:
+        if o['type'] == 'BUY':
+            buy_total += o['total']
+        elif o['type'] == 'SELL':
+            sell_total += o['total']
     profit = sell_total - buy_total
     return {
         'buy_total': buy_total,
         'sell_total': sell_total,
         'profit': profit,
-        'orders_count': len(orders)
+        'orders_count': len(orders) + (base['orders_count'] if base else 0)
     }
 
 @app.route('/api/orders')
 def api_orders():
     """API endpoint for orders view with filters"""
-    orders = process_orders_list_v2(get_orders_sheet_data())
+    snapshot = current_snapshot()
+    if snapshot is not None:
+        views, etag = snapshot.orders, snapshot.etag()
+        date_index = snapshot.date_index
+        holder, version = snapshot.orders_holder, snapshot.orders_version
+    else:
+        rows, etag = fetch_with_etag([(ORDERS_SPREADSHEET_ID, ORDERS_WORKSHEET_GID)], get_orders_sheet_data)
+        views, version = sync_sheet_state('orders', rows)
+        date_index = None
+        holder = sheet_state_holder('orders')
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
+    orders = views.orders
     # Apply filters from query params
     symbol_filter = request.args.get('symbol', '').strip().lower()
     status_filter = request.args.get('status', '').strip().lower()
     start_date = request.args.get('start', '').strip()
     end_date = request.args.get('end', '').strip()
-    filtered = []
-    for o in orders:
-        if symbol_filter and symbol_filter not in o['symbol'].lower():
-            continue
-        if status_filter and status_filter not in o['status'].lower():
-            continue
-        if start_date and o['date'] < start_date:
-            continue
-        if end_date and o['date'] > end_date:
-            continue
-        filtered.append(o)
-    metrics = aggregate_orders_metrics(filtered)
+    start_day = epoch_day(parse_date(start_date)) if start_date else None
+    end_day = epoch_day(parse_date(end_date)) if end_date else None
+    if start_day == NO_DATE or end_day == NO_DATE:
+        return jsonify({'error': 'Invalid start or end date'}), 400
+    
+    metrics = None
+    # Ascending order positions selected by each active filter
+    selections = []
+    if start_day is not None or end_day is not None:
+        index = date_index or views.date_index()
+        lo, hi = index.bounds(start_day, end_day)
+        selections.append(sorted(index.positions[lo:hi]))
+        if not symbol_filter and not status_filter:
+            metrics = index.metrics(lo, hi)
+    if symbol_filter:
+        selections.append(views.symbols.positions(symbol_filter))
+    if status_filter:
+        selections.append(views.statuses.positions(status_filter))
+    
+    if selections:
+        selections.sort(key=len)
+        others = [set(positions) for positions in selections[1:]]
+        positions = [i for i in selections[0] if all(i in other for other in others)]
+        filtered = [orders[i] for i in positions]
+    else:
+        positions = None
+        filtered = orders
+    if metrics is None:
+        metrics = views.metrics() if positions is None else aggregate_orders_metrics(filtered)
+    token = holder.token(version) if holder is not None else None
+    since = request.args.get('since', '').strip()
+    changes = holder.changes_since(since, version) if since and holder is not None else None
+    if changes is not None:
+        rows_before, rows_after, modified = changes
+        changed = modified + list(range(rows_before, min(rows_after, len(orders))))
+        if len(changed) <= DELTA_MAX_ORDERS:
+            # Changed orders matching the filters, and ids of those that no longer do
+            selected = set(positions) if positions is not None else None
+            return with_etag(jsonify({
+                'orders': [orders[i] for i in changed if selected is None or i in selected],
+                'removed': [orders[i]['id'] for i in modified if selected is not None and i not in selected],
+                'metrics': metrics,
+                'total': len(filtered),
+                'since': since,
+                'version': token
+            }), etag)
     # Pagination
     page = int(request.args.get('page', 1))
     per_page = int(request.args.get('per_page', 50))
     start = (page - 1) * per_page
     end = start + per_page
     paginated = filtered[start:end]
-    return jsonify({
+    return with_etag(jsonify({
         'orders': paginated,
         'metrics': metrics,
         'page': page,
         'per_page': per_page,
-        'total': len(filtered)
-    })
+        'total': len(filtered),
+        'version': token
+    }), etag)
 
 @app.route('/api/orders/symbols')
 def api_orders_symbols():
     """API endpoint for symbol autocomplete"""
-    orders = process_orders_list_v2(get_orders_sheet_data())
-    symbols = sorted(list(set(o['symbol'] for o in orders if o['symbol'] != 'N/A')))
-    query = request.args.get('q', '').lower()
-    if query:
-        symbols = [s for s in symbols if query in s.lower()]
-    return jsonify({'symbols': symbols[:10]})
+    views = current_order_views()
+    matches = views.symbols.matching(request.args.get('q', ''))
+    symbols = list(itertools.islice((s for s in matches if s != 'N/A'), 10))
+    return jsonify({'symbols': symbols})
 
 @app.route('/api/orders/statuses')
 def api_orders_statuses():
     """API endpoint for status dropdown"""
-    orders = process_orders_list_v2(get_orders_sheet_data())
-    statuses = sorted(list(set(o['status'] for o in orders if o['status'] != 'N/A')))
+    snapshot = current_snapshot()
+    if snapshot is not None:
+        return jsonify({'statuses': snapshot.statuses})
+    views = get_sheet_state('orders', get_orders_sheet_data())
+    statuses = [s for s in views.statuses.values() if s != 'N/A']
     return jsonify({'statuses': statuses})
 
+@app.route('/api/orders/table/<table>')
+def api_order_table(table):
+    """Cursor-paginated, sortable and projected rows of one order table"""
+    if table not in ORDER_TABLES:
+        return jsonify({'error': f'Unknown order table: {table}'}), 404
+    views = current_order_views()
+    try:
+        sort = request.args.get('sort', ORDER_TABLE_SORT[table]).strip()
+        fields = request.args.get('fields', '').strip()
+        fields = tuple(f.strip() for f in fields.split(',')) if fields else ORDER_TABLE_FIELDS[table]
+        unknown = [f for f in fields if f not in ORDER_TABLES[table]]
+        if unknown:
+            raise ValueError(f'Unknown fields for {table}: {", ".join(unknown)}')
+        limit = min(max(int(request.args.get('limit', ORDER_PAGE_SIZE)), 1), ORDER_PAGE_MAX)
+        after = None
+        cursor = request.args.get('cursor', '').strip()
+        if cursor:
+            cursor_sort, after = decode_order_cursor(cursor)
+            if cursor_sort != sort:
+                raise ValueError('Cursor was issued for a different sort')
+        items, after, total = views.table_page(table, sort, fields, after, limit)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({
+        'items': items,
+        'next_cursor': encode_order_cursor(sort, after) if after is not None else None,
+        'total': total,
+        'sort': sort,
+        'fields': list(fields)
+    })
+
 @app.route('/orders')
 def orders_view():
     """Modern orders view page"""
@@ -884,31 +4473,159 @@ def orders_view():
 
 @app.route('/api/positions')
 def api_positions():
+    """Open positions from the positions sheet if configured, otherwise from the orders"""
+    snapshot = current_snapshot()
+    if snapshot is not None:
+        return snapshot.positions_response()
     if not USE_POSITIONS_SHEET:
-        return jsonify({'positions': []})
-    sheet_id = POSITIONS_SPREADSHEET_ID or SPREADSHEET_ID
-    gid = POSITIONS_WORKSHEET_GID or WORKSHEET_GID
-    rows = get_sheet_data(sheet_id, gid)
-    positions = extract_positions_from_sheet(rows or [])
-    return jsonify({'positions': positions})
+        views = current_order_views()
+        with timed('aggregate'):
+            return jsonify(views.position_book().summary())
+    sheet_id, gid = configured_sheets()['positions']
+    with timed('fetch'):
+        rows = get_cached_sheet_data(sheet_id, gid)
+    with timed('aggregate'):
+        positions = extract_positions_from_sheet(rows or [])
+    return jsonify({'positions': positions, 'source': 'sheet'})
 
-def fetch_quotes(symbols):
+def fetch_quote_batch(symbols):
+    """Fetch regular market prices for one batch of symbols, raising on upstream errors"""
+    joined = ','.join(symbols)
+    r = get_http_session().get(f"{QUOTES_URL}?symbols={joined}", timeout=5)
+    r.raise_for_status()
     results = {}
-    try:
-        joined = ','.join(symbols)
-        url = f"https://query1.finance.yahoo.com/v7/finance/quote?symbols={joined}"
-        r = requests.get(url, timeout=5)
-        if r.status_code == 200:
-            data = r.json()
-            for item in data.get('quoteResponse', {}).get('result', []):
-                sym = item.get('symbol')
-                price = item.get('regularMarketPrice')
-                if sym and price is not None:
-                    results[sym] = float(price)
-    except Exception:
-        pass
+    for item in r.json().get('quoteResponse', {}).get('result', []):
+        sym = item.get('symbol')
+        price = item.get('regularMarketPrice')
+        if sym and price is not None:
+            results[sym] = float(price)
     return results
 
+class QuoteService:
+    """Per-symbol price cache in front of the upstream quote endpoint.
+
+    Prices younger than ``ttl`` are served from memory. Missing or expired
+    symbols are fetched in batches of at most ``batch_size``; a symbol that
+    is already being fetched for another request is waited on instead of
+    being requested again. If the upstream fails, the last known price is
+    returned and reported as stale until it is older than ``max_stale``.
+    Symbols the upstream does not know are remembered for ``negative_ttl``,
+    and at most ``max_entries`` symbols are kept, least recently used first
+    out.
+    """
+
+    def __init__(self, fetcher, ttl=QUOTE_TTL, max_stale=QUOTE_MAX_STALE, batch_size=QUOTE_BATCH_SIZE,
+                 clock=time.monotonic, negative_ttl=QUOTE_NEGATIVE_TTL, max_entries=QUOTE_CACHE_SIZE):
+        self.fetcher = fetcher
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.batch_size = batch_size
+        self.clock = clock
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._entries = collections.OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'coalesced': 0, 'batches': 0, 'errors': 0, 'stale': 0,
+                          'evictions': 0}
+
+    def get(self, symbols):
+        """Return ({symbol: price}, [stale symbols]) for the requested symbols"""
+        symbols = list(dict.fromkeys(symbols))
+        missing, waits = [], set()
+        with self._lock:
+            now = self.clock()
+            for sym in symbols:
+                entry = self._entries.get(sym)
+                if entry is not None:
+                    age = now - entry['fetched_at']
+                    if age < (self.negative_ttl if entry['price'] is None else self.ttl):
+                        self._counters['hits'] += 1
+                        self._entries.move_to_end(sym)
+                        continue
+                    if entry['price'] is None or age >= self.max_stale:
+                        del self._entries[sym]
+                if sym in self._inflight:
+                    self._counters['coalesced'] += 1
+                    waits.add(self._inflight[sym])
+                else:
+                    self._counters['misses'] += 1
+                    missing.append(sym)
+            if missing:
+                event = threading.Event()
+                for sym in missing:
+                    self._inflight[sym] = event
+
+        if missing:
+            try:
+                for start in range(0, len(missing), self.batch_size):
+                    self._fetch_batch(missing[start:start + self.batch_size])
+            finally:
+                with self._lock:
+                    for sym in missing:
+                        self._inflight.pop(sym, None)
+                event.set()
+        for waiting in waits:
+            waiting.wait()
+
+        quotes, stale = {}, []
+        with self._lock:
+            now = self.clock()
+            for sym in symbols:
+                entry = self._entries.get(sym)
+                if entry is None or entry['price'] is None:
+                    continue
+                age = now - entry['fetched_at']
+                if age >= self.max_stale:
+                    continue
+                quotes[sym] = entry['price']
+                if age >= self.ttl:
+                    stale.append(sym)
+            self._counters['stale'] += len(stale)
+        return quotes, stale
+
+    def _fetch_batch(self, batch):
+        """Fetch one batch from upstream and store the prices it returned"""
+        try:
+            prices = self.fetcher(batch)
+        except Exception as e:
+            logger.warning("Error fetching quotes for %d symbols: %s", len(batch), e)
+            with self._lock:
+                self._counters['errors'] += 1
+            return
+        with self._lock:
+            self._counters['batches'] += 1
+            fetched_at = self.clock()
+            for sym, price in prices.items():
+                self._entries[sym] = {'price': price, 'fetched_at': fetched_at}
+                self._entries.move_to_end(sym)
+            # Unknown symbols are remembered for negative_ttl so they are not re-requested every call
+            for sym in batch:
+                if sym not in self._entries:
+                    self._entries[sym] = {'price': None, 'fetched_at': fetched_at}
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters['evictions'] += 1
+
+    def stats(self):
+        """Return hit/miss counters and the number of cached symbols"""
+        with self._lock:
+            return dict(self._counters, symbols=len(self._entries))
+
+    def clear(self):
+        """Drop all cached prices and reset counters"""
+        with self._lock:
+            self._entries.clear()
+            for name in self._counters:
+                self._counters[name] = 0
+
+# fetch_quote_batch is resolved at call time so it can be swapped out (e.g. in tests)
+quote_service = QuoteService(lambda symbols: fetch_quote_batch(symbols))
+
+def fetch_quotes(symbols):
+    """Return {symbol: price} for the symbols, served through the quote cache"""
+    return quote_service.get(symbols)[0]
+
 @app.route('/api/quotes')
 def api_quotes():
     if not ENABLE_QUOTES:
@@ -917,16 +4634,87 @@ def api_quotes():
     symbols = [s.strip() for s in syms.split(',') if s.strip()]
     if not symbols:
         return jsonify({'error': 'No symbols provided'}), 400
-    quotes = fetch_quotes(symbols)
-    return jsonify({'quotes': quotes})
+    quotes, stale = quote_service.get(symbols)
+    return jsonify({'quotes': quotes, 'stale': stale})
 
 @app.route('/api/raw')
 def get_raw_data():
     """API endpoint to return raw sheet data"""
-    data = get_sheet_data()
+    data, etag = fetch_with_etag([(SPREADSHEET_ID, WORKSHEET_GID)], get_cached_sheet_data)
     if not data:
         return jsonify({'error': 'Unable to fetch data'}), 500
-    return jsonify(data)
+    return json_response(etag, lambda: data)
+
+@app.route('/api/cache/stats')
+def api_cache_stats():
+    """API endpoint exposing sheet cache and connection reuse counters"""
+    stats = sheet_cache.stats()
+    stats['http'] = http_connection_stats()
+    stats['gspread'] = dict(_gspread_counters)
+    stats['responses'] = response_bodies.stats()
+    stats['quotes'] = quote_service.stats()
+    stats['refresh'] = refresh_scheduler.status()
+    stats['store'] = sheet_cache.store.stats() if sheet_cache.store is not None else None
+    stats['sheet_states'] = {name: dict(holder.counters, version=holder.version, rows=len(holder.rows))
+                             for name, holder in list(_sheet_states.items())}
+    return jsonify(stats)
+
+@app.route('/api/refresh/status')
+def api_refresh_status():
+    """API endpoint exposing background refresh state and snapshot age"""
+    status = refresh_scheduler.status()
+    status['shared'] = shared_snapshot.stats() if shared_snapshot is not None else None
+    status['events'] = snapshot_events.stats()
+    return jsonify(status)
+
+@app.route('/api/events')
+def api_events():
+    """Server-sent events: a "snapshot" event per new dashboard snapshot.
+
+    Each event carries the new and previous version tags and, when the
+    orders sheet was only appended to, a delta with the new orders and the
+    changed aggregates; a null delta means the client should reload
+    /api/data. The stream opens with a "hello" event naming the current version.
+    """
+    start_refresh_for_events()
+    subscriber = snapshot_events.subscribe()
+    hello = encode_event('hello', {'version': snapshot_events.version_tag()})
+
+    def stream():
+        try:
+            yield hello
+            while True:
+                try:
+                    yield subscriber.get(timeout=EVENTS_KEEPALIVE)
+                except queue.Empty:
+                    yield b': keepalive\n\n'
+        finally:
+            snapshot_events.unsubscribe(subscriber)
+
+    response = app.response_class(stream(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # Keeps nginx from buffering the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/api/metrics')
+def api_metrics():
+    """API endpoint exposing rolling per-stage and per-route timing histograms"""
+    return jsonify({
+        'window_seconds': stage_metrics.window,
+        'stages': stage_metrics.snapshot(),
+        'profiler': profiler.report(int(request.args.get('limit', 50))) if profiler is not None else None
+    })
+
+@app.route('/api/metrics/profile')
+def api_metrics_profile():
+    """Sampled request stacks in collapsed (flamegraph) format; ?reset=1 clears them"""
+    if profiler is None:
+        return jsonify({'error': 'Profiler disabled, set PROFILE_INTERVAL_MS to enable it'}), 404
+    body = profiler.collapsed()
+    if request.args.get('reset', '').lower() in ('1', 'true'):
+        profiler.clear()
+    return app.response_class(body, mimetype='text/plain')
 
 if __name__ == '__main__':
     app.run(debug=True, host='127.0.0.1', port=5001)
@@ -0,0 +1,45 @@
+"""Microbenchmark of per-cell parse_float against bulk parse_amount_column.
+
+Usage: python benchmarks/bench_amounts.py [--rows 1000000]
+"""
+import argparse
+
+from common import best_of, load_app
+from generators import make_orders_rows, make_transfer_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    args = parser.parse_args()
+
+    app = load_app()
+    np_module = app.np
+    transfers = make_transfer_rows(args.rows)
+    columns = {
+        'transfer amounts': [r['Amount'] for r in transfers],
+        'transfer amounts numeric': [r['Amount Numeric'] for r in transfers],
+        'order prices': [r['Avg Price'] for r in make_orders_rows(args.rows)],
+    }
+
+    def bulk(values, numpy):
+        def run():
+            app.np = np_module if numpy else None
+            try:
+                app.parse_amount_column(values)
+            finally:
+                app.np = np_module
+        return run
+
+    for name, values in columns.items():
+        timings = {'parse_float per cell': best_of(lambda: [app.parse_float(v) for v in values])}
+        if np_module is not None:
+            timings['parse_amount_column (numpy)'] = best_of(bulk(values, True))
+        timings['parse_amount_column (pure)'] = best_of(bulk(values, False))
+        print(f'{name} ({len(values)} values)')
+        for label, t in timings.items():
+            print(f'  {label:30s} {t * 1e9 / len(values):9.0f} ns/value')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""/api/data payload size and time to a paintable response, full vs lite.
+
+Usage: python benchmarks/bench_api_payload.py [--orders 50000] [--transfers 5000]
+"""
+import argparse
+import contextlib
+import io
+import json
+import time
+
+from common import load_app
+from generators import make_orders_rows, make_transfer_rows
+
+
+def first_paint(client, url):
+    """Seconds until the response is received and parsed, and its size in bytes"""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        resp = client.get(url)
+    json.loads(resp.data)
+    return time.perf_counter() - start, len(resp.data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--orders', type=int, default=50000)
+    parser.add_argument('--transfers', type=int, default=5000)
+    args = parser.parse_args()
+
+    app = load_app()
+    orders, transfers = make_orders_rows(args.orders), make_transfer_rows(args.transfers)
+    app.get_sheet_data = lambda sheet_id=None, gid=None: orders if gid == app.ORDERS_WORKSHEET_GID else transfers
+    client = app.app.test_client()
+
+    print(f'{args.orders} orders, {args.transfers} transfers (warm state)')
+    for label, url in (('full', '/api/data'), ('lite', '/api/data?lite=1')):
+        first_paint(client, url)
+        seconds, size = first_paint(client, url)
+        print(f'  {label:5} {size / 1e6:8.2f} MB  {seconds * 1e3:8.1f} ms to parsed response')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""Symbol autocomplete and filter lookups on a warm orders state.
+
+Usage: python benchmarks/bench_autocomplete.py [--rows 100000] [--repeat 1000]
+"""
+import argparse
+import time
+
+from common import load_app
+from generators import make_orders_rows
+
+QUERIES = ('a', 'd', 'ts', 'amd', 'nvda', 'zz')
+
+
+def per_call(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=1000)
+    args = parser.parse_args()
+
+    app = load_app()
+    views = app.OrderViews()
+    views.add_rows(make_orders_rows(args.rows))
+    orders = views.orders
+
+    def scan(query):
+        symbols = sorted(set(o['symbol'] for o in orders if o['symbol'] != 'N/A'))
+        return [s for s in symbols if query in s.lower()][:10]
+
+    print(f'{args.rows} orders')
+    for query in QUERIES:
+        assert [s for s in views.symbols.matching(query) if s != 'N/A'][:10] == scan(query)
+        t_index = per_call(lambda: views.symbols.matching(query), args.repeat)
+        t_scan = per_call(lambda: scan(query), max(1, args.repeat // 100))
+        print(f'  q={query!r:7} scan {t_scan * 1e6:10.1f} us  index {t_index * 1e6:6.2f} us')
+    t_filter = per_call(lambda: views.symbols.positions('amd'), max(1, args.repeat // 100))
+    t_filter_scan = per_call(lambda: [i for i, o in enumerate(orders) if 'amd' in o['symbol'].lower()],
+                             max(1, args.repeat // 100))
+    print(f'  symbol filter scan {t_filter_scan * 1e3:8.2f} ms  postings {t_filter * 1e3:8.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""Peak memory of ingesting a large public CSV export from a local stub server.
+
+Each variant runs in a fresh subprocess and reports how far its peak RSS
+rose above the RSS it had before fetching.
+
+Usage: python benchmarks/bench_csv_stream.py [--mb 200] [--baseline REV]
+"""
+import argparse
+import csv
+import io
+import json
+import multiprocessing
+import os
+import resource
+import subprocess
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from generators import make_transfer_rows
+
+
+def csv_block(rows=5000):
+    buf = io.StringIO()
+    data = make_transfer_rows(rows)
+    writer = csv.DictWriter(buf, fieldnames=list(data[0]))
+    writer.writeheader()
+    writer.writerows(data)
+    header, _, body = buf.getvalue().encode().partition(b'\r\n')
+    return header + b'\r\n', body
+
+
+def serve(size, port_queue):
+    header, body = csv_block()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/csv; charset=utf-8')
+            self.end_headers()
+            self.wfile.write(header)
+            written = len(header)
+            while written < size:
+                self.wfile.write(body)
+                written += len(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    port_queue.put(server.server_port)
+    server.serve_forever()
+
+
+def max_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def child(url, rev):
+    from common import load_app
+    app = load_app(rev)
+    app.SHEETS_EXPORT_URL = url
+    before = max_rss_mb()
+    start = time.perf_counter()
+    rows = app.get_sheet_data_public('bench', '0')
+    elapsed = time.perf_counter() - start
+    print(json.dumps({'rows': len(rows), 'seconds': elapsed, 'peak_mb': max_rss_mb() - before}))
+
+
+def run_variant(url, rev=None):
+    cmd = [sys.executable, os.path.abspath(__file__), '--child', url]
+    if rev:
+        cmd += ['--rev', rev]
+    out = subprocess.check_output(cmd, cwd=os.path.dirname(os.path.abspath(__file__)), text=True)
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--mb', type=int, default=200)
+    parser.add_argument('--baseline', help='git revision of app.py to compare against')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--rev', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child(args.child, args.rev)
+
+    port_queue = multiprocessing.Queue()
+    server = multiprocessing.Process(target=serve, args=(args.mb * 1000 * 1000, port_queue), daemon=True)
+    server.start()
+    url = f'http://127.0.0.1:{port_queue.get()}/d/{{sheet_id}}/export?format=csv'
+    try:
+        variants = [('working tree', None)] + ([(args.baseline, args.baseline)] if args.baseline else [])
+        print(f'{args.mb} MB export')
+        for label, rev in variants:
+            result = run_variant(url, rev)
+            print(f'  {label:14} {result["rows"]:9} rows  {result["seconds"]:6.1f} s  '
+                  f'peak +{result["peak_mb"]:7.0f} MB')
+    finally:
+        server.terminate()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""Cost of refreshing normalized order state after rows are appended.
+
+Usage: python benchmarks/bench_incremental.py [--rows 100000] [--appended 100]
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from common import load_app
+from generators import make_orders_rows
+
+
+def timed(fn):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--appended', type=int, default=100)
+    args = parser.parse_args()
+
+    app = load_app()
+    rows = make_orders_rows(args.rows + args.appended)
+    history, grown = rows[:args.rows], rows
+
+    holder = app.IncrementalSheetState(app.OrderViews)
+    timed(lambda: holder.sync(history))
+    t_incremental = timed(lambda: holder.sync(grown).order_analysis())
+    fresh = app.IncrementalSheetState(app.OrderViews)
+    t_full = timed(lambda: fresh.sync(grown).order_analysis())
+
+    print(f'{args.rows} rows + {args.appended} appended')
+    print(f'  full rebuild {t_full * 1e3:8.1f} ms  incremental {t_incremental * 1e3:8.1f} ms  '
+          f'speedup {t_full / t_incremental:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
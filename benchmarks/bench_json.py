@@ -0,0 +1,64 @@
+"""Serialization time and peak memory of /api/data-sized order payloads.
+
+Compares the stdlib encoder (Flask's default provider settings) with the
+app's JSON provider, and a cached body reused for an unchanged version.
+
+Usage: python benchmarks/bench_json.py [--sizes 10000 100000 1000000]
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+from common import load_app
+from generators import make_orders_rows
+
+DISTINCT_ROWS = 100000
+
+
+def order_payload(app, n):
+    """Order analysis payload with n orders; rows repeat beyond DISTINCT_ROWS to bound setup memory"""
+    views = app.OrderViews()
+    views.add_rows(make_orders_rows(min(n, DISTINCT_ROWS)))
+    analysis = dict(views.order_analysis())
+    orders = analysis['buy_orders'] + analysis['sell_orders']
+    orders = (orders * (n // len(orders) + 1))[:n]
+    analysis['buy_orders'], analysis['sell_orders'] = orders[:n // 2], orders[n // 2:]
+    return {'order_analysis': analysis}
+
+
+def measure(fn):
+    start = time.perf_counter()
+    out = fn()
+    elapsed = time.perf_counter() - start
+    del out
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    args = parser.parse_args()
+
+    app = load_app()
+    provider = app.app.json
+    print(f'orjson available: {app.orjson is not None}')
+    for n in args.sizes:
+        payload = order_payload(app, n)
+        stdlib = lambda: json.dumps(payload, sort_keys=True, separators=(',', ':')).encode()
+        fast = lambda: provider.dumps_bytes(payload)
+        cache = app.ResponseBodyCache(max_bytes=2 ** 40)
+        cache.get_or_build('v1', fast)
+        cached = lambda: cache.get_or_build('v1', fast)
+        print(f'{n} orders ({len(fast()) / 1e6:.1f} MB)')
+        for label, fn in (('stdlib', stdlib), ('provider', fast), ('cached', cached)):
+            elapsed, peak = measure(fn)
+            print(f'  {label:9} {elapsed * 1e3:9.1f} ms  peak {peak / 1e6:8.1f} MB')
+
+
+if __name__ == '__main__':
+    main()
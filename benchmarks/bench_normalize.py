@@ -0,0 +1,39 @@
+"""Per-row cost of the order normalizers on a synthetic orders sheet.
+
+Usage: python benchmarks/bench_normalize.py [--rows 100000] [--baseline REV]
+"""
+import argparse
+
+from common import best_of, load_app
+from generators import make_orders_rows
+
+FUNCTIONS = ['process_order_analysis', 'process_orders_list', 'process_orders_list_v2',
+             'extract_positions_from_sheet']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--baseline', help='git revision to compare against, e.g. HEAD~1')
+    args = parser.parse_args()
+
+    rows = make_orders_rows(args.rows)
+    modules = [('current', load_app())]
+    if args.baseline:
+        modules.append((args.baseline, load_app(args.baseline)))
+
+    print(f'{args.rows} rows')
+    for name in FUNCTIONS:
+        timings = {}
+        for label, module in modules:
+            fn = getattr(module, name)
+            timings[label] = best_of(lambda: fn(rows), args.repeat)
+        line = '  '.join(f'{label}: {t * 1e6 / args.rows:7.2f} us/row' for label, t in timings.items())
+        if args.baseline:
+            line += f'  speedup: {timings[args.baseline] / timings["current"]:.1f}x'
+        print(f'{name:32s} {line}')
+
+
+if __name__ == '__main__':
+    main()
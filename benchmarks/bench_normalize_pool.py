@@ -0,0 +1,36 @@
+"""Scaling of pooled order normalization over 1, 2, 4 and 8 worker processes.
+
+Usage: python benchmarks/bench_normalize_pool.py [--rows 1000000] [--workers 1 2 4 8]
+"""
+import argparse
+import os
+
+from common import best_of, load_app
+from generators import make_orders_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    app = load_app()
+    rows = make_orders_rows(args.rows)
+    app.NORMALIZE_POOL_MIN_ROWS = 0
+
+    app.NORMALIZE_WORKERS = 0
+    inline = best_of(lambda: app.process_order_analysis(rows), args.repeat)
+    print(f'{args.rows} order rows, {os.cpu_count()} CPUs, '
+          f'{app._normalize_pool_context().get_start_method()} workers')
+    print(f'  {"inline":10s} {inline:8.3f} s')
+    for workers in args.workers:
+        app.NORMALIZE_WORKERS = workers
+        app.process_order_analysis(rows[:1000])  # start the workers outside the timed runs
+        seconds = best_of(lambda: app.process_order_analysis(rows), args.repeat)
+        print(f'  {f"{workers} workers":10s} {seconds:8.3f} s  {inline / seconds:5.2f}x')
+
+
+if __name__ == '__main__':
+    main()
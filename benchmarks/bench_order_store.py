@@ -0,0 +1,65 @@
+"""Memory and aggregation cost of OrderStore versus lists of order dicts.
+
+Usage: python benchmarks/bench_order_store.py [--rows 100000]
+"""
+import argparse
+import contextlib
+import io
+import tracemalloc
+
+from common import best_of, load_app
+from generators import make_orders_rows
+
+
+def measure_alloc(fn):
+    """Return (result, bytes still allocated by fn's result)"""
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = fn()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+
+def aggregate_dicts(orders):
+    bought = sum(o['total_value'] for o in orders if o['type'] == 'BUY')
+    sold = sum(o['total_value'] for o in orders if o['type'] == 'SELL')
+    by_symbol = {}
+    for o in orders:
+        by_symbol[o['symbol']] = by_symbol.get(o['symbol'], 0.0) + o['total_value']
+    return bought, sold, by_symbol
+
+
+def aggregate_store(app, store):
+    bought = store.total('total_value', side=app.SIDE_BUY)
+    sold = store.total('total_value', side=app.SIDE_SELL)
+    return bought, sold, store.group_total('total_value')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    args = parser.parse_args()
+
+    app = load_app()
+    rows = make_orders_rows(args.rows)
+
+    def as_dicts():
+        analysis = app.process_order_analysis(rows)
+        return analysis['buy_orders'] + analysis['sell_orders']
+
+    dicts, dict_bytes = measure_alloc(as_dicts)
+    store, store_bytes = measure_alloc(lambda: app.build_order_store(rows))
+
+    print(f'{args.rows} rows, {len(store)} orders')
+    print(f'memory  dicts: {dict_bytes / len(dicts):7.1f} B/order  '
+          f'store: {store_bytes / len(store):7.1f} B/order  '
+          f'ratio: {dict_bytes / store_bytes:.1f}x')
+    t_dicts = best_of(lambda: aggregate_dicts(dicts))
+    t_store = best_of(lambda: aggregate_store(app, store))
+    print(f'aggregate  dicts: {t_dicts * 1e3:7.2f} ms  store: {t_store * 1e3:7.2f} ms  '
+          f'speedup: {t_dicts / t_store:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
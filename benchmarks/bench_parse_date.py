@@ -0,0 +1,45 @@
+"""Microbenchmark of date parsing against a baseline parse_date.
+
+Usage: python benchmarks/bench_parse_date.py [--rows 50000] [--baseline REV]
+"""
+import argparse
+
+from common import best_of, load_app
+from generators import make_orders_rows, make_transfer_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--baseline', help='git revision to compare against, e.g. HEAD~1')
+    args = parser.parse_args()
+
+    app = load_app()
+    baseline = load_app(args.baseline) if args.baseline else None
+    columns = {
+        'transfer dates': [r['Transfer Initiated'] for r in make_transfer_rows(args.rows)],
+        'order timestamps': [r['Placed Time'] for r in make_orders_rows(args.rows)],
+        'order dates': [r['Placed Time'].split(' ')[0] for r in make_orders_rows(args.rows)],
+    }
+
+    def cold(fn):
+        def run():
+            app._parse_date_text.cache_clear()
+            fn()
+        return run
+
+    for name, values in columns.items():
+        timings = {
+            'parse_date (cold)': best_of(cold(lambda: [app.parse_date(v) for v in values])),
+            'parse_date (warm)': best_of(lambda: [app.parse_date(v) for v in values]),
+            'parse_date_column (cold)': best_of(cold(lambda: app.parse_date_column(values))),
+        }
+        if baseline:
+            timings[f'{args.baseline} parse_date'] = best_of(lambda: [baseline.parse_date(v) for v in values])
+        print(f'{name} ({len(values)} values, {len(set(values))} distinct)')
+        for label, t in timings.items():
+            print(f'  {label:28s} {t * 1e9 / len(values):9.0f} ns/value')
+
+
+if __name__ == '__main__':
+    main()
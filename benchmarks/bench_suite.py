@@ -0,0 +1,187 @@
+"""Time every processing function and API endpoint on synthetic sheets and write the results as JSON.
+
+Each case is timed best-of-N on seeded transfers and orders sheets of every
+requested size, then run once more under tracemalloc for its peak memory.
+Endpoints go through the Flask test client with the sheet fetch replaced by
+the generated rows; "cold" endpoint cases start from empty caches and
+derived state, the others are repeat requests. Pass ``--compare`` with an
+earlier results file to print per-case ratios and exit non-zero when any
+case got slower than ``--threshold``.
+
+Usage: python benchmarks/bench_suite.py [--sizes 1000 10000 100000 1000000]
+           [--output results.json] [--compare baseline.json] [--threshold 1.25]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from common import ROOT, best_of, load_app
+from generators import make_orders_rows, make_transfer_rows
+
+PROCESSING = {
+    'transfers': ['process_monthly_cash_flow', 'process_yearly_transfer_volume', 'process_transaction_status',
+                  'process_transfer_by_type', 'calculate_summary_metrics', 'aggregate_transfers'],
+    'orders': ['process_order_analysis', 'process_orders_list', 'process_orders_list_v2', 'build_order_store',
+               'extract_positions_from_sheet'],
+}
+ENDPOINTS = [
+    '/api/data',
+    '/api/data?lite=1',
+    '/api/raw',
+    '/api/orders',
+    '/api/orders?symbol=am&per_page=100',
+    '/api/orders?status=filled&start=2023-01-01&end=2024-06-30',
+    '/api/orders/symbols?q=a',
+    '/api/orders/statuses',
+    '/api/orders/table/buy?sort=-price&limit=200',
+    '/api/positions',
+]
+COLD_ENDPOINTS = ['/api/data', '/api/data?lite=1', '/api/orders', '/api/positions']
+
+
+def git_revision():
+    try:
+        rev = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, text=True).strip()
+        dirty = subprocess.run(['git', 'diff', '--quiet', 'HEAD', '--', 'app.py'], cwd=ROOT).returncode != 0
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return rev + ('-dirty' if dirty else '')
+
+
+def peak_memory(fn):
+    """Return the peak bytes traced while running ``fn`` once"""
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+class Suite:
+    def __init__(self, app, repeat, memory):
+        self.app = app
+        self.repeat = repeat
+        self.memory = memory
+        self.results = []
+
+    def case(self, kind, name, rows, fn, setup=None):
+        def run():
+            if setup:
+                setup()
+            fn()
+        seconds = best_of(run, self.repeat)
+        peak = peak_memory(run) if self.memory else None
+        self.results.append({'kind': kind, 'name': name, 'rows': rows, 'seconds': seconds, 'peak_bytes': peak})
+        mem = f'{peak / 1e6:9.1f} MB' if peak is not None else ''
+        print(f'  {kind:<10} {name:<58} {seconds * 1e3:10.2f} ms {mem}')
+
+    def reset(self):
+        """Drop every cache and derived state so the next request starts cold"""
+        app = self.app
+        app.sheet_cache.clear()
+        app._sheet_states.clear()
+        app.response_bodies.clear()
+        app._parse_date_text.cache_clear()
+
+    def run(self, n):
+        app = self.app
+        sheets = {'transfers': make_transfer_rows(n), 'orders': make_orders_rows(n)}
+        for kind, names in PROCESSING.items():
+            for name in names:
+                fn = getattr(app, name, None)
+                if fn is not None:
+                    self.case('function', name, n, lambda fn=fn, rows=sheets[kind]: fn(rows))
+
+        orig_get = app.get_sheet_data
+        app.get_sheet_data = lambda spreadsheet_id=None, worksheet_gid=None: (
+            sheets['orders'] if worksheet_gid == app.ORDERS_WORKSHEET_GID else sheets['transfers'])
+        client = app.app.test_client()
+
+        def get(url):
+            resp = client.get(url)
+            if resp.status_code != 200:
+                raise RuntimeError(f'{url} returned {resp.status_code}')
+            resp.get_data()
+        try:
+            for url in COLD_ENDPOINTS:
+                self.case('cold', url, n, lambda url=url: get(url), setup=self.reset)
+            self.reset()
+            for url in ENDPOINTS:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    get(url)  # warm the caches
+                self.case('endpoint', url, n, lambda url=url: get(url))
+        finally:
+            app.get_sheet_data = orig_get
+            self.reset()
+
+
+def compare(results, baseline_path, threshold):
+    """Print per-case time ratios against a baseline file and return the regressed cases"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    before = {(r['kind'], r['name'], r['rows']): r for r in baseline['results']}
+    print(f"\nCompared with {baseline['meta']['revision']} ({baseline_path}):")
+    regressions = []
+    for r in results:
+        old = before.get((r['kind'], r['name'], r['rows']))
+        if not old or not old['seconds']:
+            continue
+        ratio = r['seconds'] / old['seconds']
+        flag = ''
+        if ratio > threshold:
+            flag = '  REGRESSION'
+            regressions.append(r)
+        print(f"  {r['kind']:<10} {r['name']:<58} {r['rows']:>8} {ratio:6.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc peak memory runs')
+    parser.add_argument('--output', help='results file (default benchmarks/results-<revision>.json)')
+    parser.add_argument('--compare', help='earlier results file to compare against')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='time ratio above which a case counts as a regression')
+    args = parser.parse_args()
+
+    app = load_app()
+    revision = git_revision()
+    suite = Suite(app, args.repeat, not args.no_memory)
+    started = time.time()
+    for n in args.sizes:
+        print(f'{n} rows per sheet')
+        suite.run(n)
+
+    output = args.output or os.path.join(ROOT, 'benchmarks', f'results-{revision}.json')
+    meta = {
+        'revision': revision,
+        'started_at': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(started)),
+        'duration_seconds': round(time.time() - started, 1),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'orjson': app.orjson is not None,
+        'numpy': app.np is not None,
+        'sizes': args.sizes,
+        'repeat': args.repeat,
+    }
+    with open(output, 'w') as f:
+        json.dump({'meta': meta, 'results': suite.results}, f, indent=2)
+    print(f'\nWrote {len(suite.results)} results to {output}')
+
+    if args.compare and compare(suite.results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
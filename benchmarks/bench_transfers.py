@@ -0,0 +1,54 @@
+"""CPU cost of the /api/data transfer views: five passes versus one fused pass.
+
+Usage: python benchmarks/bench_transfers.py [--rows 50000] [--baseline REV]
+"""
+import argparse
+
+from common import best_of, load_app
+from generators import make_transfer_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--baseline', help='git revision whose five-pass functions to compare against')
+    args = parser.parse_args()
+
+    app = load_app()
+    rows = make_transfer_rows(args.rows)
+
+    def separate():
+        app.process_monthly_cash_flow(rows)
+        app.process_yearly_transfer_volume(rows)
+        app.process_transaction_status(rows)
+        app.process_transfer_by_type(rows)
+        app.calculate_summary_metrics(rows)
+
+    def fused():
+        app.aggregate_transfers(rows)
+
+    def cold(fn):
+        def run():
+            app._parse_date_text.cache_clear()
+            fn()
+        return run
+
+    print(f'{args.rows} transfer rows')
+    for label, wrap in (('cold date cache', cold), ('warm date cache', lambda fn: fn)):
+        t_separate = best_of(wrap(separate))
+        t_fused = best_of(wrap(fused))
+        print(f'  {label}: five passes {t_separate * 1e3:8.1f} ms  fused {t_fused * 1e3:8.1f} ms  '
+              f'speedup {t_separate / t_fused:.1f}x')
+    if args.baseline:
+        baseline = load_app(args.baseline)
+        t_baseline = best_of(lambda: [fn(rows) for fn in (
+            baseline.process_monthly_cash_flow, baseline.process_yearly_transfer_volume,
+            baseline.process_transaction_status, baseline.process_transfer_by_type,
+            baseline.calculate_summary_metrics)])
+        t_fused = best_of(cold(fused))
+        print(f'  {args.baseline} five passes {t_baseline * 1e3:8.1f} ms  fused (cold) {t_fused * 1e3:8.1f} ms  '
+              f'speedup {t_baseline / t_fused:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""Shared helpers for the benchmark scripts.
+
+Benchmarks import the working-tree ``app`` module, and can optionally load
+``app.py`` as it was at another git revision so the two can be compared
+side by side (``--baseline <rev>``).
+"""
+import contextlib
+import importlib.util
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def load_app(rev=None):
+    """Import app.py from the working tree, or from git revision ``rev``"""
+    if rev is None:
+        with contextlib.redirect_stdout(io.StringIO()):
+            import app
+        return app
+    source = subprocess.check_output(['git', 'show', f'{rev}:app.py'], cwd=ROOT)
+    tmp = tempfile.NamedTemporaryFile('wb', suffix='.py', delete=False)
+    with tmp:
+        tmp.write(source)
+    name = f'app_{rev.replace("~", "_").replace("^", "_")}'
+    spec = importlib.util.spec_from_file_location(name, tmp.name)
+    module = importlib.util.module_from_spec(spec)
+    cwd = os.getcwd()
+    os.chdir(ROOT)  # Flask resolves templates relative to the module
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            spec.loader.exec_module(module)
+    finally:
+        os.chdir(cwd)
+        os.unlink(tmp.name)
+    return module
+
+
+def best_of(fn, repeat=3):
+    """Return the best wall time in seconds of ``repeat`` calls to ``fn``"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
@@ -0,0 +1,60 @@
+"""Seeded generators for synthetic Webull sheet exports."""
+import random
+
+SYMBOLS = ['AAPL', 'AMD', 'AMZN', 'DVLT', 'GOOGL', 'META', 'MSFT', 'NVDA', 'PLTR', 'SOFI',
+           'SPY', 'QQQ', 'TSLA', 'NIO', 'RIVN', 'LCID', 'F', 'GME', 'AMC', 'BABA']
+ORDER_STATUSES = ['Filled', 'Filled', 'Filled', 'Cancelled', 'Partially Filled', 'Rejected']
+
+
+def make_orders_rows(n, seed=0):
+    """Return ``n`` order rows shaped like the Webull orders export"""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        symbol = rng.choice(SYMBOLS)
+        side = rng.choice(['Buy', 'Sell'])
+        status = rng.choice(ORDER_STATUSES)
+        qty = rng.randint(1, 500)
+        filled = qty if status.startswith('Filled') else (rng.randint(0, qty) if status.startswith('Partially') else 0)
+        price = round(rng.uniform(1, 500), 2)
+        month, day, year = rng.randint(1, 12), rng.randint(1, 28), rng.randint(2019, 2025)
+        hour, minute, second = rng.randint(9, 15), rng.randint(0, 59), rng.randint(0, 59)
+        placed = f'{month:02d}/{day:02d}/{year} {hour:02d}:{minute:02d}:{second:02d} EST'
+        rows.append({
+            'Name': f'{symbol} Inc',
+            'Symbol': symbol,
+            'Side': side,
+            'Status': status,
+            'Filled': str(filled),
+            'Total Qty': str(qty),
+            'Price': f'{price:.2f}',
+            'Avg Price': f'${price:.2f}' if filled else '',
+            'Time-in-Force': 'DAY',
+            'Placed Time': placed,
+            'Filled Time': placed if filled else '',
+            'Total Value': f'{price * filled:.2f}',
+        })
+    return rows
+
+TRANSFER_TYPES = ['Ach Incoming', 'Ach Outgoing', 'Debit Card Incoming', 'Wire Incoming', 'Wire Outgoing']
+TRANSFER_STATUSES = ['Completed', 'Completed', 'Completed', 'Rejected', 'Canceled', 'Pending']
+
+
+def make_transfer_rows(n, seed=0):
+    """Return ``n`` transfer rows shaped like the Webull transfers export"""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        transfer_type = rng.choice(TRANSFER_TYPES)
+        amount = round(rng.uniform(10, 5000), 2)
+        signed = amount if 'Incoming' in transfer_type else -amount
+        month, day, year = rng.randint(1, 12), rng.randint(1, 28), rng.randint(2019, 2025)
+        hour, minute = rng.randint(1, 12), rng.randint(0, 59)
+        rows.append({
+            'Transfer Initiated': f'{month:02d}/{day:02d}/{year} {hour:02d}:{minute:02d} {rng.choice(["AM", "PM"])}',
+            'Type': transfer_type,
+            'Status': rng.choice(TRANSFER_STATUSES),
+            'Amount': f'{"+" if signed > 0 else "-"}${amount:,.2f}',
+            'Amount Numeric': f'{signed:.2f}',
+        })
+    return rows
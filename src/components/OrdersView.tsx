@@ -1,4 +1,4 @@
-import React, { useEffect, useState, useMemo, useCallback } from 'react';
+import React, { useEffect, useState, useMemo, useCallback, useRef } from 'react';
 import { formatCurrency } from '../utils/formatters';
 import { debounce } from '../utils/debounce';
 import { SkeletonTable, SkeletonKPI } from './Skeletons';
@@ -22,6 +22,10 @@ export interface OrdersData {
   sellTotal: number;
   openPositionValue: number;
   profit: number;
+  // Version token to send back as ?since=; delta responses echo `since` and list `removed` ids
+  version?: string | null;
+  since?: string;
+  removed?: string[];
 }
 
 interface Filters {
@@ -33,6 +37,18 @@ interface Filters {
 
 const PAGE_SIZE = 50;
 
+// Apply a ?since= response: changed orders replace the ones with the same id, new ids are appended
+const mergeOrders = (prev: OrdersData, delta: OrdersData): OrdersData => {
+  const gone = new Set(delta.removed || []);
+  const changed = new Map(delta.orders.map((o) => [o.id, o] as [string, Order]));
+  const orders = prev.orders.filter((o) => !gone.has(o.id)).map((o) => {
+    const next = changed.get(o.id);
+    if (next) changed.delete(o.id);
+    return next || o;
+  });
+  return { ...prev, ...delta, orders: orders.concat(Array.from(changed.values())) };
+};
+
 export const OrdersView: React.FC = () => {
   const [data, setData] = useState<OrdersData | null>(null);
   const [loading, setLoading] = useState(true);
@@ -43,16 +59,18 @@ export const OrdersView: React.FC = () => {
   const [sellPage, setSellPage] = useState(1);
   const [sort, setSort] = useState<{ key: keyof Order; dir: 'asc' | 'desc' }>({ key: 'date', dir: 'desc' });
 
+  const versionRef = useRef<string | null>(null);
+
   const fetchData = useCallback(async () => {
-    setLoading(true);
+    const since = versionRef.current;
+    if (!since) setLoading(true);
     setError(null);
     try {
-      const res = await fetch('/api/orders');
+      const res = await fetch(since ? `/api/orders?since=${encodeURIComponent(since)}` : '/api/orders');
       if (!res.ok) throw new Error('Failed to fetch orders');
-      const json = await res.json();
-      setData(json);
-      const syms = Array.from(new Set(json.orders.map((o: Order) => o.symbol))).sort();
-      setSymbols(syms);
+      const json: OrdersData = await res.json();
+      versionRef.current = json.version || null;
+      setData((prev) => (json.since && prev ? mergeOrders(prev, json) : json));
     } catch (e: any) {
       setError(e.message || 'Unknown error');
     } finally {
@@ -64,6 +82,10 @@ export const OrdersView: React.FC = () => {
     fetchData();
   }, [fetchData]);
 
+  useEffect(() => {
+    if (data) setSymbols(Array.from(new Set(data.orders.map((o) => o.symbol))).sort());
+  }, [data]);
+
   const filtered = useMemo(() => {
     if (!data) return { buy: [], sell: [] };
     let orders = data.orders;
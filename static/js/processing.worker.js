@@ -20,12 +20,28 @@ function inRange(date, start, end) {
   return t >= s && t <= e;
 }
 
+// Merge appended orders into a newest-first list; orders from the same day keep sheet order
+function mergeNewestFirst(existing, added) {
+  if (!added.length) return existing;
+  const keyed = existing.concat(added).map((order) => {
+    const d = parseDate(order.date || '');
+    return { order, key: d ? d.getTime() : -Infinity };
+  });
+  keyed.sort((a, b) => (a.key === b.key ? 0 : (a.key < b.key ? 1 : -1)));
+  return keyed.map((k) => k.order);
+}
+
 onmessage = (e) => {
   const { type, payload } = e.data || {};
   if (type === 'INIT') {
     dataset.buy_orders = Array.isArray(payload.buy_orders) ? payload.buy_orders : [];
     dataset.sell_orders = Array.isArray(payload.sell_orders) ? payload.sell_orders : [];
     postMessage({ type: 'INIT_OK' });
+  } else if (type === 'APPEND') {
+    // Orders added by a /api/events delta, merged without re-sending the whole dataset
+    dataset.buy_orders = mergeNewestFirst(dataset.buy_orders, payload.buy_orders || []);
+    dataset.sell_orders = mergeNewestFirst(dataset.sell_orders, payload.sell_orders || []);
+    postMessage({ type: 'APPEND_OK' });
   } else if (type === 'FILTER') {
     const q = (payload.search || '').toLowerCase();
     const status = payload.status || '';
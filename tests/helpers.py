@@ -0,0 +1,32 @@
+"""Sheet rows and a fake sheet fetch shared by the endpoint tests"""
+
+
+def order_row(i, status='Filled', side=None, qty=None):
+    """Return orders sheet row ``i``: DVLT and AMD, every third order a sell"""
+    return {'Symbol': 'DVLT' if i % 2 else 'AMD', 'Side': side or ('Buy' if i % 3 else 'Sell'), 'Status': status,
+            'Filled': str(qty or i + 1), 'Avg Price': '2.00', 'Placed Time': f'11/{i % 28 + 1:02d}/2025 13:51:17 EST'}
+
+
+def transfer_row(i):
+    """Return transfers sheet row ``i``: a completed incoming ACH transfer in month ``i % 12 + 1``"""
+    return {'Transfer Initiated': f'{i % 12 + 1:02d}/01/2024 10:00 AM', 'Type': 'Ach Incoming',
+            'Status': 'Completed', 'Amount Numeric': str(100 + i)}
+
+
+def serve_sheets(test, app_module):
+    """Serve copies of ``test.orders`` and ``test.transfers`` from ``get_sheet_data`` for one test.
+
+    Each fetched gid is appended to ``test.calls``, and every fetch fails
+    while ``test.failing`` is true. The real fetch is restored on cleanup.
+    """
+    test.calls = []
+
+    def fake_get(spreadsheet_id=None, worksheet_gid=None):
+        test.calls.append(worksheet_gid)
+        if getattr(test, 'failing', False):
+            return None
+        if worksheet_gid == app_module.ORDERS_WORKSHEET_GID:
+            return list(test.orders)
+        return list(test.transfers)
+    test.addCleanup(setattr, app_module, 'get_sheet_data', app_module.get_sheet_data)
+    app_module.get_sheet_data = fake_get
@@ -0,0 +1,75 @@
+import os
+import unittest
+
+
+CELLS = ['$1,234.56', '+500', '(12.00)', '-3.5', '', None, 0, 7, 2.25, ' 1 000 ', 'N/A', '$', '1e3', 'line\nbreak']
+
+
+def transfer_row(i, amount):
+    return {'Transfer Initiated': f'{i % 12 + 1:02d}/01/2024 10:00 AM', 'Type': 'Ach Incoming' if i % 2 else 'Wire',
+            'Status': 'Completed' if i % 3 else 'Pending', 'Amount Numeric': amount}
+
+
+class AmountParserTests(unittest.TestCase):
+    def setUp(self):
+        os.environ['FLASK_ENV'] = 'testing'
+        import app as app_module
+        self.app_module = app_module
+        self.orig_np = app_module.np
+
+    def tearDown(self):
+        self.app_module.np = self.orig_np
+
+    def check_parity(self, values, default=0):
+        m = self.app_module
+        expected = [float(m.parse_float(v, default)) for v in values]
+        self.assertEqual(list(m.parse_amount_column(values, default)), expected)
+
+    def test_matches_parse_float_per_cell(self):
+        m = self.app_module
+        for np_module in (self.orig_np, None):
+            m.np = np_module
+            with self.subTest(numpy=np_module is not None):
+                self.check_parity(CELLS)
+                self.check_parity(CELLS, default=-1)
+                self.check_parity(['1.5', '$2', '(3)', '4,000.25'])
+                self.check_parity(['1.5', 'oops', '3'])
+                self.check_parity([5, 6.5, None])
+                self.assertEqual(len(m.parse_amount_column([])), 0)
+
+    def test_blank_and_whitespace_cells(self):
+        m = self.app_module
+        columns = [['\t'], ['\r'], [' '], [''], [None], ['\t', '\r'], ['\t', '5'], ['5', '\r\n'], ['\x0b', '', '2']]
+        for np_module in (self.orig_np, None):
+            m.np = np_module
+            with self.subTest(numpy=np_module is not None):
+                for values in columns:
+                    self.check_parity(values)
+                    self.check_parity(values, default=-2)
+
+    def test_amount_columns_index_by_row(self):
+        m = self.app_module
+        rows = [{'Price': '$1.50', 'Qty': '2'}, {'Price': '(3)'}, {'Qty': '+4'}]
+        columns = m.AmountColumns(rows)
+        self.assertEqual(list(columns['Price']), [1.5, -3, 0])
+        self.assertEqual(list(columns['Qty']), [2, 0, 4])
+        self.assertIs(columns['Price'], columns['Price'])
+
+    def test_transfer_processors_use_bulk_amounts(self):
+        m = self.app_module
+        amounts = ['$1,000.00', '-250', '+75.5', '', 'n/a', 300, '(40)']
+        rows = [transfer_row(i, a) for i, a in enumerate(amounts)]
+        values = [m.parse_float(a) for a in amounts]
+        by_type = m.process_transfer_by_type(rows)
+        self.assertAlmostEqual(sum(by_type['amounts']), sum(abs(v) for v in values))
+        yearly = m.process_yearly_transfer_volume(rows)
+        self.assertAlmostEqual(sum(yearly['incoming']) + sum(yearly['outgoing']), sum(abs(v) for v in values))
+        summary = m.calculate_summary_metrics(rows)
+        completed = [v for i, v in enumerate(values) if i % 3]
+        self.assertAlmostEqual(summary['total_incoming_completed'] + summary['total_outgoing_completed'],
+                               sum(abs(v) for v in completed))
+        self.assertEqual(m.aggregate_transfers(rows)['summary_metrics'], summary)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import gzip
+import json
+import os
+import unittest
+
+from helpers import order_row, serve_sheets, transfer_row
+
+
+class ConditionalResponseTests(unittest.TestCase):
+    def setUp(self):
+        os.environ['FLASK_ENV'] = 'testing'
+        import app as app_module
+        self.app_module = app_module
+        app_module.sheet_cache.clear()
+        self.client = app_module.app.test_client()
+        self.orders = [order_row(i) for i in range(200)]
+        self.transfers = [transfer_row(i) for i in range(50)]
+        self.orig_ttl = app_module.sheet_cache.ttl, app_module.sheet_cache.max_stale
+        serve_sheets(self, app_module)
+
+    def tearDown(self):
+        self.app_module.sheet_cache.ttl, self.app_module.sheet_cache.max_stale = self.orig_ttl
+        self.app_module.sheet_cache.clear()
+
+    def revalidate(self, url, etag):
+        return self.client.get(url, headers={'If-None-Match': etag})
+
+    def test_cold_cache_response_has_no_etag(self):
+        # The sheets were fetched during the request, so the version it saw is gone
+        resp = self.client.get('/api/data')
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotIn('ETag', resp.headers)
+
+    def test_unchanged_sheets_return_304(self):
+        self.client.get('/api/data')
+        for url in ('/api/data', '/api/data?lite=1', '/api/orders?symbol=amd', '/api/raw'):
+            first = self.client.get(url)
+            self.assertEqual(first.status_code, 200)
+            self.assertEqual(first.headers['Cache-Control'], 'no-cache')
+            again = self.revalidate(url, first.headers['ETag'])
+            self.assertEqual(again.status_code, 304, url)
+            self.assertEqual(again.data, b'')
+            self.assertEqual(again.headers['ETag'], first.headers['ETag'])
+
+    def test_an_empty_positions_sheet_keeps_the_data_cacheable(self):
+        m = self.app_module
+        orig = m.USE_POSITIONS_SHEET, m.POSITIONS_WORKSHEET_GID, m.get_sheet_data
+        self.addCleanup(setattr, m, 'POSITIONS_WORKSHEET_GID', orig[1])
+        self.addCleanup(setattr, m, 'USE_POSITIONS_SHEET', orig[0])
+        m.USE_POSITIONS_SHEET, m.POSITIONS_WORKSHEET_GID = True, 'positions'
+        m.get_sheet_data = lambda spreadsheet_id=None, worksheet_gid=None: (
+            [] if worksheet_gid == 'positions' else orig[2](spreadsheet_id, worksheet_gid))
+        scheduler = m.RefreshScheduler(interval=3600)
+        for source, current in (('request', lambda: None), ('snapshot', scheduler.current)):
+            with self.subTest(source):
+                m.current_snapshot, orig_current = current, m.current_snapshot
+                try:
+                    scheduler.refresh_once()
+                    self.client.get('/api/data?lite=1')
+                    first = self.client.get('/api/data?lite=1')
+                    self.assertNotIn('partial', first.get_json())
+                    self.assertEqual(self.revalidate('/api/data?lite=1', first.headers['ETag']).status_code, 304)
+                    delta = self.client.get(f"/api/data?lite=1&since={first.headers['X-Data-Version']}")
+                    self.assertIn('since', delta.get_json())
+                finally:
+                    m.current_snapshot = orig_current
+        self.assertEqual(sorted(scheduler.current().errors), ['positions'])
+
+    def test_etag_varies_with_query(self):
+        self.client.get('/api/data')
+        full = self.client.get('/api/data').headers['ETag']
+        lite = self.client.get('/api/data?lite=1').headers['ETag']
+        self.assertNotEqual(full, lite)
+        self.assertEqual(self.revalidate('/api/data', lite).status_code, 200)
+
+    def test_sheet_change_invalidates_etag(self):
+        cache = self.app_module.sheet_cache
+        self.client.get('/api/data')
+        first = self.client.get('/api/data')
+        cache.ttl = cache.max_stale = 0  # refetch on every request
+        self.assertEqual(self.revalidate('/api/data', first.headers['ETag']).status_code, 304)
+        self.orders.append(order_row(500))
+        # The request that picks up the change is served without an ETag...
+        changed = self.revalidate('/api/data', first.headers['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotIn('ETag', changed.headers)
+        # ...and the next one validates against the new version
+        settled = self.revalidate('/api/data', first.headers['ETag'])
+        self.assertEqual(settled.status_code, 200)
+        self.assertNotEqual(settled.headers['ETag'], first.headers['ETag'])
+        self.assertEqual(self.revalidate('/api/data', settled.headers['ETag']).status_code, 304)
+
+    def test_large_json_is_gzipped_when_accepted(self):
+        plain = self.client.get('/api/data')
+        zipped = self.client.get('/api/data', headers={'Accept-Encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', plain.headers)
+        self.assertEqual(zipped.headers['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', zipped.headers['Vary'])
+        self.assertLess(len(zipped.data), len(plain.data))
+        self.assertEqual(json.loads(gzip.decompress(zipped.data)), plain.get_json())
+
+    @unittest.skipIf(__import__('importlib').util.find_spec('brotli') is None, 'brotli not installed')
+    def test_brotli_preferred_when_available(self):
+        import brotli
+        plain = self.client.get('/api/data')
+        resp = self.client.get('/api/data', headers={'Accept-Encoding': 'gzip, br'})
+        self.assertEqual(resp.headers['Content-Encoding'], 'br')
+        self.assertEqual(json.loads(brotli.decompress(resp.data)), plain.get_json())
+
+    def test_small_responses_are_not_compressed(self):
+        resp = self.client.get('/api/orders/statuses', headers={'Accept-Encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', resp.headers)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import csv
+import io
+import os
+import threading
+import tracemalloc
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SAMPLE_CSV = ('Symbol,Side,Note\r\n'
+              'DVLT,Buy,"multi\nline"\r\n'
+              'AMD,Sell,café über\r\n'
+              '\r\n'
+              'TSLA,Buy\r\n'
+              'NVDA,Sell,x,extra\r\n')
+LARGE_ROWS = 40000
+
+
+def large_csv():
+    lines = ['Transfer Initiated,Type,Status,Amount Numeric\n']
+    lines += [f'{i % 12 + 1:02d}/01/2024 10:00 AM,Ach Incoming,Completed,{i}\n' for i in range(LARGE_ROWS)]
+    return ''.join(lines).encode()
+
+
+class ExportHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    large = large_csv()
+
+    def do_GET(self):
+        status = 200
+        if '/private/' in self.path or ('/nogid/' in self.path and 'gid=' in self.path):
+            body = b'\n  <!DOCTYPE html><html><body>Sign in</body></html>'
+            content_type = 'text/html; charset=utf-8'
+        elif '/missing/' in self.path:
+            body = b'Not found\n' * 50000
+            content_type = 'text/plain'
+            status = 404
+        elif '/large/' in self.path:
+            body = self.large
+            content_type = 'text/csv; charset=utf-8'
+        else:
+            body = SAMPLE_CSV.encode('utf-8')
+            content_type = 'text/csv; charset=utf-8'
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class CSVStreamTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), ExportHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        os.environ['FLASK_ENV'] = 'testing'
+        import app as app_module
+        self.app_module = app_module
+        self.orig_url = app_module.SHEETS_EXPORT_URL
+        self.orig_chunk = app_module.CSV_CHUNK_SIZE
+        self.orig_intern = app_module.CSV_INTERN_LIMIT
+        app_module.SHEETS_EXPORT_URL = f'http://127.0.0.1:{self.server.server_port}/{{sheet_id}}/export?format=csv'
+
+    def tearDown(self):
+        self.app_module.SHEETS_EXPORT_URL = self.orig_url
+        self.app_module.CSV_CHUNK_SIZE = self.orig_chunk
+        self.app_module.CSV_INTERN_LIMIT = self.orig_intern
+
+    def test_rows_match_dict_reader_across_chunk_boundaries(self):
+        expected = list(csv.DictReader(io.StringIO(SAMPLE_CSV)))
+        for chunk_size in (1, 3, 7, 65536):
+            self.app_module.CSV_CHUNK_SIZE = chunk_size
+            self.assertEqual(self.app_module.get_sheet_data_public('sheet', '0'), expected)
+
+    def test_stream_yields_rows_lazily(self):
+        rows = self.app_module.stream_sheet_data_public('sheet', '0')
+        self.assertEqual(next(rows), {'Symbol': 'DVLT', 'Side': 'Buy', 'Note': 'multi\nline'})
+
+    def opened_responses(self):
+        m = self.app_module
+        session, responses = m.get_http_session(), []
+        get = session.get
+
+        def recording_get(*args, **kwargs):
+            responses.append(get(*args, **kwargs))
+            return responses[-1]
+        session.get = recording_get
+        self.addCleanup(delattr, session, 'get')
+        return responses
+
+    def test_responses_are_closed_when_a_fetch_fails_or_stops(self):
+        responses = self.opened_responses()
+        self.app_module.CSV_CHUNK_SIZE = 1024
+        self.assertIsNone(self.app_module.get_sheet_data_public('missing', '0'))
+        rows = self.app_module.stream_sheet_data_public('large', '0')
+        next(rows)
+        rows.close()
+        self.assertEqual(len(responses), 2)
+        for response in responses:
+            self.assertTrue(response.raw.closed)
+
+    def test_html_login_page_falls_back_then_fails(self):
+        self.assertEqual(len(self.app_module.get_sheet_data_public('nogid', '5')), 4)
+        self.assertIsNone(self.app_module.get_sheet_data_public('private', '0'))
+
+    def test_repeated_values_share_one_string(self):
+        rows = self.app_module.get_sheet_data_public('large', '0')
+        self.assertEqual(len(rows), LARGE_ROWS)
+        self.assertIs(rows[0]['Type'], rows[-1]['Type'])
+
+    def test_ingestion_overhead_is_bounded(self):
+        # Transient memory is the read chunk plus the shared-value table
+        self.app_module.CSV_INTERN_LIMIT = 1000
+        tracemalloc.start()
+        try:
+            rows = self.app_module.get_sheet_data_public('large', '0')
+            retained, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(len(rows), LARGE_ROWS)
+        # The export is ~2 MB; buffering it whole would add at least that much
+        self.assertLess(len(ExportHandler.large), 2 * retained)
+        self.assertLess(peak - retained, 512 * 1024)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class KeepAliveCSVHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    failures_left = 0
+
+    def do_GET(self):
+        if KeepAliveCSVHandler.failures_left:
+            KeepAliveCSVHandler.failures_left -= 1
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = b'Symbol,Side\nDVLT,Buy\n'
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/csv')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class HTTPSessionTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveCSVHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        os.environ['FLASK_ENV'] = 'testing'
+        import app as app_module
+        self.app_module = app_module
+        self.orig_url = app_module.SHEETS_EXPORT_URL
+        self.orig_backoff = app_module.HTTP_BACKOFF
+        app_module.SHEETS_EXPORT_URL = f'http://127.0.0.1:{self.server.server_port}/d/{{sheet_id}}/export?format=csv'
+        app_module.HTTP_BACKOFF = 0
+        app_module._http_session = None
+        app_module._http_counters['requests'] = 0
+
+    def tearDown(self):
+        self.app_module.SHEETS_EXPORT_URL = self.orig_url
+        self.app_module.HTTP_BACKOFF = self.orig_backoff
+        self.app_module._http_session = None
+
+    def test_connections_are_reused_across_fetches(self):
+        for _ in range(5):
+            rows = self.app_module.get_sheet_data_public('sheet', '0')
+            self.assertEqual(rows, [{'Symbol': 'DVLT', 'Side': 'Buy'}])
+        stats = self.app_module.http_connection_stats()
+        self.assertEqual(stats['requests'], 5)
+        self.assertEqual(stats['connections_opened'], 1)
+        self.assertEqual(stats['connections_reused'], 4)
+
+    def test_retries_transient_errors(self):
+        KeepAliveCSVHandler.failures_left = 2
+        rows = self.app_module.get_sheet_data_public('sheet', '0')
+        self.assertEqual(rows, [{'Symbol': 'DVLT', 'Side': 'Buy'}])
+
+
+class FakeCredentials:
+    def __init__(self):
+        self.valid = True
+        self.refreshes = 0
+
+    def refresh(self, request):
+        self.refreshes += 1
+        self.valid = True
+
+
+class FakeClient:
+    def __init__(self, auth):
+        self.auth = auth
+
+
+class GoogleClientReuseTests(unittest.TestCase):
+    def setUp(self):
+        import app as app_module
+        self.app_module = app_module
+        self.builds = []
+        fd, self.creds_path = tempfile.mkstemp(suffix='.json')
+        with os.fdopen(fd, 'w') as f:
+            json.dump({}, f)
+        self.orig = (app_module.Credentials.from_service_account_file, app_module.gspread.authorize,
+                     os.environ.get('GOOGLE_CREDENTIALS_FILE'))
+        app_module.Credentials.from_service_account_file = lambda path, scopes=None: self.build_creds(path)
+        app_module.gspread.authorize = FakeClient
+        os.environ['GOOGLE_CREDENTIALS_FILE'] = self.creds_path
+        app_module._gspread_client = None
+
+    def build_creds(self, path):
+        creds = FakeCredentials()
+        self.builds.append(creds)
+        return creds
+
+    def tearDown(self):
+        m = self.app_module
+        m.Credentials.from_service_account_file, m.gspread.authorize, env = self.orig
+        if env is None:
+            os.environ.pop('GOOGLE_CREDENTIALS_FILE', None)
+        else:
+            os.environ['GOOGLE_CREDENTIALS_FILE'] = env
+        m._gspread_client = None
+        os.unlink(self.creds_path)
+
+    def test_client_is_created_once_and_refreshed_on_expiry(self):
+        first = self.app_module.get_google_sheets_client()
+        second = self.app_module.get_google_sheets_client()
+        self.assertIs(first, second)
+        self.assertEqual(len(self.builds), 1)
+        first.auth.valid = False
+        third = self.app_module.get_google_sheets_client()
+        self.assertIs(third, first)
+        self.assertEqual(first.auth.refreshes, 1)
+        self.assertEqual(len(self.builds), 1)
+
+    def test_client_rebuilt_when_credentials_file_changes(self):
+        self.app_module.get_google_sheets_client()
+        os.utime(self.creds_path, (1, 1))
+        self.app_module.get_google_sheets_client()
+        self.assertEqual(len(self.builds), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
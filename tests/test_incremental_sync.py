@@ -0,0 +1,184 @@
+import os
+import unittest
+
+from helpers import order_row, transfer_row
+
+
+class IncrementalSheetStateTests(unittest.TestCase):
+    def setUp(self):
+        os.environ['FLASK_ENV'] = 'testing'
+        import app as app_module
+        self.app_module = app_module
+
+    def test_appended_orders_only_process_new_rows(self):
+        m = self.app_module
+        holder = m.IncrementalSheetState(m.OrderViews)
+        rows = [order_row(i, side='Buy') for i in range(10)]
+        holder.sync(rows)
+        grown = rows + [order_row(i, side='Sell') for i in range(10, 13)]
+        views = holder.sync(grown)
+        self.assertEqual(holder.counters, {'appends': 1, 'rebuilds': 1, 'rows_processed': 13})
+        self.assertEqual(views.order_analysis(), m.process_order_analysis(grown))
+        self.assertEqual(views.orders_list(), m.process_orders_list(grown))
+        self.assertEqual(views.orders, m.process_orders_list_v2(grown))
+
+    def test_changed_earlier_row_rebuilds(self):
+        m = self.app_module
+        holder = m.IncrementalSheetState(m.OrderViews)
+        rows = [order_row(i, side='Buy') for i in range(5)]
+        first = holder.sync(rows)
+        edited = [dict(r) for r in rows]
+        edited[1]['Filled'] = '99'
+        views = holder.sync(edited + [order_row(5, side='Buy')])
+        self.assertIsNot(views, first)
+        self.assertEqual(holder.counters['rebuilds'], 2)
+        self.assertEqual(views.orders_list(), m.process_orders_list(edited + [order_row(5, side='Buy')]))
+
+    def test_appends_leave_the_returned_state_untouched(self):
+        m = self.app_module
+        holder = m.IncrementalSheetState(m.OrderViews)
+        rows = m.SheetRows(order_row(i, side='Buy') for i in range(10))
+        first = holder.sync(rows)
+        analysis = first.order_analysis()
+        views = holder.sync(m.SheetRows.extending(rows, [order_row(i, side='Sell') for i in range(10, 13)]))
+        self.assertIsNot(views, first)
+        self.assertEqual((len(first.orders), len(first.store)), (10, 10))
+        self.assertEqual(first.order_analysis(), analysis)
+        self.assertEqual(list(first.symbols.positions('dvlt')), [1, 3, 5, 7, 9])
+        self.assertEqual(len(views.orders), 13)
+        self.assertEqual(holder.counters['appends'], 1)
+
+    def test_appended_orders_extend_the_derived_views(self):
+        m = self.app_module
+        # Three orders a day, so appended orders tie with the last indexed day
+        rows = [dict(order_row(i), **{'Placed Time': f'11/{i // 3 + 1:02d}/2025 13:51:17 EST'}) for i in range(30)]
+        rows += [order_row(i) for i in range(30, 36)]  # backdated to 11/03..11/08
+        sorts = [('buy', '-date'), ('sell', '-date'), ('buy', 'price'), ('sell', '-quantity'), ('buy', 'symbol'),
+                 ('orders_list', ''), ('orders_list', '-total')]
+        holder = m.IncrementalSheetState(m.OrderViews)
+        synced = m.SheetRows(rows[:10])
+        views = holder.sync(synced)
+        for n in (10, 20, 30, 36):
+            if n > len(synced):
+                synced = m.SheetRows.extending(synced, rows[len(synced):n])
+                views = holder.sync(synced)
+            fresh = m.IncrementalSheetState(m.OrderViews).sync(rows[:n])
+            self.assertEqual(views.order_analysis(), fresh.order_analysis(), n)
+            self.assertEqual(views.order_analysis(), m.process_order_analysis(rows[:n]), n)
+            self.assertEqual(views.order_summary(), fresh.order_summary(), n)
+            self.assertEqual(views.orders_list(), fresh.orders_list(), n)
+            self.assertEqual(views.metrics(), m.aggregate_orders_metrics(fresh.orders), n)
+            index, want = views.date_index(), fresh.date_index()
+            for name in ('positions', 'days', 'buy_prefix', 'sell_prefix'):
+                self.assertEqual(list(getattr(index, name)), list(getattr(want, name)), (n, name))
+            for table, sort in sorts:
+                self.assertEqual(views.table_order(table, sort), fresh.table_order(table, sort), (n, table, sort))
+                self.assertEqual(views.table_rank(table, sort), fresh.table_rank(table, sort), (n, table, sort))
+        self.assertEqual(holder.counters['appends'], 3)
+
+    def test_failed_fetch_keeps_the_state(self):
+        m = self.app_module
+        holder = m.IncrementalSheetState(m.TransferAggregator)
+        aggregator = holder.sync([transfer_row(i) for i in range(5)])
+        self.assertIs(holder.sync(None), aggregator)
+        self.assertEqual(holder.sync_with_version(None), (aggregator, 1))
+
+    def test_unchanged_rows_do_no_work(self):
+        m = self.app_module
+        holder = m.IncrementalSheetState(m.TransferAggregator)
+        rows = [transfer_row(i) for i in range(5)]
+        holder.sync(rows)
+        holder.sync([dict(r) for r in rows])
+        self.assertEqual(holder.version, 1)
+        self.assertEqual(holder.counters['rows_processed'], 5)
+
+    def test_an_older_prefix_keeps_the_current_state(self):
+        m = self.app_module
+        holder = m.IncrementalSheetState(m.OrderViews)
+        first = m.SheetRows(order_row(i, side='Buy') for i in range(10))
+        second = m.SheetRows.extending(first, [order_row(i, side='Sell') for i in range(10, 13)])
+        third = m.SheetRows.extending(second, [order_row(13, side='Buy')])
+        views, version = holder.sync_with_version(third)
+        # A request still holding an earlier fetch syncs after a newer one
+        for stale in (first, second, list(third[:5])):
+            self.assertEqual(holder.sync_with_version(stale), (views, version))
+        self.assertEqual((holder.counters['rebuilds'], holder.counters['appends']), (1, 0))
+        # A refetch that lost the last row is a change, not a stale copy
+        shorter = m.SheetRows(third[:13])
+        self.assertEqual(len(holder.sync(shorter).orders), 13)
+        self.assertEqual(holder.counters['rebuilds'], 2)
+
+    def test_appended_transfers_match_full_aggregation(self):
+        m = self.app_module
+        holder = m.IncrementalSheetState(m.TransferAggregator)
+        rows = [transfer_row(i) for i in range(20)]
+        holder.sync(rows[:7])
+        aggregator = holder.sync(rows)
+        self.assertEqual(aggregator.result(), m.aggregate_transfers(rows))
+
+
+class FakeWorksheet:
+    def __init__(self, records):
+        self.records = records
+        self.requested = []
+
+    def get_records(self, first_index):
+        self.requested.append(first_index)
+        return self.records[first_index - 2:]
+
+
+class FetchAppendedRowsTests(unittest.TestCase):
+    def setUp(self):
+        import app as app_module
+        self.app_module = app_module
+        self.sheet = [order_row(i, side='Buy') for i in range(6)]
+        self.worksheet = FakeWorksheet(self.sheet)
+        self.orig = (app_module.get_google_sheets_client, app_module.open_worksheet,
+                     app_module.get_sheet_data, app_module.USE_PUBLIC_ACCESS)
+        app_module.get_google_sheets_client = lambda: object()
+        app_module.open_worksheet = lambda client, sheet_id, gid: self.worksheet
+        app_module.USE_PUBLIC_ACCESS = False
+        self.full_fetches = []
+
+        def full_fetch(sheet_id, gid):
+            self.full_fetches.append((sheet_id, gid))
+            return list(self.sheet)
+        app_module.get_sheet_data = full_fetch
+        app_module._last_full_sync.clear()
+
+    def tearDown(self):
+        m = self.app_module
+        (m.get_google_sheets_client, m.open_worksheet, m.get_sheet_data, m.USE_PUBLIC_ACCESS) = self.orig
+        m._last_full_sync.clear()
+
+    def test_reads_only_rows_after_last_synced_row(self):
+        previous = self.sheet[:4]
+        rows = self.app_module.fetch_appended_rows('sheet', '0', previous)
+        self.assertEqual(self.worksheet.requested, [5])
+        self.assertEqual(rows, self.sheet)
+        self.assertIs(rows[0], previous[0])
+
+    def test_nothing_appended_returns_previous(self):
+        previous = list(self.sheet)
+        self.assertIs(self.app_module.fetch_appended_rows('sheet', '0', previous), previous)
+
+    def test_edited_last_row_needs_full_fetch(self):
+        previous = [dict(r) for r in self.sheet[:4]]
+        previous[-1]['Filled'] = '0'
+        self.assertIsNone(self.app_module.fetch_appended_rows('sheet', '0', previous))
+
+    def test_sync_uses_full_fetch_first_then_increments(self):
+        m = self.app_module
+        rows = m.sync_sheet_data('sheet', '0', None)
+        self.assertEqual(len(self.full_fetches), 1)
+        self.sheet.append(order_row(6, side='Buy'))
+        rows = m.sync_sheet_data('sheet', '0', rows)
+        self.assertEqual(len(self.full_fetches), 1)
+        self.assertEqual(len(rows), 7)
+        m._last_full_sync[('sheet', '0')] -= m.FULL_SYNC_INTERVAL
+        m.sync_sheet_data('sheet', '0', rows)
+        self.assertEqual(len(self.full_fetches), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
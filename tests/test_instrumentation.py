@@ -0,0 +1,132 @@
+import logging
+import os
+import threading
+import unittest
+
+from helpers import order_row, serve_sheets, transfer_row
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+class InstrumentationTests(unittest.TestCase):
+    def setUp(self):
+        os.environ['FLASK_ENV'] = 'testing'
+        import app as app_module
+        self.app_module = app_module
+        app_module.sheet_cache.clear()
+        app_module._sheet_states.clear()
+        app_module.response_bodies.clear()
+        app_module.stage_metrics.clear()
+        self.client = app_module.app.test_client()
+        self.orders = [order_row(i) for i in range(100)]
+        self.transfers = [transfer_row(i) for i in range(30)]
+        serve_sheets(self, app_module)
+
+    def tearDown(self):
+        self.app_module.sheet_cache.clear()
+
+    def server_timing(self, resp):
+        return {part.split(';')[0].strip() for part in resp.headers['Server-Timing'].split(',')}
+
+    def test_server_timing_reports_request_stages(self):
+        cold = self.client.get('/api/data')
+        self.assertTrue({'fetch', 'normalize', 'parse', 'aggregate', 'serialize', 'total'} <= self.server_timing(cold))
+        warm = self.client.get('/api/data', headers={'Accept-Encoding': 'gzip'})
+        self.assertTrue({'fetch', 'aggregate', 'serialize', 'compress', 'total'} <= self.server_timing(warm))
+        self.assertNotIn('normalize', self.server_timing(warm))
+
+    def test_metrics_endpoint_keeps_stage_and_route_histograms(self):
+        for _ in range(3):
+            self.client.get('/api/data')
+        stages = self.client.get('/api/metrics').get_json()['stages']
+        self.assertEqual(stages['route:get_data']['count'], 3)
+        self.assertEqual(stages['normalize']['count'], 2)  # transfers and orders, built once
+        self.assertEqual(sum(stages['fetch']['buckets'].values()), 3)
+
+    def test_histogram_window(self):
+        clock = FakeClock()
+        metrics = self.app_module.StageMetrics(window=10, max_samples=100, clock=clock)
+        for ms in (1, 2, 3, 40, 900):
+            metrics.observe('fetch', ms / 1e3)
+        clock.now = 5
+        metrics.observe('fetch', 0.004)
+        stats = metrics.snapshot()['fetch']
+        self.assertEqual((stats['count'], stats['window_count'], stats['p50_ms'], stats['max_ms']), (6, 6, 4, 900))
+        self.assertEqual((stats['buckets']['le_1'], stats['buckets']['le_5'], stats['buckets']['le_1000']), (1, 2, 1))
+        clock.now = 12
+        stats = metrics.snapshot()['fetch']
+        self.assertEqual((stats['count'], stats['window_count'], stats['max_ms']), (6, 1, 4))
+
+    def test_repeated_log_messages_are_rate_limited(self):
+        clock = FakeClock()
+        log = logging.getLogger('test_instrumentation.rate')
+        log.propagate = False
+        handler = ListHandler()
+        log.addHandler(handler)
+        log.addFilter(self.app_module.RateLimitFilter(interval=60, clock=clock))
+        for i in range(5):
+            log.warning('Error fetching sheet data: %s', i)
+        log.warning('Another message')
+        clock.now = 61
+        log.warning('Error fetching sheet data: %s', 'late')
+        self.assertEqual(handler.messages, ['Error fetching sheet data: 0', 'Another message',
+                                            'Error fetching sheet data: late (4 similar messages suppressed)'])
+
+    def test_logging_is_configured_once_at_import(self):
+        log = logging.getLogger('test_instrumentation.configure')
+        log.propagate = False
+        root = logging.getLogger()
+        root_handlers, root.handlers = root.handlers, []
+        try:
+            self.assertTrue(self.app_module.configure_logging(log))
+            self.assertFalse(self.app_module.configure_logging(log))
+            self.assertEqual(len(log.handlers), 1)
+            self.assertEqual(log.handlers[0].formatter._fmt, self.app_module.LOG_FORMAT)
+            # An existing root setup (e.g. a server's logging config) is left alone
+            root.addHandler(ListHandler())
+            self.assertFalse(self.app_module.configure_logging(logging.getLogger('test_instrumentation.other')))
+        finally:
+            root.handlers = root_handlers
+            log.handlers.clear()
+
+    def test_sampling_profiler_collects_request_thread_stacks(self):
+        profiler = self.app_module.SamplingProfiler(0.001)
+        started, done = threading.Event(), threading.Event()
+
+        def busy_handler():
+            started.set()
+            done.wait()
+        worker = threading.Thread(target=busy_handler)
+        worker.start()
+        started.wait()
+        profiler.track(worker.ident, 'get_data')
+        for _ in range(3):
+            profiler.sample()
+        done.set()
+        worker.join()
+        report = profiler.report()
+        self.assertEqual(report['samples'], 3)
+        [top] = report['stacks']
+        self.assertEqual((top['endpoint'], top['samples']), ('get_data', 3))
+        self.assertIn('busy_handler (test_instrumentation.py', top['stack'])
+        self.assertTrue(profiler.collapsed().startswith('get_data;'))
+        self.assertEqual(self.client.get('/api/metrics/profile').status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
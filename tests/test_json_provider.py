@@ -0,0 +1,69 @@
+import json
+import os
+import unittest
+from datetime import datetime
+
+from helpers import serve_sheets, transfer_row
+
+
+def order_row(i):
+    return {'Name': 'Société Générale' if i % 5 == 0 else 'Datavault AI Inc', 'Symbol': 'DVLT' if i % 2 else 'AMD',
+            'Side': 'Buy' if i % 3 else 'Sell', 'Status': 'Filled', 'Filled': str(i + 1), 'Avg Price': '$1.73',
+            'Placed Time': f'11/{i % 28 + 1:02d}/2025 13:51:17 EST'}
+
+
+class JSONProviderTests(unittest.TestCase):
+    def setUp(self):
+        os.environ['FLASK_ENV'] = 'testing'
+        import app as app_module
+        self.app_module = app_module
+        app_module.sheet_cache.clear()
+        app_module.response_bodies.clear()
+        self.client = app_module.app.test_client()
+        self.orders = [order_row(i) for i in range(120)]
+        self.transfers = [transfer_row(i) for i in range(40)]
+        serve_sheets(self, app_module)
+
+    def test_matches_stdlib_encoding(self):
+        m = self.app_module
+        payload = {'order_analysis': m.process_order_analysis(self.orders), 'orders_list': m.process_orders_list(self.orders)}
+        expected = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode()
+        self.assertEqual(m.app.json.dumps_bytes(payload), expected)
+
+    def test_falls_back_for_values_orjson_rejects(self):
+        provider = self.app_module.app.json
+        self.assertEqual(json.loads(provider.dumps_bytes({'big': 2 ** 70})), {'big': 2 ** 70})
+        when = datetime(2025, 11, 4, 13, 51, 17)
+        self.assertEqual(json.loads(provider.dumps_bytes({'when': when})), {'when': 'Tue, 04 Nov 2025 13:51:17 GMT'})
+
+    def test_unchanged_version_reuses_serialized_body(self):
+        m = self.app_module
+        self.client.get('/api/data')  # warm the sheet cache
+        calls = []
+        orig_payload = m.build_data_payload
+        m.build_data_payload = lambda *args: calls.append(args) or orig_payload(*args)
+        try:
+            first = self.client.get('/api/data')
+            second = self.client.get('/api/data')
+            zipped = [self.client.get('/api/data', headers={'Accept-Encoding': 'gzip'}) for _ in range(2)]
+        finally:
+            m.build_data_payload = orig_payload
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(zipped[0].data, zipped[1].data)
+        stats = m.response_bodies.stats()
+        # One identity and one gzip body; every later request is a hit
+        self.assertEqual((stats['misses'], stats['entries'], stats['hits']), (2, 2, 4))
+
+    def test_body_cache_is_bounded(self):
+        cache = self.app_module.ResponseBodyCache(max_bytes=10)
+        for key in 'abcd':
+            cache.get_or_build(key, lambda: b'1234')
+        self.assertEqual(cache.get_or_build('big', lambda: b'x' * 11), b'x' * 11)
+        stats = cache.stats()
+        self.assertEqual((stats['entries'], stats['bytes'], stats['evictions']), (2, 8, 2))
+        self.assertEqual(cache.get_or_build('d', lambda: b'new!'), b'1234')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import os
+import unittest
+
+
+def order_row(i):
+    row = {'Symbol': ('AMD', 'DVLT', 'TSLA', '')[i % 4], 'Side': ('Buy', 'Sell', 'Buy', '')[i % 4 if i % 7 else 3],
+           'Status': 'Filled' if i % 5 else 'Cancelled', 'Filled': str(i % 9), 'Avg Price': f'${i % 13}.50',
+           'Placed Time': f'{i % 12 + 1:02d}/{i % 28 + 1:02d}/2025 13:51:17 EST'}
+    if i % 11 == 0:
+        # A second header shape within the same sheet
+        row = {'Ticker': row['Symbol'], 'Action': row['Side'], 'Qty': row['Filled'], 'Price': '2', 'P&L': '(1.25)',
+               'Date': row['Placed Time']}
+    return row
+
+
+class NormalizePoolTests(unittest.TestCase):
+    def setUp(self):
+        os.environ['FLASK_ENV'] = 'testing'
+        import app as app_module
+        self.app_module = app_module
+        self.rows = [order_row(i) for i in range(503)]
+        self.orig = (app_module.NORMALIZE_WORKERS, app_module.NORMALIZE_POOL_MIN_ROWS)
+
+    def tearDown(self):
+        self.app_module.NORMALIZE_WORKERS, self.app_module.NORMALIZE_POOL_MIN_ROWS = self.orig
+
+    def pooled(self, workers, min_rows=100):
+        m = self.app_module
+        m.NORMALIZE_WORKERS, m.NORMALIZE_POOL_MIN_ROWS = workers, min_rows
+        return m.build_order_store(self.rows)
+
+    def assertSameStore(self, pooled, inline):
+        n = len(inline)
+        self.assertEqual(len(pooled), n)
+        self.assertEqual(pooled.to_dicts(range(n)), inline.to_dicts(range(n)))
+        for raw_pooled, raw_inline in zip(pooled.rows, inline.rows):
+            self.assertIs(raw_pooled, raw_inline)
+        self.assertEqual(list(pooled.day), list(inline.day))
+        self.assertEqual(pooled.group_total('quantity'), inline.group_total('quantity'))
+        for column in ('symbol', 'status'):
+            by_value = lambda store: {v: list(p) for v, p in zip(getattr(store, column).values, getattr(store, column).positions)}
+            self.assertEqual(by_value(pooled), by_value(inline))
+
+    def test_pooled_store_matches_inline(self):
+        m = self.app_module
+        inline = m.build_order_store(self.rows)
+        for workers in (1, 3):
+            with self.subTest(workers=workers):
+                self.assertSameStore(self.pooled(workers), inline)
+
+    def test_pool_is_reused_and_never_forks_the_server(self):
+        m = self.app_module
+        self.pooled(2)
+        pool = m.get_normalize_pool(2)
+        self.pooled(2)
+        self.assertIs(m.get_normalize_pool(2), pool)
+        self.assertIn(m._normalize_pool_context().get_start_method(), ('forkserver', 'spawn'))
+
+    def test_timed_out_chunks_are_normalized_inline(self):
+        m = self.app_module
+        inline = m.build_order_store(self.rows)
+        pool = m.get_normalize_pool(2)
+        orig_timeout = m.NORMALIZE_POOL_TIMEOUT
+        m.NORMALIZE_POOL_TIMEOUT = 0
+        try:
+            with self.assertLogs(m.logger, 'WARNING'):
+                self.assertSameStore(self.pooled(2), inline)
+        finally:
+            m.NORMALIZE_POOL_TIMEOUT = orig_timeout
+        self.assertIsNot(m.get_normalize_pool(2), pool)
+
+    def test_analysis_totals_and_sort_unchanged(self):
+        m = self.app_module
+        inline = m.process_order_analysis(self.rows)
+        m.NORMALIZE_WORKERS, m.NORMALIZE_POOL_MIN_ROWS = 2, 100
+        self.assertEqual(m.process_order_analysis(self.rows), inline)
+
+    def test_small_sheets_stay_inline(self):
+        m = self.app_module
+        m.NORMALIZE_WORKERS, m.NORMALIZE_POOL_MIN_ROWS = 2, 1000
+        orig = m._append_order_rows_pooled
+        m._append_order_rows_pooled = None  # would fail if called
+        try:
+            self.assertEqual(len(m.build_order_store(self.rows)), len(m.build_order_store(self.rows[:10])) + len(
+                m.build_order_store(self.rows[10:])))
+        finally:
+            m._append_order_rows_pooled = orig
+
+
+if __name__ == '__main__':
+    unittest.main()
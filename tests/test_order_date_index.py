@@ -0,0 +1,78 @@
+import os
+import random
+import unittest
+
+
+def order_row(i, rng):
+    month, day = rng.randint(1, 12), rng.randint(1, 28)
+    placed = f'{month:02d}/{day:02d}/{rng.choice((2024, 2025))} 13:51:17 EST' if i % 17 else ''
+    return {'Symbol': rng.choice(('DVLT', 'AMD', 'TSLA')), 'Side': rng.choice(('Buy', 'Sell')),
+            'Status': rng.choice(('Filled', 'Cancelled')), 'Filled': str(rng.randint(1, 50)),
+            'Avg Price': f'{rng.uniform(1, 300):.2f}', 'Placed Time': placed}
+
+
+class OrderDateIndexTests(unittest.TestCase):
+    def setUp(self):
+        os.environ['FLASK_ENV'] = 'testing'
+        import app as app_module
+        self.app_module = app_module
+        app_module.sheet_cache.clear()
+        self.client = app_module.app.test_client()
+        rng = random.Random(9)
+        self.rows = [order_row(i, rng) for i in range(300)]
+
+    def brute_force(self, orders, start, end):
+        m = self.app_module
+        out = []
+        for o in orders:
+            d = m.parse_date(o['date'])
+            if d is not None and start <= d.date() <= end:
+                out.append(o)
+        return out
+
+    def test_range_metrics_match_brute_force(self):
+        from datetime import date
+        m = self.app_module
+        views = m.OrderViews()
+        views.add_rows(self.rows)
+        index = views.date_index()
+        for start, end in [(date(2024, 1, 1), date(2025, 12, 31)), (date(2024, 3, 5), date(2024, 9, 20)),
+                           (date(2025, 6, 1), date(2025, 6, 1)), (date(2026, 1, 1), date(2026, 2, 1))]:
+            lo, hi = index.bounds(m.epoch_day(start), m.epoch_day(end))
+            expected = self.brute_force(views.orders, start, end)
+            self.assertEqual([views.orders[i] for i in sorted(index.positions[lo:hi])], expected)
+            got = index.metrics(lo, hi)
+            want = m.aggregate_orders_metrics(expected)
+            self.assertEqual(got['orders_count'], want['orders_count'])
+            for key in ('buy_total', 'sell_total', 'profit'):
+                self.assertAlmostEqual(got[key], want[key], places=6)
+
+    def test_appending_rows_rebuilds_index(self):
+        m = self.app_module
+        views = m.OrderViews()
+        views.add_rows(self.rows[:100])
+        self.assertEqual(len(views.date_index().days), sum(1 for o in views.orders if m.parse_date(o['date'])))
+        views.add_rows(self.rows[100:], offset=100)
+        self.assertEqual(len(views.date_index().days), sum(1 for o in views.orders if m.parse_date(o['date'])))
+
+    def test_api_orders_filters_iso_range_across_years(self):
+        from datetime import date
+        m = self.app_module
+        orig_get = m.get_sheet_data
+        m.get_sheet_data = lambda spreadsheet_id=None, worksheet_gid=None: self.rows
+        try:
+            resp = self.client.get('/api/orders?start=2024-11-01&end=2025-02-15&per_page=1000')
+            bad = self.client.get('/api/orders?start=not-a-date')
+        finally:
+            m.get_sheet_data = orig_get
+        self.assertEqual(resp.status_code, 200)
+        body = resp.get_json()
+        expected = self.brute_force(m.process_orders_list_v2(self.rows), date(2024, 11, 1), date(2025, 2, 15))
+        self.assertEqual(body['total'], len(expected))
+        self.assertEqual([o['id'] for o in body['orders']], [o['id'] for o in expected])
+        self.assertAlmostEqual(body['metrics']['buy_total'], m.aggregate_orders_metrics(expected)['buy_total'], places=6)
+        self.assertEqual(bad.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
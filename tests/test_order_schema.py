@@ -0,0 +1,44 @@
+import os
+import unittest
+
+
+class OrderSchemaTests(unittest.TestCase):
+    def setUp(self):
+        os.environ['FLASK_ENV'] = 'testing'
+        import app as app_module
+        self.app_module = app_module
+
+    def test_resolves_webull_headers(self):
+        headers = ('Name', 'Symbol', 'Side', 'Status', 'Filled', 'Total Qty', 'Price', 'Avg Price',
+                   'Time-in-Force', 'Placed Time', 'Filled Time', 'Total Value')
+        schema = self.app_module.resolve_order_schema(headers)
+        self.assertEqual(schema['symbol'], ('Name', 'Symbol'))
+        self.assertEqual(schema['side'], ('Side',))
+        self.assertEqual(schema['price'], ('Price', 'Avg Price'))
+        self.assertEqual(schema['date_time'], ('Placed Time', 'Filled Time'))
+        self.assertNotIn('Time-in-Force', schema['date'])
+        self.assertEqual(schema['list_total'], ('Total Value',))
+        self.assertEqual(schema['id'], ())
+
+    def test_schema_resolved_once_per_header_set(self):
+        rows = [{'Symbol': 'DVLT', 'Side': 'Buy', 'Price': '1.00', 'Filled': str(i)} for i in range(50)]
+        rows.append({'Ticker': 'AMD', 'Action': 'Sell', 'Price': '2.00', 'Qty': '1'})
+        self.app_module.resolve_order_schema.cache_clear()
+        out = self.app_module.process_orders_list_v2(rows)
+        info = self.app_module.resolve_order_schema.cache_info()
+        self.assertEqual(len(out), 51)
+        self.assertEqual(info.misses, 2)
+        self.assertEqual(info.hits, 0)
+        self.assertEqual(out[-1]['total'], 2.0)
+
+    def test_positions_use_resolved_columns(self):
+        rows = [
+            {'Ticker': 'DVLT', 'Shares': '10', 'Cost Basis': '$1.50', 'Status': 'Open'},
+            {'Ticker': 'AMD', 'Shares': '5', 'Cost Basis': '100', 'Status': 'Closed'},
+        ]
+        positions = self.app_module.extract_positions_from_sheet(rows)
+        self.assertEqual(positions, [{'symbol': 'DVLT', 'quantity': 10.0, 'cost_basis': 1.5}])
+
+
+if __name__ == '__main__':
+    unittest.main()
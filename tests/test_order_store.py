@@ -0,0 +1,64 @@
+import os
+import unittest
+
+
+ROWS = [
+    {'Symbol': 'DVLT', 'Side': 'Buy', 'Status': 'Filled', 'Filled': '10', 'Avg Price': '$2.00',
+     'Placed Time': '11/04/2025 13:51:17 EST'},
+    {'Symbol': 'AMD', 'Side': 'Sell', 'Status': 'Filled', 'Filled': '5', 'Avg Price': '100',
+     'Placed Time': '11/05/2025 09:30:00 EST'},
+    {'Symbol': 'DVLT', 'Side': 'Sell', 'Status': 'Cancelled', 'Filled': '3', 'Avg Price': '3.00',
+     'Placed Time': ''},
+    {'Symbol': 'DVLT', 'Side': 'Buy', 'Status': 'Filled', 'Filled': '1', 'Avg Price': '1.50',
+     'Placed Time': '01/02/2024 10:00:00 EST'},
+]
+
+
+class OrderStoreTests(unittest.TestCase):
+    def setUp(self):
+        os.environ['FLASK_ENV'] = 'testing'
+        import app as app_module
+        self.app_module = app_module
+        self.store = app_module.build_order_store(ROWS)
+
+    def test_columns_are_typed_and_encoded(self):
+        store = self.store
+        self.assertEqual(len(store), 4)
+        self.assertEqual(store.price.typecode, 'd')
+        self.assertEqual(store.symbol.values, ['DVLT', 'AMD'])
+        self.assertEqual(list(store.symbol.codes), [0, 1, 0, 0])
+        self.assertEqual(store.day[2], self.app_module.NO_DATE)
+        self.assertEqual(store.day[0] - store.day[1], -1)
+
+    def test_to_dict_matches_order_shape(self):
+        order = self.store.to_dict(0)
+        self.assertEqual(order, {
+            'symbol': 'DVLT', 'type': 'BUY', 'price': 2.0, 'quantity': 10.0, 'total_value': 20.0,
+            'profit': 0.0, 'date': '11/04/2025', 'status': 'Filled', 'raw': ROWS[0]
+        })
+        self.assertNotIn('raw', self.store.to_dict(0, include_raw=False))
+
+    def test_aggregates_with_and_without_numpy(self):
+        expected_by_symbol = {'DVLT': 20.0 + 9.0 + 1.5, 'AMD': 500.0}
+        orig_np = self.app_module.np
+        for np_module in (orig_np, None):
+            self.app_module.np = np_module
+            try:
+                self.assertEqual(self.store.total('total_value', side=self.app_module.SIDE_BUY), 21.5)
+                self.assertEqual(self.store.total('total_value', side=self.app_module.SIDE_SELL), 509.0)
+                self.assertEqual(self.store.group_total('total_value'), expected_by_symbol)
+            finally:
+                self.app_module.np = orig_np
+
+    def test_order_analysis_sorts_newest_first(self):
+        analysis = self.app_module.order_analysis_from_store(self.store)
+        self.assertEqual([o['date'] for o in analysis['buy_orders']], ['11/04/2025', '01/02/2024'])
+        self.assertEqual([o['date'] for o in analysis['sell_orders']], ['11/05/2025', ''])
+        self.assertEqual(analysis['total_value_bought'], 21.5)
+        self.assertEqual(analysis['total_value_sold'], 509.0)
+        self.assertEqual(analysis['stock_symbols'], ['AMD', 'DVLT'])
+        self.assertEqual(analysis['statuses'], ['Cancelled', 'Filled'])
+
+
+if __name__ == '__main__':
+    unittest.main()
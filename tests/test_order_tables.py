@@ -0,0 +1,86 @@
+import json
+import os
+import random
+import unittest
+
+from helpers import serve_sheets, transfer_row
+
+
+def order_row(i, rng):
+    placed = f'{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}/2025 13:51:17 EST' if i % 11 else ''
+    return {'Name': f'Company {i % 7}', 'Symbol': rng.choice(('DVLT', 'AMD', 'TSLA')),
+            'Side': rng.choice(('Buy', 'Sell')), 'Status': rng.choice(('Filled', 'Cancelled')),
+            'Filled': str(rng.randint(1, 50)), 'Avg Price': f'{rng.uniform(1, 300):.2f}', 'Placed Time': placed}
+
+
+class OrderTableTests(unittest.TestCase):
+    def setUp(self):
+        os.environ['FLASK_ENV'] = 'testing'
+        import app as app_module
+        self.app_module = app_module
+        app_module.sheet_cache.clear()
+        self.client = app_module.app.test_client()
+        rng = random.Random(12)
+        self.orders = [order_row(i, rng) for i in range(260)]
+        self.transfers = [transfer_row(i) for i in range(30)]
+        serve_sheets(self, app_module)
+
+    def walk(self, table, **params):
+        items, cursor = [], None
+        while True:
+            query = dict(params, **({'cursor': cursor} if cursor else {}))
+            body = self.client.get(f'/api/orders/table/{table}', query_string=query).get_json()
+            items.extend(body['items'])
+            cursor = body['next_cursor']
+            if cursor is None:
+                self.assertEqual(len(items), body['total'])
+                return items
+
+    def test_default_pages_match_full_payload(self):
+        m = self.app_module
+        analysis = m.process_order_analysis(self.orders)
+        fields = ','.join(m.ORDER_FIELDS + ('raw',))
+        self.assertEqual(self.walk('buy', limit=37, fields=fields), analysis['buy_orders'])
+        self.assertEqual(self.walk('sell', limit=1000, fields=fields), analysis['sell_orders'])
+        self.assertEqual(self.walk('orders_list', limit=50), m.process_orders_list(self.orders))
+
+    def test_sorting_and_projection(self):
+        m = self.app_module
+        buy = m.process_order_analysis(self.orders)['buy_orders']
+        got = self.walk('buy', sort='-price', fields='symbol,price', limit=40)
+        want = [{'symbol': o['symbol'], 'price': o['price']} for o in sorted(buy, key=lambda o: o['price'], reverse=True)]
+        self.assertEqual(got, want)
+        by_date = self.walk('orders_list', sort='date', fields='id', limit=100)
+        orders = m.process_orders_list(self.orders)
+        days = [m.epoch_day(m.parse_date(o['date'])) for o in orders]
+        self.assertEqual([o['id'] for o in by_date], [orders[i]['id'] for i in sorted(range(len(orders)), key=days.__getitem__)])
+
+    def test_rejects_bad_requests(self):
+        self.assertEqual(self.client.get('/api/orders/table/nope').status_code, 404)
+        self.assertEqual(self.client.get('/api/orders/table/buy?fields=bogus').status_code, 400)
+        self.assertEqual(self.client.get('/api/orders/table/buy?sort=raw').status_code, 400)
+        self.assertEqual(self.client.get('/api/orders/table/buy?cursor=%%%').status_code, 400)
+        cursor = self.client.get('/api/orders/table/buy?limit=5').get_json()['next_cursor']
+        resp = self.client.get('/api/orders/table/buy', query_string={'cursor': cursor, 'sort': 'price'})
+        self.assertEqual(resp.status_code, 400)
+
+    def test_lite_data_returns_aggregates_and_first_pages(self):
+        m = self.app_module
+        full = self.client.get('/api/data').get_json()
+        resp = self.client.get('/api/data?lite=1')
+        lite = resp.get_json()
+        self.assertTrue(lite['lite'])
+        for key in ('total_profit', 'total_value_bought', 'total_value_sold', 'stock_symbols', 'statuses'):
+            self.assertEqual(lite['order_analysis'][key], full['order_analysis'][key])
+        self.assertEqual(lite['monthly_cash_flow'], full['monthly_cash_flow'])
+        first_buy = [{k: o[k] for k in m.ORDER_FIELDS} for o in full['order_analysis']['buy_orders'][:m.ORDER_PAGE_SIZE]]
+        self.assertEqual(lite['order_analysis']['buy_orders'], first_buy)
+        self.assertEqual(lite['orders_list'], full['orders_list'][:m.ORDER_PAGE_SIZE])
+        self.assertEqual(lite['pages']['buy']['total'], len(full['order_analysis']['buy_orders']))
+        rest = self.client.get('/api/orders/table/buy', query_string={'cursor': lite['pages']['buy']['next_cursor']})
+        self.assertEqual(rest.get_json()['items'][0], {k: full['order_analysis']['buy_orders'][m.ORDER_PAGE_SIZE][k] for k in m.ORDER_FIELDS})
+        self.assertLess(len(resp.data), len(json.dumps(full)) / 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
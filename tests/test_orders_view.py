@@ -8,6 +8,7 @@ class OrdersViewTests(unittest.TestCase):
         os.environ['FLASK_ENV'] = 'testing'
         import app as app_module
         self.app_module = app_module
+        app_module.sheet_cache.clear()
         self.client = app_module.app.test_client()
 
     def test_process_orders_list_with_data(self):
@@ -0,0 +1,97 @@
+import os
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Seconds of latency the stub server injects per worksheet gid
+LATENCY = {'1': 0.3, '2': 0.3, '3': 0.3, 'slow': 2.0}
+
+
+class StubSheetHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        gid = parse_qs(urlparse(self.path).query).get('gid', [''])[0]
+        time.sleep(LATENCY.get(gid, 0))
+        body = f'Symbol,Side,Total Value\nDVLT,Buy,{gid}\n'.encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/csv')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class ParallelFetchTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StubSheetHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        os.environ['FLASK_ENV'] = 'testing'
+        import app as app_module
+        self.app_module = app_module
+        self.orig = (app_module.SHEETS_EXPORT_URL, app_module.USE_PUBLIC_ACCESS)
+        app_module.SHEETS_EXPORT_URL = f'http://127.0.0.1:{self.server.server_port}/d/{{sheet_id}}/export?format=csv'
+        app_module.USE_PUBLIC_ACCESS = True
+        app_module.sheet_cache.clear()
+
+    def tearDown(self):
+        self.app_module.SHEETS_EXPORT_URL, self.app_module.USE_PUBLIC_ACCESS = self.orig
+        self.app_module.sheet_cache.clear()
+
+    def test_wall_time_approaches_slowest_fetch(self):
+        sheets = {'transfers': ('a', '1'), 'orders': ('b', '2'), 'positions': ('c', '3')}
+        start = time.monotonic()
+        results, errors = self.app_module.fetch_sheets(sheets, fetcher=self.app_module.get_sheet_data)
+        elapsed = time.monotonic() - start
+        self.assertEqual(errors, {})
+        self.assertEqual(results['orders'], [{'Symbol': 'DVLT', 'Side': 'Buy', 'Total Value': '2'}])
+        self.assertLess(elapsed, 0.6)
+
+    def test_per_sheet_timeout_returns_partial_results(self):
+        sheets = {'transfers': ('a', '1'), 'orders': ('b', 'slow')}
+        start = time.monotonic()
+        results, errors = self.app_module.fetch_sheets(sheets, timeout={'orders': 0.5},
+                                                       fetcher=self.app_module.get_sheet_data)
+        elapsed = time.monotonic() - start
+        self.assertEqual(results['transfers'][0]['Total Value'], '1')
+        self.assertIsNone(results['orders'])
+        self.assertIn('orders', errors)
+        self.assertLess(elapsed, 1.5)
+
+    def test_fetcher_errors_are_reported_per_sheet(self):
+        def fetcher(sheet_id, gid):
+            if sheet_id == 'bad':
+                raise RuntimeError('boom')
+            return [{'ok': sheet_id}]
+        results, errors = self.app_module.fetch_sheets({'good': ('good', '0'), 'bad': ('bad', '0')},
+                                                       fetcher=fetcher)
+        self.assertEqual(results, {'good': [{'ok': 'good'}], 'bad': None})
+        self.assertEqual(errors, {'bad': 'boom'})
+
+    def test_api_data_fetches_sheets_concurrently(self):
+        m = self.app_module
+        orig = (m.WORKSHEET_GID, m.ORDERS_WORKSHEET_GID)
+        m.WORKSHEET_GID, m.ORDERS_WORKSHEET_GID = '1', '2'
+        try:
+            start = time.monotonic()
+            resp = m.app.test_client().get('/api/data')
+            elapsed = time.monotonic() - start
+        finally:
+            m.WORKSHEET_GID, m.ORDERS_WORKSHEET_GID = orig
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(resp.get_json()['orders_list']), 1)
+        self.assertLess(elapsed, 0.6)
+
+
+if __name__ == '__main__':
+    unittest.main()
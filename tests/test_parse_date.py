@@ -0,0 +1,47 @@
+import os
+import unittest
+from datetime import datetime
+
+
+class ParseDateTests(unittest.TestCase):
+    def setUp(self):
+        os.environ['FLASK_ENV'] = 'testing'
+        import app as app_module
+        self.app_module = app_module
+
+    def test_parses_sheet_formats(self):
+        parse_date = self.app_module.parse_date
+        self.assertEqual(parse_date('11/29/2021'), datetime(2021, 11, 29))
+        self.assertEqual(parse_date('11/29/2021 11:28 PM'), datetime(2021, 11, 29, 23, 28))
+        self.assertEqual(parse_date('11/29/2021 12:05 AM'), datetime(2021, 11, 29, 0, 5))
+        self.assertEqual(parse_date('2024-01-05'), datetime(2024, 1, 5))
+        self.assertEqual(parse_date('13/01/2024'), datetime(2024, 1, 13))
+        self.assertEqual(parse_date('November 4, 2025'), datetime(2025, 11, 4))
+        self.assertIsNone(parse_date('DAY'))
+        self.assertIsNone(parse_date(''))
+        self.assertIsNone(parse_date('02/30/2024'))
+
+    def test_parses_orders_timestamps_with_timezone(self):
+        self.assertEqual(self.app_module.parse_date('11/04/2025 13:51:17 EST'),
+                         datetime(2025, 11, 4, 13, 51, 17))
+
+    def test_memo_cache_is_bounded(self):
+        info = self.app_module._parse_date_text.cache_info()
+        self.assertEqual(info.maxsize, self.app_module.DATE_CACHE_SIZE)
+
+    def test_infer_date_format_picks_dominant_format(self):
+        values = ['2024-01-0%d' % d for d in range(1, 8)] + ['01/02/2024', '']
+        self.assertEqual(self.app_module.infer_date_format(values), '%Y-%m-%d')
+        self.assertIsNone(self.app_module.infer_date_format(['', 'DAY']))
+
+    def test_parse_date_column_resolves_ambiguity_by_column(self):
+        values = ['13/01/2024', '25/12/2023', '03/04/2025', '', 'junk']
+        self.assertEqual(self.app_module.parse_date_column(values), [
+            datetime(2024, 1, 13), datetime(2023, 12, 25), datetime(2025, 4, 3), None, None
+        ])
+        # On its own the ambiguous value keeps the month-first reading
+        self.assertEqual(self.app_module.parse_date('03/04/2025'), datetime(2025, 3, 4))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import os
+import random
+import unittest
+from datetime import datetime
+
+
+def order(symbol, side, qty, price, day, status='Filled', time='13:51:17'):
+    return {'Symbol': symbol, 'Side': side, 'Status': status, 'Filled': str(qty),
+            'Avg Price': str(price), 'Placed Time': f'11/{day:02d}/2025 {time} EST'}
+
+
+class PositionEngineTests(unittest.TestCase):
+    def setUp(self):
+        os.environ['FLASK_ENV'] = 'testing'
+        import app as app_module
+        self.app_module = app_module
+        self.today = datetime(2025, 11, 30)
+
+    def summary(self, rows):
+        m = self.app_module
+        views = m.OrderViews()
+        views.add_rows(rows, 0)
+        return views.position_book().summary(self.today)
+
+    def test_fifo_and_average_cost(self):
+        rows = [order('AMD', 'Buy', 10, 100, 1), order('AMD', 'Buy', 10, 120, 5),
+                order('AMD', 'Sell', 15, 130, 10), order('AMD', 'Buy', 5, 50, 12, status='Cancelled')]
+        body = self.summary(rows)
+        [amd] = body['positions']
+        self.assertEqual(amd['quantity'], 5)
+        self.assertAlmostEqual(amd['avg_cost'], 110)
+        self.assertAlmostEqual(amd['cost_basis'], 110)
+        self.assertAlmostEqual(amd['fifo_cost'], 120)
+        self.assertAlmostEqual(amd['realized_pnl_fifo'], 10 * 30 + 5 * 10)
+        self.assertAlmostEqual(amd['realized_pnl_avg'], 15 * 20)
+        self.assertEqual((amd['opened'], amd['holding_days']), ('2025-11-05', 25))
+
+    def test_closed_positions_only_count_realized_pnl(self):
+        rows = [order('DVLT', 'Buy', 4, 2, 1), order('DVLT', 'Sell', 6, 3, 2), order('AMD', 'Buy', 1, 100, 3)]
+        body = self.summary(rows)
+        self.assertEqual([p['symbol'] for p in body['positions']], ['AMD'])
+        # Selling more than held only closes the position
+        self.assertAlmostEqual(body['realized_pnl']['fifo'], 4)
+        self.assertAlmostEqual(body['realized_pnl']['average'], 4)
+
+    def test_orders_apply_in_timestamp_order(self):
+        rows = [order('AMD', 'Sell', 5, 12, 3, time='10:00:00'), order('AMD', 'Buy', 5, 10, 3, time='09:30:00')]
+        body = self.summary(rows)
+        self.assertEqual(body['positions'], [])
+        self.assertAlmostEqual(body['realized_pnl']['fifo'], 10)
+
+    def test_intraday_round_trip_uses_the_cost_at_the_time(self):
+        rows = [order('AMD', 'Buy', 10, 10, 3, time='09:30:00'), order('AMD', 'Sell', 10, 12, 3, time='10:00:00'),
+                order('AMD', 'Buy', 10, 20, 3, time='11:00:00')]
+        body = self.summary(rows)
+        [amd] = body['positions']
+        self.assertEqual(amd['quantity'], 10)
+        self.assertAlmostEqual(amd['avg_cost'], 20)
+        self.assertAlmostEqual(body['realized_pnl']['average'], 20)
+        self.assertAlmostEqual(body['realized_pnl']['fifo'], 20)
+
+    def test_same_second_orders_apply_in_sheet_order(self):
+        rows = [order('AMD', 'Sell', 5, 12, 3), order('AMD', 'Buy', 5, 10, 3)]
+        body = self.summary(rows)
+        [amd] = body['positions']
+        self.assertEqual((amd['quantity'], amd['avg_cost']), (5, 10))
+        self.assertAlmostEqual(body['realized_pnl']['fifo'], 0)
+
+    def test_appended_orders_match_rebuild(self):
+        m = self.app_module
+        rng = random.Random(7)
+        rows = [order(rng.choice(('AMD', 'DVLT')), rng.choice(('Buy', 'Buy', 'Sell')), rng.randint(1, 20),
+                      rng.randint(1, 50), day) for day in range(1, 29) for _ in range(3)]
+        holder = m.IncrementalSheetState(m.OrderViews)
+        views = holder.sync(rows[:30])
+        book = views.position_book()
+        summary = book.summary(self.today)
+        views = holder.sync(rows)
+        # The new views carry a copy of the book forward; the published one is left alone
+        self.assertEqual(views._positions.applied, 30)
+        self.assertEqual(views.position_book().applied, len(rows))
+        self.assertEqual(views.position_book().summary(self.today), self.summary(rows))
+        self.assertEqual((book.applied, book.summary(self.today)), (30, summary))
+
+    def test_backdated_order_rebuilds_book(self):
+        m = self.app_module
+        rows = [order('AMD', 'Buy', 10, 100, 10), order('AMD', 'Sell', 5, 110, 12)]
+        holder = m.IncrementalSheetState(m.OrderViews)
+        views = holder.sync(rows)
+        book = views.position_book()
+        grown = rows + [order('AMD', 'Buy', 10, 50, 2)]
+        views = holder.sync(grown)
+        self.assertIsNot(views.position_book(), book)
+        self.assertEqual(views.position_book().summary(self.today), self.summary(grown))
+        [amd] = views.position_book().summary(self.today)['positions']
+        self.assertAlmostEqual(amd['fifo_cost'], (5 * 50 + 10 * 100) / 15)
+
+    def test_api_positions_uses_orders(self):
+        m = self.app_module
+        m.sheet_cache.clear()
+        rows = [order('AMD', 'Buy', 2, 100, 1), order('DVLT', 'Buy', 3, 2, 2)]
+        orig_get = m.get_sheet_data
+        m.get_sheet_data = lambda spreadsheet_id=None, worksheet_gid=None: rows
+        try:
+            body = m.app.test_client().get('/api/positions').get_json()
+        finally:
+            m.get_sheet_data = orig_get
+            m.sheet_cache.clear()
+        self.assertEqual(body['source'], 'orders')
+        self.assertEqual([(p['symbol'], p['quantity'], p['cost_basis']) for p in body['positions']],
+                         [('AMD', 2, 100), ('DVLT', 3, 2)])
+
+
+if __name__ == '__main__':
+    unittest.main()
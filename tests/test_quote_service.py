@@ -0,0 +1,154 @@
+import json
+import os
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class FakeQuoteHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    requests = []
+    delay = 0
+    failing = False
+    prices = {'AMD': 150.5, 'DVLT': 1.73, 'TSLA': 420.0}
+
+    def do_GET(self):
+        symbols = parse_qs(urlparse(self.path).query)['symbols'][0].split(',')
+        FakeQuoteHandler.requests.append(symbols)
+        time.sleep(FakeQuoteHandler.delay)
+        if FakeQuoteHandler.failing:
+            status, body = 400, b'{}'
+        else:
+            result = [{'symbol': s, 'regularMarketPrice': self.prices.get(s, 10.0 + len(s))}
+                      for s in symbols if s != 'UNKNOWN']
+            status, body = 200, json.dumps({'quoteResponse': {'result': result}}).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class QuoteServiceTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeQuoteHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        os.environ['FLASK_ENV'] = 'testing'
+        import app as app_module
+        self.app_module = app_module
+        self.orig_url = app_module.QUOTES_URL
+        app_module.QUOTES_URL = f'http://127.0.0.1:{self.server.server_port}/v7/finance/quote'
+        app_module.quote_service.clear()
+        FakeQuoteHandler.requests = []
+        FakeQuoteHandler.delay = 0
+        FakeQuoteHandler.failing = False
+        self.clock = FakeClock()
+        self.service = app_module.QuoteService(app_module.fetch_quote_batch, ttl=15, max_stale=60, negative_ttl=15,
+                                               batch_size=2, clock=self.clock)
+
+    def tearDown(self):
+        self.app_module.QUOTES_URL = self.orig_url
+        self.app_module.quote_service.clear()
+
+    def test_cached_within_ttl(self):
+        quotes, stale = self.service.get(['AMD', 'DVLT'])
+        self.assertEqual(quotes, {'AMD': 150.5, 'DVLT': 1.73})
+        self.assertEqual(stale, [])
+        self.clock.now = 10
+        self.service.get(['DVLT', 'AMD'])
+        self.assertEqual(len(FakeQuoteHandler.requests), 1)
+        self.clock.now = 20
+        self.service.get(['AMD'])
+        self.assertEqual(FakeQuoteHandler.requests[-1], ['AMD'])
+
+    def test_large_lists_are_chunked_and_only_missing_symbols_fetched(self):
+        self.service.get(['AMD'])
+        quotes, _ = self.service.get(['AMD', 'DVLT', 'TSLA', 'NVDA', 'AAPL'])
+        self.assertEqual(len(quotes), 5)
+        self.assertEqual(FakeQuoteHandler.requests, [['AMD'], ['DVLT', 'TSLA'], ['NVDA', 'AAPL']])
+
+    def test_concurrent_overlapping_requests_are_coalesced(self):
+        FakeQuoteHandler.delay = 0.2
+        service = self.app_module.QuoteService(self.app_module.fetch_quote_batch, ttl=15, batch_size=50)
+        results = []
+        first = threading.Thread(target=lambda: results.append(service.get(['AMD', 'DVLT'])))
+        first.start()
+        time.sleep(0.05)
+        second = threading.Thread(target=lambda: results.append(service.get(['DVLT', 'AMD', 'TSLA'])))
+        second.start()
+        first.join()
+        second.join()
+        self.assertEqual(sorted(map(sorted, FakeQuoteHandler.requests)), [['AMD', 'DVLT'], ['TSLA']])
+        self.assertEqual(results[-1][0], {'AMD': 150.5, 'DVLT': 1.73, 'TSLA': 420.0})
+        self.assertEqual(service.stats()['coalesced'], 2)
+
+    def test_upstream_failure_serves_last_known_price_as_stale(self):
+        self.service.get(['AMD', 'UNKNOWN'])
+        FakeQuoteHandler.failing = True
+        self.clock.now = 30
+        quotes, stale = self.service.get(['AMD', 'UNKNOWN', 'TSLA'])
+        self.assertEqual(quotes, {'AMD': 150.5})
+        self.assertEqual(stale, ['AMD'])
+        self.assertEqual(self.service.stats()['errors'], 2)  # both batches failed
+        self.clock.now = 100  # past max_stale
+        self.assertEqual(self.service.get(['AMD']), ({}, []))
+
+    def test_unknown_symbols_are_not_refetched_within_ttl(self):
+        self.service.get(['UNKNOWN'])
+        self.service.get(['UNKNOWN'])
+        self.assertEqual(FakeQuoteHandler.requests, [['UNKNOWN']])
+
+    def test_unknown_symbols_expire_after_negative_ttl(self):
+        service = self.app_module.QuoteService(self.app_module.fetch_quote_batch, ttl=15, negative_ttl=100,
+                                               clock=self.clock)
+        service.get(['UNKNOWN'])
+        self.clock.now = 50
+        service.get(['UNKNOWN'])
+        self.assertEqual(len(FakeQuoteHandler.requests), 1)
+        self.clock.now = 100
+        self.assertEqual(service.get(['UNKNOWN']), ({}, []))
+        self.assertEqual(FakeQuoteHandler.requests, [['UNKNOWN'], ['UNKNOWN']])
+
+    def test_least_recently_used_symbols_are_evicted(self):
+        service = self.app_module.QuoteService(self.app_module.fetch_quote_batch, max_entries=2, clock=self.clock)
+        service.get(['AMD'])
+        service.get(['DVLT'])
+        service.get(['AMD'])
+        service.get(['TSLA'])
+        self.assertEqual(list(service._entries), ['AMD', 'TSLA'])
+        self.assertEqual(service.stats()['evictions'], 1)
+        self.assertEqual(service.stats()['symbols'], 2)
+
+    def test_api_quotes_reports_stale_symbols(self):
+        m = self.app_module
+        client = m.app.test_client()
+        body = client.get('/api/quotes?symbols=AMD,DVLT').get_json()
+        self.assertEqual(body, {'quotes': {'AMD': 150.5, 'DVLT': 1.73}, 'stale': []})
+        client.get('/api/quotes?symbols=AMD,DVLT')
+        self.assertEqual(len(FakeQuoteHandler.requests), 1)
+        self.assertEqual(m.quote_service.stats()['hits'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+import os
+import threading
+import time
+import unittest
+
+from helpers import order_row, serve_sheets, transfer_row
+
+
+class RefreshSchedulerTests(unittest.TestCase):
+    def setUp(self):
+        os.environ['FLASK_ENV'] = 'testing'
+        import app as app_module
+        self.app_module = app_module
+        app_module.sheet_cache.clear()
+        app_module.response_bodies.clear()
+        self.client = app_module.app.test_client()
+        self.orders = [order_row(i) for i in range(60)]
+        self.transfers = [transfer_row(i) for i in range(20)]
+        self.failing = False
+        serve_sheets(self, app_module)
+        self.scheduler = app_module.RefreshScheduler(interval=3600)
+
+    def tearDown(self):
+        self.scheduler.stop()
+        self.app_module.refresh_scheduler.stop()
+        self.app_module.refresh_scheduler.clear()
+        self.app_module.sheet_cache.clear()
+
+    def test_rebuilds_only_when_a_sheet_changes(self):
+        m = self.app_module
+        first = self.scheduler.refresh_once()
+        self.assertIs(self.scheduler.refresh_once(), first)
+        self.orders.append(order_row(100))
+        second = self.scheduler.refresh_once()
+        self.assertEqual((first.version, second.version), (1, 2))
+        self.assertEqual(first.order_count, 60)
+        self.assertEqual(len(first.payloads[False]['orders_list']), 60)
+        self.assertEqual(second.payloads[False]['orders_list'], m.process_orders_list(self.orders))
+        self.assertEqual(second.payloads[False]['order_analysis'], m.process_order_analysis(self.orders))
+        status = self.scheduler.status()
+        self.assertEqual((status['checks'], status['builds'], status['unchanged']), (3, 2, 1))
+        self.assertEqual(status['snapshot']['version'], 2)
+        self.assertGreaterEqual(status['snapshot']['build_seconds'], 0)
+
+    def test_failed_refresh_keeps_serving_previous_snapshot(self):
+        first = self.scheduler.refresh_once()
+        self.failing = True
+        self.assertIs(self.scheduler.refresh_once(), first)
+        status = self.scheduler.status()
+        self.assertEqual(status['errors'], 1)
+        self.assertIn('transfers', status['last_error'])
+
+    def test_a_failed_sheet_does_not_hold_back_the_others(self):
+        m = self.app_module
+        orig = m.USE_POSITIONS_SHEET, m.POSITIONS_WORKSHEET_GID, m.get_sheet_data
+        self.addCleanup(setattr, m, 'POSITIONS_WORKSHEET_GID', orig[1])
+        self.addCleanup(setattr, m, 'USE_POSITIONS_SHEET', orig[0])
+        m.USE_POSITIONS_SHEET, m.POSITIONS_WORKSHEET_GID = True, 'positions'
+        # The positions sheet is empty
+        m.get_sheet_data = lambda spreadsheet_id=None, worksheet_gid=None: (
+            [] if worksheet_gid == 'positions' else orig[2](spreadsheet_id, worksheet_gid))
+        first = self.scheduler.refresh_once()
+        self.assertEqual(sorted(first.errors), ['positions'])
+        self.assertIs(self.scheduler.refresh_once(), first)
+        self.orders = self.orders + [order_row(i) for i in range(60, 63)]
+        second = self.scheduler.refresh_once()
+        self.assertEqual((second.version, second.order_count), (2, 63))
+        self.assertEqual(sorted(second.errors), ['positions'])
+        self.assertEqual(self.scheduler.status()['snapshot']['partial'], ['positions'])
+        # Once the sheet is back the snapshot is no longer partial
+        m.get_sheet_data = orig[2]
+        third = self.scheduler.refresh_once()
+        self.assertEqual((third.version, third.errors), (3, {}))
+
+    def test_handlers_read_the_published_snapshot(self):
+        m = self.app_module
+        m.refresh_scheduler.interval = 3600
+        m.refresh_scheduler.start()
+        deadline = time.monotonic() + 5
+        while m.refresh_scheduler.current() is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        snapshot = m.refresh_scheduler.current()
+        self.assertIsNotNone(snapshot)
+        self.calls.clear()
+        self.failing = True  # handlers must not fetch
+        resp = self.client.get('/api/data?lite=1')
+        self.assertEqual(resp.get_json(), snapshot.payloads[True])
+        self.assertEqual(self.client.get('/api/data?lite=1', headers={'If-None-Match': resp.headers['ETag']}).status_code, 304)
+        orders = self.client.get('/api/orders?symbol=amd&per_page=500').get_json()
+        self.assertEqual(orders['total'], 30)
+        self.assertEqual(self.client.get('/api/orders/statuses').get_json(), {'statuses': ['Filled']})
+        self.assertEqual(self.client.get('/api/positions').get_json(), snapshot.positions)
+        self.assertEqual(self.calls, [])
+        status = self.client.get('/api/refresh/status').get_json()
+        self.assertTrue(status['running'])
+        self.assertEqual(status['snapshot']['orders'], 60)
+
+    def test_later_syncs_leave_the_published_snapshot_alone(self):
+        m = self.app_module
+        snapshot = m.refresh_scheduler.refresh_once()
+        m.refresh_scheduler._thread = type('Alive', (), {'is_alive': lambda self: True})()
+        try:
+            # A later refresh syncs appended orders but has not published them yet
+            rows = m.sheet_cache.peek(m.ORDERS_SPREADSHEET_ID, m.ORDERS_WORKSHEET_GID)
+            views = m.get_sheet_state('orders', m.SheetRows.extending(rows, [order_row(1), order_row(101)]))
+            self.assertIsNot(views, snapshot.orders)
+            self.assertEqual(len(snapshot.orders.orders), 60)
+            body = self.client.get('/api/orders?symbol=dvlt&per_page=500').get_json()
+            table = self.client.get('/api/orders/table/orders_list?limit=500').get_json()
+            buys = self.client.get('/api/orders/table/buy?limit=500').get_json()
+            symbols = self.client.get('/api/orders/symbols?q=').get_json()
+            positions = self.client.get('/api/positions').get_json()
+        finally:
+            m.refresh_scheduler._thread = None
+            m._sheet_states.clear()
+        self.assertEqual(body['total'], 30)
+        self.assertEqual((table['total'], len(table['items'])), (60, 60))
+        self.assertEqual(buys['total'], 40)
+        self.assertEqual(symbols, {'symbols': ['AMD', 'DVLT']})
+        self.assertEqual(positions, snapshot.positions)
+        self.assertEqual(self.client.get('/api/refresh/status').get_json()['running'], False)
+
+    def test_requests_during_refreshes_read_consistent_snapshots(self):
+        m = self.app_module
+        m.refresh_scheduler.refresh_once()
+        m.refresh_scheduler._thread = type('Alive', (), {'is_alive': lambda self: True})()
+        errors = []
+
+        def read():
+            client = m.app.test_client()
+            while not done.is_set():
+                for url in ('/api/orders?symbol=d&per_page=5', '/api/orders/table/sell?sort=symbol&limit=5',
+                            '/api/orders/symbols?q=v', '/api/positions'):
+                    resp = client.get(url)
+                    if resp.status_code != 200:
+                        errors.append((url, resp.status_code))
+
+        done = threading.Event()
+        readers = [threading.Thread(target=read) for _ in range(3)]
+        try:
+            for thread in readers:
+                thread.start()
+            for i in range(20):
+                self.orders.append(order_row(200 + i))
+                m.sheet_cache.clear()
+                m.refresh_scheduler.refresh_once()
+        finally:
+            done.set()
+            for thread in readers:
+                thread.join()
+            m.refresh_scheduler._thread = None
+            m._sheet_states.clear()
+        self.assertEqual(errors, [])
+        self.assertEqual(m.refresh_scheduler.current().order_count, 80)
+
+if __name__ == '__main__':
+    unittest.main()
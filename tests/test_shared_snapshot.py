@@ -0,0 +1,152 @@
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+
+from helpers import order_row, serve_sheets, transfer_row
+
+
+class SharedSnapshotTests(unittest.TestCase):
+    def setUp(self):
+        os.environ['FLASK_ENV'] = 'testing'
+        import app as app_module
+        self.app_module = app_module
+        if app_module.fcntl is None:
+            self.skipTest('needs fcntl')
+        app_module.sheet_cache.clear()
+        app_module.response_bodies.clear()
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, 'snapshot.bin')
+        self.orders = [order_row(i) for i in range(40)]
+        self.transfers = [transfer_row(i) for i in range(12)]
+        self.orig_shared = app_module.shared_snapshot
+        serve_sheets(self, app_module)
+        self.publisher = app_module.SharedSnapshotFile(self.path)
+        self.reader = app_module.SharedSnapshotFile(self.path)
+        self.scheduler = app_module.RefreshScheduler(interval=3600, publisher=self.publisher)
+
+    def tearDown(self):
+        m = self.app_module
+        m.shared_snapshot = self.orig_shared
+        self.publisher.release()
+        self.reader.release()
+        m.refresh_scheduler._thread = None
+        m.refresh_scheduler.clear()
+        m.sheet_cache.clear()
+        m._sheet_states.clear()
+        shutil.rmtree(self.tmp)
+
+    def test_one_process_publishes_and_another_takes_over(self):
+        self.assertTrue(self.publisher.acquire())
+        self.assertFalse(self.reader.acquire())
+        self.publisher.release()
+        self.reader._next_acquire = 0
+        self.assertTrue(self.reader.acquire())
+        self.assertEqual(self.reader.stats()['role'], 'publisher')
+
+    def test_reader_serves_published_snapshot_without_fetching(self):
+        m = self.app_module
+        published = self.scheduler.refresh_once()
+        m.shared_snapshot = self.reader
+        self.calls.clear()
+        client = m.app.test_client()
+        resp = client.get('/api/data?lite=1')
+        self.assertEqual(resp.get_json(), published.payloads[True])
+        self.assertEqual(client.get('/api/data').get_json(), published.payloads[False])
+        self.assertEqual(client.get('/api/positions').get_json(), published.positions)
+        self.assertEqual(client.get('/api/orders/statuses').get_json(), {'statuses': ['Filled']})
+        self.assertEqual(client.get('/api/orders?symbol=amd&per_page=500').get_json()['total'], 20)
+        self.assertEqual(self.calls, [])
+        # The publishing process hands out the same ETag for the same version
+        m.refresh_scheduler._snapshot = published
+        m.refresh_scheduler._thread = type('Alive', (), {'is_alive': lambda self: True})()
+        etag = resp.headers['ETag']
+        self.assertEqual(client.get('/api/data?lite=1', headers={'If-None-Match': etag}).status_code, 304)
+        self.assertEqual(client.get('/api/refresh/status').get_json()['shared']['mapped_version'], 1)
+
+    def test_new_versions_are_picked_up_whole(self):
+        self.scheduler.refresh_once()
+        first = self.reader.current()
+        self.assertIs(self.reader.current(), first)
+        self.orders.append(order_row(99))
+        second_published = self.scheduler.refresh_once()
+        second = self.reader.current()
+        self.assertEqual((first.version, second.version), (1, 2))
+        self.assertEqual(second.order_count, 41)
+        self.assertEqual(len(second.orders.orders), 41)
+        # A mapping still held by an in-flight request keeps its own version
+        self.assertEqual(len(first.orders.orders), 40)
+        self.assertEqual(bytes(second.section('positions')),
+                         self.app_module.app.json.response(second_published.positions).get_data())
+        self.assertEqual(self.reader.stats()['attaches'], 2)
+
+    def test_reader_orders_match_the_publisher(self):
+        m = self.app_module
+        self.orders[7] = {**self.orders[7], 'Status': 'Cancelled', None: ['extra cell']}
+        published = self.scheduler.refresh_once()
+        m.shared_snapshot = self.reader
+        client = m.app.test_client()
+        urls = ['/api/orders?per_page=500', '/api/orders?symbol=dv&status=fill', '/api/orders?start=2025-11-03&end=2025-11-09',
+                '/api/orders?start=2025-11-03&symbol=amd', '/api/orders/symbols?q=d',
+                '/api/orders/table/buy?limit=5', '/api/orders/table/sell?sort=price&fields=symbol,raw',
+                '/api/orders/table/orders_list?sort=-total']
+        mapped = {url: client.get(url).get_json() for url in urls}
+        self.assertIsInstance(self.reader.current().orders, m.MappedOrderViews)
+        m.refresh_scheduler._snapshot = published
+        m.refresh_scheduler._thread = type('Alive', (), {'is_alive': lambda self: True})()
+        for url in urls:
+            body = client.get(url).get_json()
+            # Order versions are per process, so only the publisher sends one
+            body.pop('version', None)
+            mapped[url].pop('version', None)
+            self.assertEqual(mapped[url], body, url)
+        page = mapped['/api/orders/table/buy?limit=5']
+        after = client.get(f"/api/orders/table/buy?limit=5&cursor={page['next_cursor']}").get_json()
+        m.refresh_scheduler._thread = None
+        self.assertEqual(client.get(f"/api/orders/table/buy?limit=5&cursor={page['next_cursor']}").get_json(), after)
+        self.assertEqual(list(self.reader.current().orders.store.rows), list(published.orders.store.rows))
+        self.assertIn(self.orders[7], published.orders.store.rows)
+
+    def test_bodies_are_streamed_with_precompressed_copies(self):
+        m = self.app_module
+        published = self.scheduler.refresh_once()
+        m.shared_snapshot = self.reader
+        client = m.app.test_client()
+        expected = m.app.json.response(published.payloads[False]).get_data()
+        resp = client.get('/api/data', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(resp.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(int(resp.headers['Content-Length']), len(resp.data))
+        self.assertEqual(gzip.decompress(resp.data), expected)
+        self.assertIn('Accept-Encoding', resp.headers['Vary'])
+        resp = client.get('/api/data', headers={'Accept-Encoding': 'identity'})
+        self.assertNotIn('Content-Encoding', resp.headers)
+        self.assertEqual(resp.data, expected)
+
+    def test_unencodable_snapshot_is_still_served_locally(self):
+        m = self.app_module
+        orig = m.OrderViews.image
+
+        def broken(views, rows=None):
+            raise TypeError('Type is not JSON serializable')
+        m.OrderViews.image = broken
+        try:
+            snapshot = self.scheduler.refresh_once()
+        finally:
+            m.OrderViews.image = orig
+        self.assertIs(self.scheduler.current(), snapshot)
+        self.assertEqual(self.publisher.stats()['errors'], 1)
+        self.assertIsNone(self.reader.current())
+
+    def test_unreadable_file_keeps_previous_version(self):
+        self.scheduler.refresh_once()
+        first = self.reader.current()
+        with open(self.path + '.new', 'wb') as f:
+            f.write(b'garbage')
+        os.replace(self.path + '.new', self.path)
+        self.assertIs(self.reader.current(), first)
+        self.assertEqual(self.reader.stats()['errors'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+import os
+import threading
+import unittest
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class SheetCacheTests(unittest.TestCase):
+    def setUp(self):
+        os.environ['FLASK_ENV'] = 'testing'
+        import app as app_module
+        self.app_module = app_module
+        self.clock = FakeClock()
+        self.calls = []
+
+    def make_cache(self, fetcher=None, ttl=60, max_stale=3600):
+        def default_fetcher(sheet_id, gid):
+            self.calls.append((sheet_id, gid))
+            return [{'Symbol': 'DVLT', 'call': len(self.calls)}]
+        return self.app_module.SheetCache(fetcher or default_fetcher, ttl=ttl,
+                                          max_stale=max_stale, clock=self.clock)
+
+    def test_fresh_entry_is_served_from_cache(self):
+        cache = self.make_cache()
+        first = cache.get('sheet', '0')
+        second = cache.get('sheet', 0)
+        self.assertIs(first, second)
+        self.assertEqual(self.calls, [('sheet', '0')])
+        stats = cache.stats()
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hits'], 1)
+
+    def test_keys_are_per_sheet_and_gid(self):
+        cache = self.make_cache()
+        cache.get('sheet', '0')
+        cache.get('sheet', '1')
+        cache.get('other', '0')
+        self.assertEqual(len(self.calls), 3)
+
+    def test_stale_entry_is_served_while_refreshing_in_background(self):
+        refreshed = threading.Event()
+
+        def fetcher(sheet_id, gid):
+            self.calls.append((sheet_id, gid))
+            if len(self.calls) > 1:
+                refreshed.set()
+            return [{'call': len(self.calls)}]
+
+        cache = self.make_cache(fetcher)
+        self.assertEqual(cache.get('sheet', '0'), [{'call': 1}])
+        self.clock.now += 120
+        # Served stale without waiting on the refetch
+        self.assertEqual(cache.get('sheet', '0'), [{'call': 1}])
+        self.assertTrue(refreshed.wait(2))
+        for _ in range(100):
+            if cache.version('sheet', '0') == 2:
+                break
+            threading.Event().wait(0.01)
+        self.assertEqual(cache.get('sheet', '0'), [{'call': 2}])
+        self.assertEqual(cache.stats()['stale_hits'], 1)
+
+    def test_expired_entry_is_refetched_synchronously(self):
+        cache = self.make_cache(ttl=10, max_stale=20)
+        cache.get('sheet', '0')
+        self.clock.now += 30
+        self.assertEqual(cache.get('sheet', '0'), [{'Symbol': 'DVLT', 'call': 2}])
+        self.assertEqual(cache.stats()['misses'], 2)
+
+    def test_concurrent_misses_share_one_fetch(self):
+        release = threading.Event()
+
+        def fetcher(sheet_id, gid):
+            self.calls.append((sheet_id, gid))
+            release.wait(2)
+            return [{'Symbol': 'DVLT'}]
+
+        cache = self.make_cache(fetcher)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get('sheet', '0')))
+                   for _ in range(8)]
+        for t in threads:
+            t.start()
+        for _ in range(100):
+            if cache.stats()['misses'] == 8:
+                break
+            threading.Event().wait(0.01)
+        release.set()
+        for t in threads:
+            t.join(2)
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(len(results), 8)
+        self.assertTrue(all(r == [{'Symbol': 'DVLT'}] for r in results))
+        self.assertEqual(cache.stats()['coalesced'], 7)
+
+    def test_failed_refresh_keeps_previous_data(self):
+        responses = [[{'Symbol': 'DVLT'}], None]
+
+        def fetcher(sheet_id, gid):
+            return responses.pop(0)
+
+        cache = self.make_cache(fetcher, ttl=10, max_stale=20)
+        cache.get('sheet', '0')
+        self.clock.now += 30
+        self.assertEqual(cache.get('sheet', '0'), [{'Symbol': 'DVLT'}])
+        self.assertEqual(cache.stats()['errors'], 1)
+
+    def test_unchanged_data_keeps_version(self):
+        cache = self.make_cache(lambda sheet_id, gid: [{'Symbol': 'DVLT'}], ttl=10, max_stale=20)
+        cache.get('sheet', '0')
+        self.clock.now += 30
+        cache.get('sheet', '0')
+        self.assertEqual(cache.version('sheet', '0'), 1)
+
+    def test_refetched_rows_reuse_cached_rows(self):
+        sheet = [{'Symbol': 'DVLT', 'row': i} for i in range(3)]
+        cache = self.make_cache(lambda sheet_id, gid: [dict(r) for r in sheet], ttl=10, max_stale=20)
+        first = cache.get('sheet', '0')
+        self.clock.now += 30
+        self.assertIs(cache.get('sheet', '0'), first)
+        sheet.append({'Symbol': 'AMD', 'row': 3})
+        self.clock.now += 30
+        grown = cache.get('sheet', '0')
+        self.assertEqual((grown, cache.version('sheet', '0')), (sheet, 2))
+        self.assertTrue(grown.extends(first))
+        self.assertIs(grown[0], first[0])
+
+    def test_endpoints_share_cached_sheet(self):
+        calls = []
+        orig_get = self.app_module.get_sheet_data
+
+        def fake_get(spreadsheet_id=None, worksheet_gid=None):
+            calls.append((spreadsheet_id, worksheet_gid))
+            return [{'Symbol': 'DVLT', 'Side': 'Buy', 'Status': 'Filled', 'Total Value': '20.00',
+                     'Placed Time': '11/04/2025 13:51:17 EST'}]
+
+        self.app_module.get_sheet_data = fake_get
+        self.app_module.sheet_cache.clear()
+        try:
+            client = self.app_module.app.test_client()
+            for _ in range(3):
+                self.assertEqual(client.get('/api/orders/symbols?q=dv').status_code, 200)
+                self.assertEqual(client.get('/api/orders/statuses').status_code, 200)
+            stats = client.get('/api/cache/stats').get_json()
+        finally:
+            self.app_module.get_sheet_data = orig_get
+            self.app_module.sheet_cache.clear()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hits'], 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
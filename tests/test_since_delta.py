@@ -0,0 +1,230 @@
+import os
+import unittest
+
+from helpers import order_row, serve_sheets, transfer_row
+
+
+class ChangeLogTests(unittest.TestCase):
+    def setUp(self):
+        os.environ['FLASK_ENV'] = 'testing'
+        import app as app_module
+        self.app_module = app_module
+        self.holder = app_module.IncrementalSheetState(app_module.OrderViews)
+
+    def test_appends_and_modified_rows_since_a_token(self):
+        rows = [order_row(i) for i in range(10)]
+        self.holder.sync(rows)
+        token = self.holder.token()
+        rows = rows + [order_row(i) for i in range(10, 14)]
+        self.holder.sync(rows)
+        self.assertEqual(self.holder.changes_since(token), (10, 14, []))
+        rows = [dict(r) for r in rows]
+        rows[3]['Status'] = 'Cancelled'
+        rows.append(order_row(14))
+        self.holder.sync(rows)
+        self.assertEqual(self.holder.changes_since(token), (10, 15, [3]))
+        self.assertEqual(self.holder.changes_since(self.holder.token()), (15, 15, []))
+        self.assertEqual(self.holder.changes_since(token, upto=2), (10, 14, []))
+
+    def test_tokens_without_a_usable_history_need_a_full_payload(self):
+        m = self.app_module
+        rows = [order_row(i) for i in range(10)]
+        self.holder.sync(rows)
+        token = self.holder.token()
+        self.holder.sync(rows[:4] + rows[5:])  # a row removed
+        self.assertIsNone(self.holder.changes_since(token))
+        for bad in ('', 'nope', f'{self.holder.lineage}:x', f'{self.holder.lineage}:9',
+                    m.IncrementalSheetState(m.OrderViews).token()):
+            self.assertIsNone(self.holder.changes_since(bad), bad)
+
+        orig = m.SHEET_CHANGE_HISTORY
+        m.SHEET_CHANGE_HISTORY = 2
+        try:
+            holder = m.IncrementalSheetState(m.OrderViews)
+        finally:
+            m.SHEET_CHANGE_HISTORY = orig
+        holder.sync(rows[:5])
+        token = holder.token()
+        for n in (6, 7):
+            holder.sync(rows[:n])
+        self.assertEqual(holder.changes_since(token), (5, 7, []))
+        holder.sync(rows[:8])  # the log no longer reaches back to ``token``
+        self.assertIsNone(holder.changes_since(token))
+
+    def test_store_position_of_appended_batches(self):
+        rows = [order_row(i) for i in range(9)]
+        views = self.holder.sync(rows[:6])
+        views = self.holder.sync(rows)
+        self.assertEqual(views.store_position(6), 6)
+        self.assertEqual(views.store_position(9), 9)
+        self.assertIsNone(views.store_position(4))
+
+
+class SinceEndpointTests(unittest.TestCase):
+    def setUp(self):
+        os.environ['FLASK_ENV'] = 'testing'
+        import app as app_module
+        self.app_module = app_module
+        app_module.sheet_cache.clear()
+        app_module._sheet_states.clear()
+        app_module.response_bodies.clear()
+        self.client = app_module.app.test_client()
+        self.orders = [order_row(i) for i in range(30)]
+        self.transfers = [transfer_row(i) for i in range(20)]
+        serve_sheets(self, app_module)
+
+    def tearDown(self):
+        m = self.app_module
+        m.refresh_scheduler._thread = None
+        m.refresh_scheduler.clear()
+        m.sheet_cache.clear()
+        m._sheet_states.clear()
+        m.response_bodies.clear()
+
+    def change_sheets(self):
+        """Append orders 30-32 and cancel order 4, then drop the cached sheets so they are refetched"""
+        self.orders = [dict(r) for r in self.orders] + [order_row(i) for i in range(30, 33)]
+        self.orders[4]['Status'] = 'Cancelled'
+        self.app_module.sheet_cache.clear()
+
+    def test_orders_since_returns_changed_and_removed_orders(self):
+        first = self.client.get('/api/orders?status=filled&per_page=500').get_json()
+        self.assertEqual(first['total'], 30)
+        self.change_sheets()
+        body = self.client.get(f"/api/orders?status=filled&since={first['version']}").get_json()
+        self.assertEqual(body['since'], first['version'])
+        self.assertEqual([o['id'] for o in body['orders']], ['ORD-31', 'ORD-32', 'ORD-33'])
+        self.assertEqual(body['removed'], ['ORD-5'])
+        self.assertEqual(body['total'], 32)
+        full = self.client.get('/api/orders?status=filled&per_page=500').get_json()
+        self.assertEqual(body['metrics'], full['metrics'])
+        self.assertEqual(body['version'], full['version'])
+
+        unfiltered = self.client.get(f"/api/orders?since={first['version']}").get_json()
+        self.assertEqual([o['id'] for o in unfiltered['orders']], ['ORD-5', 'ORD-31', 'ORD-32', 'ORD-33'])
+        self.assertEqual(unfiltered['orders'][0]['status'], 'Cancelled')
+        self.assertEqual(unfiltered['removed'], [])
+
+    def test_orders_with_an_unknown_version_get_the_full_page(self):
+        body = self.client.get('/api/orders?since=stale:3&per_page=10').get_json()
+        self.assertNotIn('since', body)
+        self.assertEqual((len(body['orders']), body['total']), (10, 30))
+
+    def test_data_since_returns_appended_orders(self):
+        m = self.app_module
+        resp = self.client.get('/api/data?lite=1')
+        token = resp.headers['X-Data-Version']
+        self.orders = self.orders + [order_row(i) for i in range(30, 33)]
+        m.sheet_cache.clear()
+        body = self.client.get(f'/api/data?lite=1&since={token}').get_json()
+        self.assertEqual((body['since'], body['version']), (token, m._sheet_states['orders'].token()))
+        self.assertEqual([o['id'] for o in body['orders_list']], ['ORD-31', 'ORD-32', 'ORD-33'])
+        self.assertEqual(len(body['buy_orders']) + len(body['sell_orders']), 3)
+        full = m.process_order_analysis(self.orders)
+        self.assertEqual(body['order_summary']['total_value_bought'], full['total_value_bought'])
+        self.assertIn('monthly_cash_flow', body['aggregates'])
+        self.assertNotIn('buy_orders', body['order_summary'])
+
+    def test_an_out_of_order_sync_keeps_outstanding_tokens(self):
+        m = self.app_module
+        sheet = m.ORDERS_SPREADSHEET_ID, m.ORDERS_WORKSHEET_GID
+        token = self.client.get('/api/data?lite=1').headers['X-Data-Version']
+        stale = m.sheet_cache.peek(*sheet)
+        self.orders = self.orders + [order_row(i) for i in range(30, 33)]
+        m.sheet_cache.refresh(*sheet)
+        self.client.get('/api/data?lite=1')
+        # A slower request still holding the earlier fetch syncs last
+        m.get_sheet_state('orders', stale)
+        self.assertEqual(m._sheet_states['orders'].counters['rebuilds'], 1)
+        body = self.client.get(f'/api/data?lite=1&since={token}').get_json()
+        self.assertEqual(body['since'], token)
+        self.assertEqual([o['id'] for o in body['orders_list']], ['ORD-31', 'ORD-32', 'ORD-33'])
+        orders = self.client.get(f'/api/orders?since={token}').get_json()
+        self.assertEqual([o['id'] for o in orders['orders']], ['ORD-31', 'ORD-32', 'ORD-33'])
+
+    def test_data_since_shares_the_etag_of_the_full_payload(self):
+        m = self.app_module
+        self.client.get('/api/data?lite=1')  # the first fetch fills the cache and has no ETag
+        resp = self.client.get('/api/data?lite=1')
+        etag, token = resp.headers['ETag'], resp.headers['X-Data-Version']
+        unchanged = self.client.get(f'/api/data?lite=1&since={token}', headers={'If-None-Match': etag})
+        self.assertEqual(unchanged.status_code, 304)
+
+        self.orders = self.orders + [order_row(i) for i in range(30, 33)]
+        m.sheet_cache.clear()
+        self.client.get('/api/data?lite=1')
+        delta = self.client.get(f'/api/data?lite=1&since={token}', headers={'If-None-Match': etag})
+        self.assertEqual(delta.status_code, 200)
+        self.assertEqual(delta.get_json()['since'], token)
+        full = self.client.get('/api/data?lite=1')
+        self.assertNotIn('since', full.get_json())
+        self.assertEqual(delta.headers['ETag'], full.headers['ETag'])
+        again = self.client.get(f"/api/data?lite=1&since={delta.headers['X-Data-Version']}",
+                                headers={'If-None-Match': delta.headers['ETag']})
+        self.assertEqual(again.status_code, 304)
+
+    def test_snapshot_delta_shares_the_etag_of_the_full_payload(self):
+        m = self.app_module
+        first = m.refresh_scheduler.refresh_once()
+        resp = self.client.get('/api/data?lite=1')
+        self.assertEqual(resp.headers['X-Data-Version'], first.orders_token)
+        unchanged = self.client.get(f'/api/data?lite=1&since={first.orders_token}',
+                                    headers={'If-None-Match': resp.headers['ETag']})
+        self.assertEqual(unchanged.status_code, 304)
+        self.orders = self.orders + [order_row(i) for i in range(30, 33)]
+        m.sheet_cache.clear()
+        m.refresh_scheduler.refresh_once()
+        delta = self.client.get(f'/api/data?lite=1&since={first.orders_token}')
+        self.assertEqual(len(delta.get_json()['orders_list']), 3)
+        self.assertEqual(delta.headers['ETag'], self.client.get('/api/data?lite=1').headers['ETag'])
+
+    def test_data_since_after_a_modified_row_is_the_full_payload(self):
+        token = self.client.get('/api/data').headers['X-Data-Version']
+        self.change_sheets()
+        resp = self.client.get(f'/api/data?since={token}')
+        body = resp.get_json()
+        self.assertNotIn('since', body)
+        self.assertEqual(body['orders_list'], self.app_module.process_orders_list(self.orders))
+        self.assertNotEqual(resp.headers['X-Data-Version'], token)
+
+    def test_data_version_matches_the_orders_served(self):
+        m = self.app_module
+        orig = m.get_sheet_state
+
+        def racing(name, rows):
+            if name == 'transfers':
+                # Another request syncs appended orders in between
+                orig('orders', self.orders + [order_row(i) for i in range(30, 33)])
+            return orig(name, rows)
+        m.get_sheet_state = racing
+        try:
+            resp = self.client.get('/api/data?lite=1')
+        finally:
+            m.get_sheet_state = orig
+        holder = m._sheet_states['orders']
+        self.assertEqual(resp.get_json()['pages']['orders_list']['total'], 30)
+        self.assertEqual(resp.headers['X-Data-Version'], holder.token(holder.version - 1))
+
+    def test_snapshot_delta_stops_at_the_snapshot(self):
+        m = self.app_module
+        first = m.refresh_scheduler.refresh_once()
+        self.orders = self.orders + [order_row(i) for i in range(30, 33)]
+        m.sheet_cache.clear()
+        second = m.refresh_scheduler.refresh_once()
+        m.refresh_scheduler._thread = type('Alive', (), {'is_alive': lambda self: True})()
+        # Synced by a later refresh that has not been published
+        rows = m.sheet_cache.peek(m.ORDERS_SPREADSHEET_ID, m.ORDERS_WORKSHEET_GID)
+        m.get_sheet_state('orders', m.SheetRows.extending(rows, [order_row(40)]))
+        self.assertEqual(m._sheet_states['orders'].version, second.orders_version + 1)
+        resp = self.client.get(f'/api/data?since={first.orders_token}')
+        body = resp.get_json()
+        self.assertEqual(resp.headers['X-Data-Version'], second.orders_token)
+        self.assertEqual(body['version'], second.orders_token)
+        self.assertEqual([o['id'] for o in body['orders_list']], ['ORD-31', 'ORD-32', 'ORD-33'])
+        orders = self.client.get(f'/api/orders?since={first.orders_token}').get_json()
+        self.assertEqual([o['id'] for o in orders['orders']], ['ORD-31', 'ORD-32', 'ORD-33'])
+        self.assertEqual(orders['total'], 33)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import json
+import os
+import time
+import unittest
+
+from helpers import order_row, serve_sheets, transfer_row
+
+
+def parse_event(message):
+    lines = dict(line.split(': ', 1) for line in message.decode().strip().split('\n'))
+    return lines['event'], json.loads(lines['data'])
+
+
+class SnapshotEventsTests(unittest.TestCase):
+    def setUp(self):
+        os.environ['FLASK_ENV'] = 'testing'
+        import app as app_module
+        self.app_module = app_module
+        app_module.sheet_cache.clear()
+        app_module.response_bodies.clear()
+        self.orders = [order_row(i) for i in range(30)]
+        self.transfers = [transfer_row(i) for i in range(12)]
+        self.orig = app_module.refresh_scheduler.interval, app_module.snapshot_events.poll_interval
+        serve_sheets(self, app_module)
+        self.scheduler = app_module.RefreshScheduler(interval=3600)
+        self.events = app_module.SnapshotEvents(self.scheduler.current, poll_interval=3600)
+
+    def tearDown(self):
+        m = self.app_module
+        m.refresh_scheduler.interval, m.snapshot_events.poll_interval = self.orig
+        m.refresh_scheduler.stop()
+        m.refresh_scheduler.clear()
+        m.sheet_cache.clear()
+        m._sheet_states.clear()
+
+    def test_many_subscribers_share_one_delta(self):
+        m = self.app_module
+        subscribers = [self.events.subscribe() for _ in range(500)]
+        first = self.scheduler.refresh_once()
+        self.assertTrue(self.events.check())
+        self.assertFalse(self.events.check())  # nothing new
+        reloads = {s.get_nowait() for s in subscribers}
+        self.assertEqual(len(reloads), 1)
+        self.assertEqual(parse_event(reloads.pop())[1]['delta'], None)
+
+        self.orders += [order_row(40), order_row(41), order_row(42)]
+        self.transfers[2] = dict(self.transfers[2], Status='Failed')
+        second = self.scheduler.refresh_once()
+        self.assertTrue(self.events.check())
+        messages = [s.get_nowait() for s in subscribers]
+        self.assertTrue(all(message is messages[0] for message in messages))
+        event, body = parse_event(messages[0])
+        self.assertEqual((event, body['base'], body['version']), ('snapshot', first.version_tag, second.version_tag))
+        delta = body['delta']
+        self.assertEqual((len(delta['buy_orders']), len(delta['sell_orders']), len(delta['orders_list'])), (2, 1, 3))
+        self.assertEqual(delta['aggregates']['summary_metrics'], second.payloads[True]['summary_metrics'])
+        self.assertEqual(delta['aggregates']['transaction_status'], second.payloads[True]['transaction_status'])
+        self.assertNotIn('transfer_by_type', delta['aggregates'])  # unchanged
+        full = second.payloads[False]['order_analysis']
+        self.assertEqual(delta['order_summary']['total_value_bought'], full['total_value_bought'])
+
+        # Merging the delta newest-first reproduces the new tables
+        def merged(old, new):
+            rows = [{k: o[k] for k in m.ORDER_FIELDS} for o in old] + new
+            return sorted(rows, key=lambda o: m.epoch_day(m.parse_date(o['date'])), reverse=True)
+        before = first.payloads[False]['order_analysis']
+        for side in ('buy_orders', 'sell_orders'):
+            self.assertEqual(merged(before[side], delta[side]), [{k: o[k] for k in m.ORDER_FIELDS} for o in full[side]])
+        self.assertEqual(first.payloads[False]['orders_list'] + delta['orders_list'],
+                         second.payloads[False]['orders_list'])
+        self.assertEqual(self.events.stats()['subscribers'], 500)
+        for s in subscribers:
+            self.events.unsubscribe(s)
+
+    def test_edited_orders_and_lagging_subscribers_get_a_reload(self):
+        subscriber = self.events.subscribe()
+        self.events.QUEUE_SIZE = 2
+        lagging = self.events.subscribe()
+        self.scheduler.refresh_once()
+        self.events.check()
+        subscriber.get_nowait()
+        self.orders[0] = order_row(0, qty=99)
+        self.scheduler.refresh_once()
+        self.events.check()
+        self.assertIsNone(parse_event(subscriber.get_nowait())[1]['delta'])
+        self.orders.append(order_row(60))
+        self.scheduler.refresh_once()
+        self.events.check()
+        self.assertIsNotNone(parse_event(subscriber.get_nowait())[1]['delta'])
+        # The lagging subscriber missed three events and only gets a reload for the latest
+        self.assertEqual(lagging.qsize(), 1)
+        _, body = parse_event(lagging.get_nowait())
+        self.assertEqual((body['delta'], body['version']), (None, self.scheduler.current().version_tag))
+        self.assertEqual(self.events.stats()['overflows'], 1)
+
+    def test_event_stream(self):
+        m = self.app_module
+        m.snapshot_events.poll_interval = 0.01
+        client = m.app.test_client()
+        resp = client.get('/api/events')
+        self.assertEqual(resp.mimetype, 'text/event-stream')
+        stream = iter(resp.response)
+        try:
+            event, _ = parse_event(next(stream))
+            self.assertEqual(event, 'hello')
+            deadline = time.monotonic() + 5
+            while m.refresh_scheduler.current() is None and time.monotonic() < deadline:
+                time.sleep(0.01)
+            _, body = parse_event(next(stream))
+            self.assertEqual(body['version'], m.refresh_scheduler.current().version_tag)
+            data = client.get('/api/data?lite=1')
+            self.assertEqual(data.headers['X-Snapshot-Version'], body['version'])
+            self.orders.append(order_row(70))
+            m.refresh_scheduler.refresh_once()
+            _, body = parse_event(next(stream))
+            self.assertEqual(len(body['delta']['orders_list']), 1)
+        finally:
+            resp.close()
+        self.assertEqual(m.snapshot_events.stats()['subscribers'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,204 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+import helpers
+
+
+# Numbers and non-ASCII text have to survive the round trip through SQLite
+def order_row(i):
+    return dict(helpers.order_row(i), Filled=i + 1)
+
+
+def transfer_row(i):
+    return dict(helpers.transfer_row(i), Note='café')
+
+
+class SnapshotStoreTests(unittest.TestCase):
+    def setUp(self):
+        os.environ['FLASK_ENV'] = 'testing'
+        import app as app_module
+        self.app_module = app_module
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, 'sheets.db')
+        self.rows = [order_row(i) for i in range(50)]
+        self.failing = False
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def fetcher(self, sheet_id, gid):
+        return None if self.failing else list(self.rows)
+
+    def wait_for_refreshes(self):
+        """Wait out background refreshes of stale sheets, so none outlives the fetch it was started with"""
+        for event in list(self.app_module.sheet_cache._inflight.values()):
+            event.wait()
+
+    def chunk_count(self):
+        with sqlite3.connect(self.path) as conn:
+            return conn.execute('SELECT COUNT(*) FROM sheet_chunks').fetchone()[0]
+
+    def test_appends_write_only_new_rows(self):
+        m = self.app_module
+        store = m.SheetSnapshotStore(self.path)
+        cache = m.SheetCache(self.fetcher, ttl=0, max_stale=0, store=store)
+        cache.get('sheet', '0')
+        cache.get('sheet', '0')  # unchanged: nothing written
+        self.rows = self.rows + [order_row(i) for i in range(50, 60)]
+        cache.get('sheet', '0')
+        store.flush()
+        self.assertEqual((store.stats()['rewrites'], store.stats()['appends']), (1, 1))
+        self.assertEqual(self.chunk_count(), 2)
+        self.assertEqual(m.SheetSnapshotStore(self.path).load()[('sheet', '0')]['data'], self.rows)
+        self.rows = [dict(self.rows[0], Filled=99)] + self.rows[1:]
+        cache.get('sheet', '0')
+        store.flush()
+        self.assertEqual(self.chunk_count(), 1)
+        loaded = m.SheetSnapshotStore(self.path).load()[('sheet', '0')]
+        self.assertEqual((loaded['data'], loaded['version']), (self.rows, 3))
+
+    def test_ragged_rows_round_trip(self):
+        m = self.app_module
+        store = m.SheetSnapshotStore(self.path)
+        # csv.DictReader-style rows: cells beyond the header sit under the None key
+        self.rows[3] = {**self.rows[3], None: ['extra', 'cells']}
+        m.SheetCache(self.fetcher, store=store).get('sheet', '0')
+        store.flush()
+        self.assertEqual(store.stats()['errors'], 0)
+        self.assertEqual(m.SheetSnapshotStore(self.path).load()[('sheet', '0')]['data'], self.rows)
+
+    def test_restored_rows_are_served_when_fetches_fail(self):
+        m = self.app_module
+        store = m.SheetSnapshotStore(self.path)
+        m.SheetCache(self.fetcher, store=store).get('sheet', '0')
+        store.flush()
+        self.failing = True
+        cache = m.SheetCache(self.fetcher, store=m.SheetSnapshotStore(self.path))
+        self.assertEqual(m.restore_sheet_cache(cache), 1)
+        self.assertEqual(cache.get('sheet', '0'), self.rows)
+        self.assertEqual(cache.version('sheet', '0'), 1)
+        self.assertIn(('sheet', '0'), m._last_full_sync)
+
+    def test_api_data_falls_back_to_persisted_sheets(self):
+        m = self.app_module
+        orig_get, orig_store = m.get_sheet_data, m.sheet_cache.store
+        transfers = [transfer_row(i) for i in range(20)]
+        m.get_sheet_data = lambda spreadsheet_id=None, worksheet_gid=None: (
+            list(self.rows) if worksheet_gid == m.ORDERS_WORKSHEET_GID else list(transfers))
+        m.sheet_cache.clear()
+        m.sheet_cache.store = m.SheetSnapshotStore(self.path)
+        try:
+            client = m.app.test_client()
+            online = client.get('/api/data').get_json()
+            m.sheet_cache.store.flush()
+            # Restart with Google unreachable
+            m.sheet_cache.clear()
+            m.get_sheet_data = lambda spreadsheet_id=None, worksheet_gid=None: None
+            m.restore_sheet_cache()
+            offline = client.get('/api/data')
+        finally:
+            self.wait_for_refreshes()
+            m.get_sheet_data = orig_get
+            m.sheet_cache.store = orig_store
+            m.sheet_cache.clear()
+        self.assertEqual(offline.status_code, 200)
+        self.assertEqual(offline.get_json(), online)
+
+    def serve_sheets(self, transfers):
+        m = self.app_module
+        m.get_sheet_data = lambda spreadsheet_id=None, worksheet_gid=None: (
+            None if self.failing else list(self.rows) if worksheet_gid == m.ORDERS_WORKSHEET_GID else list(transfers))
+
+    def test_derived_states_are_restored_with_their_sheets(self):
+        m = self.app_module
+        orig_get, orig_store = m.get_sheet_data, m.sheet_cache.store
+        self.serve_sheets([transfer_row(i) for i in range(20)])
+        urls = ['/api/data', '/api/orders?symbol=dv&per_page=500', '/api/orders/table/buy?sort=price', '/api/positions']
+        m.sheet_cache.clear()
+        m._sheet_states.clear()
+        m.sheet_cache.store = m.SheetSnapshotStore(self.path)
+        try:
+            client = m.app.test_client()
+            online = [client.get(url).get_json() for url in urls]
+            m.sheet_cache.store.flush()
+            self.assertEqual(m.sheet_cache.store.stats()['states'], 2)
+            # Restart with Google unreachable: nothing is normalized again
+            m.sheet_cache.clear()
+            m._sheet_states.clear()
+            m.sheet_cache.store = m.SheetSnapshotStore(self.path)
+            self.failing = True
+            m.restore_sheet_cache()
+            offline = [client.get(url).get_json() for url in urls]
+            processed = {name: holder.counters['rows_processed'] for name, holder in m._sheet_states.items()}
+            # Appended rows are folded into the restored state
+            self.wait_for_refreshes()
+            self.failing = False
+            self.rows = self.rows + [order_row(i) for i in range(50, 60)]
+            m.sheet_cache.refresh(m.ORDERS_SPREADSHEET_ID, m.ORDERS_WORKSHEET_GID)
+            appended = client.get('/api/orders?per_page=500').get_json()
+            counters = dict(m._sheet_states['orders'].counters)
+        finally:
+            self.wait_for_refreshes()
+            m.get_sheet_data = orig_get
+            m.sheet_cache.store = orig_store
+            m.sheet_cache.clear()
+            m._sheet_states.clear()
+        # Version tokens belong to the process that issued them
+        self.assertNotEqual(offline[1].pop('version'), online[1].pop('version'))
+        self.assertEqual(offline, online)
+        self.assertEqual(processed, {'transfers': 0, 'orders': 0})
+        self.assertEqual((counters['appends'], counters['rebuilds'], counters['rows_processed']), (1, 0, 10))
+        self.assertEqual(appended['orders'], m.process_orders_list_v2(self.rows))
+
+    def test_states_of_other_sheet_versions_are_ignored(self):
+        m = self.app_module
+        orig_get, orig_store = m.get_sheet_data, m.sheet_cache.store
+        self.serve_sheets([transfer_row(i) for i in range(20)])
+        m.sheet_cache.clear()
+        m._sheet_states.clear()
+        m.sheet_cache.store = m.SheetSnapshotStore(self.path)
+        try:
+            m.app.test_client().get('/api/data')
+            m.sheet_cache.store.flush()
+            with sqlite3.connect(self.path) as conn:
+                conn.execute('UPDATE sheet_states SET version = version + 1')
+            m.sheet_cache.clear()
+            m._sheet_states.clear()
+            m.sheet_cache.store = m.SheetSnapshotStore(self.path)
+            m.restore_sheet_cache()
+            restored = dict(m._sheet_states)
+        finally:
+            self.wait_for_refreshes()
+            m.get_sheet_data = orig_get
+            m.sheet_cache.store = orig_store
+            m.sheet_cache.clear()
+            m._sheet_states.clear()
+        self.assertEqual(restored, {})
+
+    def test_queued_states_are_coalesced(self):
+        m = self.app_module
+        store = m.SheetSnapshotStore(self.path)
+        gate = threading.Event()
+        store._writer.submit(gate.wait)
+        first, second = m.SheetRows(self.rows[:40]), m.SheetRows.extending(m.SheetRows(self.rows[:40]), self.rows[40:])
+        for version, rows in enumerate((first, second), 1):
+            views = m.OrderViews()
+            views.add_rows(rows)
+            store.save(('sheet', '0'), rows, version)
+            store.save_state(('sheet', '0'), 'orders', rows, views)
+        gate.set()
+        store.flush()
+        self.assertEqual(store.stats()['states'], 1)
+        saved = store.load_states()[('sheet', '0')]
+        self.assertEqual((saved['version'], saved['row_count']), (2, 50))
+        restored = m.OrderViews.from_image(saved['meta'], saved['section'], second)
+        self.assertEqual(restored.orders, views.orders)
+        self.assertEqual(list(restored.store.rows), list(views.store.rows))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import os
+import random
+import unittest
+
+
+SYMBOLS = ('DVLT', 'AMD', 'TSLA', 'AAPL', 'NVDA', 'SOXL', 'TQQQ', 'N/A')
+STATUSES = ('Filled', 'Cancelled', 'Partially Filled', 'Failed')
+
+
+def order_row(i, rng):
+    row = {'Side': rng.choice(('Buy', 'Sell')), 'Status': rng.choice(STATUSES),
+           'Filled': str(rng.randint(1, 50)), 'Avg Price': f'{rng.uniform(1, 300):.2f}',
+           'Placed Time': f'{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}/2025 13:51:17 EST'}
+    symbol = rng.choice(SYMBOLS)
+    if symbol != 'N/A':
+        row['Symbol'] = symbol
+    return row
+
+
+class TermIndexTests(unittest.TestCase):
+    def setUp(self):
+        os.environ['FLASK_ENV'] = 'testing'
+        import app as app_module
+        self.app_module = app_module
+        app_module.sheet_cache.clear()
+        self.client = app_module.app.test_client()
+        rng = random.Random(10)
+        self.rows = [order_row(i, rng) for i in range(400)]
+
+    def test_matching_and_positions_match_linear_scan(self):
+        views = self.app_module.OrderViews()
+        views.add_rows(self.rows[:150])
+        views.add_rows(self.rows[150:], offset=150)
+        for field, index in (('symbol', views.symbols), ('status', views.statuses)):
+            values = sorted(set(o[field] for o in views.orders))
+            self.assertEqual(index.values(), values)
+            for query in ('', 'a', 'L', 'aa', 'fil', 'illed', 'Partially', 'zz', 'tsla', 'n/a'):
+                q = query.lower()
+                self.assertEqual(index.matching(query), [v for v in values if q in v.lower()])
+                expected = [i for i, o in enumerate(views.orders) if q in o[field].lower()]
+                self.assertEqual(list(index.positions(query)), expected)
+
+    def test_match_cache_keeps_recent_queries(self):
+        index = self.app_module.TermIndex()
+        index.MATCH_CACHE_SIZE = 2
+        for i, symbol in enumerate(SYMBOLS):
+            index.add(symbol, i)
+        for query in ('a', 'dv', 'a', 'ts'):
+            index.matching(query)
+        self.assertEqual(list(index._matches), ['a', 'ts'])
+        self.assertEqual(index.matching('q'), ['TQQQ'])
+        index.add('SOXS', 8)
+        self.assertEqual(list(index._matches), [])
+        self.assertEqual(index.matching('s'), ['SOXL', 'SOXS', 'TSLA'])
+
+    def test_api_filters_use_indexes(self):
+        m = self.app_module
+        orig_get = m.get_sheet_data
+        m.get_sheet_data = lambda spreadsheet_id=None, worksheet_gid=None: self.rows
+        try:
+            symbols = self.client.get('/api/orders/symbols?q=a').get_json()['symbols']
+            statuses = self.client.get('/api/orders/statuses').get_json()['statuses']
+            body = self.client.get('/api/orders?symbol=ts&status=filled&start=2025-03-01&per_page=1000').get_json()
+        finally:
+            m.get_sheet_data = orig_get
+        self.assertEqual(symbols, ['AAPL', 'AMD', 'NVDA', 'TSLA'])
+        self.assertEqual(statuses, sorted(STATUSES))
+        expected = [o for o in m.process_orders_list_v2(self.rows)
+                    if 'ts' in o['symbol'].lower() and 'filled' in o['status'].lower()
+                    and m.parse_date(o['date']) >= m.parse_date('2025-03-01')]
+        self.assertEqual([o['id'] for o in body['orders']], [o['id'] for o in expected])
+        self.assertEqual(body['metrics'], m.aggregate_orders_metrics(expected))
+
+
+if __name__ == '__main__':
+    unittest.main()
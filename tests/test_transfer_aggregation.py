@@ -0,0 +1,60 @@
+import os
+import random
+import unittest
+
+
+def make_transfers(n, seed=0):
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(n):
+        transfer_type = rng.choice(['Ach Incoming', 'Ach Outgoing', 'Wire Incoming', ''])
+        amount = round(rng.uniform(-2000, 2000), 2)
+        date = rng.choice([
+            f'{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}/{rng.randint(2019, 2025)} 11:28 AM',
+            f'{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}/{rng.randint(2019, 2025)}',
+            '', 'pending'
+        ])
+        rows.append({
+            'Transfer Initiated': date,
+            'Type': transfer_type,
+            'Status': rng.choice(['Completed', 'completed ', 'Rejected', 'Canceled', '']),
+            'Amount': rng.choice([f'${abs(amount):,.2f}', f'+{amount}', 'n/a', '']),
+            'Amount Numeric': rng.choice([str(amount), '']),
+        })
+    return rows
+
+
+class TransferAggregationTests(unittest.TestCase):
+    def setUp(self):
+        os.environ['FLASK_ENV'] = 'testing'
+        import app as app_module
+        self.app_module = app_module
+
+    def assert_matches_individual_functions(self, rows):
+        m = self.app_module
+        fused = m.aggregate_transfers(rows)
+        self.assertEqual(fused, {
+            'monthly_cash_flow': m.process_monthly_cash_flow(rows),
+            'yearly_transfer_volume': m.process_yearly_transfer_volume(rows),
+            'transaction_status': m.process_transaction_status(rows),
+            'transfer_by_type': m.process_transfer_by_type(rows),
+            'summary_metrics': m.calculate_summary_metrics(rows),
+        })
+
+    def test_matches_individual_functions(self):
+        for seed in range(5):
+            self.assert_matches_individual_functions(make_transfers(500, seed))
+
+    def test_matches_on_alternate_columns(self):
+        self.assert_matches_individual_functions([
+            {'Date': '2024-01-05', 'Amount': '5', 'type': 'Incoming', 'status': 'done'},
+            {'date': 'Jan 5, 2024', 'Amount': '(5)', 'Transfer Type': 'Card'},
+            {'transfer date': '13/01/2024', 'Amount Numeric': '-7.5', 'Type': 'ACH Outgoing', 'Status': 'Completed'},
+        ])
+
+    def test_empty_data(self):
+        self.assert_matches_individual_functions([])
+
+
+if __name__ == '__main__':
+    unittest.main()